@@ -1,3 +1,5 @@
+import os
+from pathlib import Path
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -19,14 +21,58 @@ class Settings(BaseSettings):
     PINECONE_INDEX_NAME: str = "interview-questions"
     PINECONE_CLOUD: str = "aws"
     PINECONE_REGION: str = "us-east-1"
+
+    # Retrieval backend: "pinecone" or "local" (in-process index over QUESTION_BANK_DIR)
+    VECTOR_BACKEND: str = "pinecone"
+    QUESTION_BANK_DIR: str = str(Path(__file__).resolve().parents[2] / "scripts" / "final_output")
+    # Memory-mapped embeddings written by scripts/ingest.py; used by the local backend when present
+    EMBEDDING_STORE_DIR: str = str(Path(__file__).resolve().parents[2] / "embedding_store")
+    # Fuse BM25 keyword matches with vector results (reciprocal-rank fusion). Off by
+    # default: fused results change which requests take the RAG or fallback path
+    HYBRID_RETRIEVAL: bool = False
+    RETRIEVAL_TOP_K: int = 4
+    # Question serving: "llm" generates every question; "bank" samples curated questions
+    # from the in-memory question bank and only calls the LLM for resume-tailored
+    # questions or when the (role, skill, difficulty) buckets are empty
+    QUESTION_SERVING_MODE: str = "llm"
+    # Generate each session's next question in the background while the candidate answers.
+    # Off by default: every delivered question costs one speculative LLM call, wasted
+    # on the last turn or when the next request changes difficulty or lands elsewhere
+    PREFETCH_NEXT_QUESTION: bool = False
+    PREFETCH_MAX_SESSIONS: int = 1024
+
+    # Session state (last question, asked questions, resume, transcript), per worker
+    SESSION_MAX_SESSIONS: int = 10000
+    SESSION_TTL_SECONDS: int = 7200
+    # "No resume" lookups are re-checked after this long, in case another worker took the upload
+    SESSION_RESUME_MISS_TTL_SECONDS: int = 30
+    # Write transcripts behind to interviews.transcript every flush interval. Off until
+    # session ids are interviews row ids; non-uuid session ids are never written.
+    SESSION_PERSIST_TRANSCRIPTS: bool = False
+    SESSION_FLUSH_INTERVAL_SECONDS: float = 5.0
     
     # Embedding Model Configuration
     EMBEDDING_MODEL_NAME: str = "all-MiniLM-L6-v2"
     EMBEDDING_MODEL_PATH: str = "embedding/"
 
+    # Query-embedding cache (EMBEDDING_CACHE_DIR="" keeps it memory-only)
+    EMBEDDING_CACHE_SIZE: int = 4096
+    EMBEDDING_CACHE_TTL_SECONDS: int = 86400
+    EMBEDDING_CACHE_DIR: str = "embedding_cache/"
+
     # LLM Model Configuration
     GEMINI_MODEL: str = "gemini-2.5-flash"
 
+    # Concurrency
+    DB_THREADPOOL_SIZE: int = 8  # max blocking Supabase calls in flight per worker
+    PDF_WORKERS: int = min(4, os.cpu_count() or 1)  # processes extracting resume text per worker
+
+    # Resume uploads: larger files are rejected with 413; PDFs with at least
+    # PDF_PARALLEL_MIN_PAGES pages are extracted as page ranges across PDF_WORKERS
+    RESUME_MAX_BYTES: int = 10 * 1024 * 1024
+    RESUME_MAX_PAGES: int = 50
+    PDF_PARALLEL_MIN_PAGES: int = 16
+
     class Config:
         env_file = ".env"
         extra = "allow"
@@ -0,0 +1,26 @@
+import threading
+
+# -----------------------------
+# In-process metrics registry
+# -----------------------------
+# Counters only ever go up (cache hits, prefetch misses, ...); gauges hold the
+# latest observed value (cold-start seconds, cache sizes, ...). Values are
+# per worker process and exposed as JSON on GET /metrics.
+_lock = threading.Lock()
+_counters: dict[str, float] = {}
+_gauges: dict[str, float] = {}
+
+
+def inc(name: str, value: float = 1) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def set_gauge(name: str, value: float) -> None:
+    with _lock:
+        _gauges[name] = value
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {"counters": dict(_counters), "gauges": dict(_gauges)}
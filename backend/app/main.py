@@ -1,7 +1,34 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from app.core import metrics
 from app.routers import chat_router, resume_router
+from app.services.embedding_service import flush_embedding_caches, warm_up_embedding_model
+from app.services.pdf_service import get_pdf_executor, shutdown_pdf_executor
+from app.services.rag_service import RAGService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Preload shared services once per worker instead of once per request.
+    get_pdf_executor()
+    warm_up_embedding_model()
+    app.state.rag_service = RAGService()
+    app.state.rag_service.sessions.start()
+    yield
+    if app.state.rag_service.prefetcher is not None:
+        app.state.rag_service.prefetcher.close()
+    await app.state.rag_service.sessions.close()
+    shutdown_pdf_executor()
+    flush_embedding_caches()
 
-app = FastAPI(title="Modular AI Interviewer Backend")
+
+app = FastAPI(title="Modular AI Interviewer Backend", lifespan=lifespan)
 
 app.include_router(chat_router.router, prefix="/api/v1/chat")
 app.include_router(resume_router.router, prefix="/api/v1/resume")
+
+
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends
+import json
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
 from app.models.request_models import ChatRequest
 from app.services.rag_service import RAGService
 
 router = APIRouter()
 
-def get_rag_service():
-    return RAGService()
+def get_rag_service(request: Request) -> RAGService:
+    # Built once in the app lifespan and shared across requests
+    return request.app.state.rag_service
 
 @router.post("/")
 async def chat(request: ChatRequest, rag_service: RAGService = Depends(get_rag_service)):
@@ -17,3 +20,29 @@ async def chat(request: ChatRequest, rag_service: RAGService = Depends(get_rag_s
         answer=request.answer   # pass candidate answer if provided
     )
     return {"response": response}
+
+
+@router.post("/stream")
+async def chat_stream(request: ChatRequest, rag_service: RAGService = Depends(get_rag_service)):
+    """
+    Same contract as chat(), streamed as Server-Sent Events: one `token` event
+    per generated chunk, then a `final` event with the structured result.
+    """
+    async def event_stream():
+        try:
+            async for event in rag_service.stream_response(
+                role=request.role,
+                tech_stack=request.tech_stack,
+                difficulty=request.difficulty,
+                session_id=request.session_id,
+                answer=request.answer
+            ):
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'type': 'error', 'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,24 +1,105 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-import fitz  # PyMuPDF
+import os
+import tempfile
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request
+from fastapi.routing import APIRoute
+from app.core.config import settings
 from app.services.db_service import get_supabase_service
+from app.services.pdf_service import PDFLimitError, PDFParseError, extract_pdf_text
+from app.services.session_store import get_session_store
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Room for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Resume is larger than {max_bytes} bytes")
+
+
+class UploadLimitRoute(APIRoute):
+    """
+    Caps the request body at RESUME_MAX_BYTES (plus multipart overhead) before
+    FastAPI parses the form, since parsing spools the whole body first. Bodies
+    with a larger Content-Length are rejected without being read; chunked
+    bodies are cut off with 413 as soon as they pass the limit.
+    """
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request):
+            max_body = settings.RESUME_MAX_BYTES + MULTIPART_OVERHEAD_BYTES
+            length = request.headers.get("content-length")
+            if length is not None and length.isdigit() and int(length) > max_body:
+                raise _too_large(settings.RESUME_MAX_BYTES)
+
+            received = 0
+
+            async def receive():
+                nonlocal received
+                message = await request.receive()
+                if message["type"] == "http.request":
+                    received += len(message.get("body", b""))
+                    if received > max_body:
+                        raise _too_large(settings.RESUME_MAX_BYTES)
+                return message
+
+            return await handler(Request(request.scope, receive))
+
+        return limited_handler
+
+
+router = APIRouter(route_class=UploadLimitRoute)
+
+
+async def _save_upload(file: UploadFile, max_bytes: int) -> str:
+    """
+    Copies the (already size-capped) upload to a named temp file in chunks, so
+    memory stays bounded and PDF workers can open it by path. Raises 413 if the
+    file part itself is over max_bytes.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)
+    tmp = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+    try:
+        with tmp:
+            written = 0
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise _too_large(max_bytes)
+                tmp.write(chunk)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+    return tmp.name
 
-router = APIRouter()
 
 @router.post("/upload")
 async def upload_resume(file: UploadFile = File(...)):
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF resumes are supported")
 
-    pdf_bytes = await file.read()
-    doc = fitz.open("pdf", pdf_bytes)
-    text = "\n".join([page.get_text() for page in doc])
+    path = await _save_upload(file, settings.RESUME_MAX_BYTES)
+    try:
+        # Parsed in the PDF process pool; the event loop keeps serving other requests
+        text = await extract_pdf_text(path, settings.RESUME_MAX_PAGES)
+    except PDFLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except PDFParseError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        os.unlink(path)
 
     # Store in Supabase
-    supabase = get_supabase_service().get_client()
+    supabase_service = get_supabase_service()
     session_id = file.filename.split(".")[0]  # use filename as ID for now
-    supabase.table("resumes").upsert({
-        "session_id": session_id,
-        "resume_text": text
-    }).execute()
+    await supabase_service.execute(
+        supabase_service.get_client().table("resumes").upsert({
+            "session_id": session_id,
+            "resume_text": text
+        })
+    )
+    # Questions for this session are tailored to the new resume from now on
+    get_session_store().set_resume(session_id, text)
 
     return {"message": "Resume uploaded & parsed", "session_id": session_id}
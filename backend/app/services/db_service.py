@@ -1,8 +1,13 @@
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pinecone import ServerlessSpec
 from langchain_pinecone import PineconeVectorStore
-from langchain_huggingface import HuggingFaceEmbeddings
 from app.core.config import settings
+from app.services.embedding_service import get_embedding_model
+from app.services.local_index import LocalVectorIndex
+from app.services.lexical_index import BM25Index
+from app.services.question_bank import QuestionBank
 
 # Supabase client
 from supabase import create_client, Client
@@ -14,7 +19,7 @@ from supabase import create_client, Client
 class PineconeService:
     def __init__(self, namespace: str = "question"):
         try:
-            self.embedding_model = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL_NAME)
+            self.embedding_model = get_embedding_model()
             self.index_name = settings.PINECONE_INDEX_NAME
             self.namespace = namespace
         except Exception as e:
@@ -31,9 +36,9 @@ class PineconeService:
         except Exception as e:
             raise RuntimeError(f"Error creating PineconeVectorStore: {e}")
 
-    def get_retriever(self):
+    def get_retriever(self, k: int = 4):
         try:
-            return self._get_vectorstore().as_retriever()
+            return self._get_vectorstore().as_retriever(search_kwargs={"k": k})
         except Exception as e:
             raise RuntimeError(f"Error getting Pinecone retriever: {e}")
 
@@ -53,19 +58,95 @@ class SupabaseService:
     def get_client(self):
         return self.supabase
 
+    async def execute(self, query):
+        """
+        Runs a Supabase query builder's blocking execute() on the bounded
+        database thread pool so it does not stall the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_db_executor, query.execute)
+
 
 # -----------------------------
 # Singleton Instances
 # -----------------------------
-_pinecone_service: PineconeService | None = None
+_pinecone_services: dict[str, PineconeService] = {}
 _supabase_service: SupabaseService | None = None
+_local_index: LocalVectorIndex | None = None
+_lexical_index: BM25Index | None = None
+_question_bank: QuestionBank | None = None
+
+# Shared pool for blocking Supabase calls; its size caps concurrent DB round-trips.
+_db_executor = ThreadPoolExecutor(
+    max_workers=settings.DB_THREADPOOL_SIZE,
+    thread_name_prefix="supabase"
+)
 
 
 def get_pinecone_service(namespace: str = "question") -> PineconeService:
-    global _pinecone_service
-    if _pinecone_service is None or _pinecone_service.namespace != namespace:
-        _pinecone_service = PineconeService(namespace=namespace)
-    return _pinecone_service
+    # One service per namespace; all of them share the same embedding model.
+    if namespace not in _pinecone_services:
+        _pinecone_services[namespace] = PineconeService(namespace=namespace)
+    return _pinecone_services[namespace]
+
+
+def get_local_index() -> LocalVectorIndex:
+    global _local_index
+    if _local_index is None:
+        try:
+            if os.path.exists(os.path.join(settings.EMBEDDING_STORE_DIR, "CURRENT")):
+                index = LocalVectorIndex.from_store(settings.EMBEDDING_STORE_DIR)
+                if index.model_name != settings.EMBEDDING_MODEL_NAME:
+                    raise RuntimeError(
+                        f"embedding store was built with {index.model_name}, "
+                        f"not {settings.EMBEDDING_MODEL_NAME}; re-run ingest.py"
+                    )
+            else:
+                index = LocalVectorIndex.from_corpus(settings.QUESTION_BANK_DIR, get_embedding_model())
+        except Exception as e:
+            raise RuntimeError(f"Error building local vector index: {e}")
+        # Only a validated index is shared; a failed load is retried on the next call
+        _local_index = index
+    return _local_index
+
+
+def get_lexical_index() -> BM25Index:
+    """
+    BM25 index over the same records as the vector backend: the local index's
+    rows when that backend is active, otherwise the embedding store written by
+    the ingest run that filled Pinecone (QUESTION_BANK_DIR only without one).
+    """
+    global _lexical_index
+    if _lexical_index is None:
+        try:
+            if settings.VECTOR_BACKEND == "local":
+                _lexical_index = BM25Index.from_vector_index(get_local_index())
+            elif os.path.exists(os.path.join(settings.EMBEDDING_STORE_DIR, "CURRENT")):
+                _lexical_index = BM25Index.from_vector_index(LocalVectorIndex.from_store(settings.EMBEDDING_STORE_DIR))
+            else:
+                _lexical_index = BM25Index.from_corpus(settings.QUESTION_BANK_DIR)
+        except Exception as e:
+            raise RuntimeError(f"Error building lexical index: {e}")
+    return _lexical_index
+
+
+def get_question_bank() -> QuestionBank:
+    global _question_bank
+    if _question_bank is None:
+        try:
+            _question_bank = QuestionBank.from_corpus(settings.QUESTION_BANK_DIR)
+        except Exception as e:
+            raise RuntimeError(f"Error building question bank: {e}")
+    return _question_bank
+
+
+def get_retriever():
+    """Question retriever for the configured VECTOR_BACKEND."""
+    if settings.VECTOR_BACKEND == "local":
+        return get_local_index().as_retriever(get_embedding_model(), k=settings.RETRIEVAL_TOP_K)
+    if settings.VECTOR_BACKEND == "pinecone":
+        return get_pinecone_service().get_retriever(k=settings.RETRIEVAL_TOP_K)
+    raise RuntimeError(f"Unknown VECTOR_BACKEND: {settings.VECTOR_BACKEND}")
 
 
 def get_supabase_service() -> SupabaseService:
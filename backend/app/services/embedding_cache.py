@@ -0,0 +1,231 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import itertools
+import threading
+from collections import OrderedDict
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from app.core import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to one directory per process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(text: str) -> str:
+    """Collapses whitespace so trivially different prompts share one entry."""
+    return " ".join(text.split())
+
+
+# cache_key() is a SHA-1 hex digest; its raw bytes are stored next to each disk row
+KEY_BYTES = 20
+
+
+def cache_key(model_name: str, text: str) -> str:
+    return hashlib.sha1(f"{model_name}\0{normalize_query(text)}".encode("utf-8")).hexdigest()
+
+
+# -----------------------------
+# On-disk tier
+# -----------------------------
+class DiskVectorCache:
+    """
+    Fixed-capacity ring of float32 vectors in a memory-mapped file plus a JSON
+    index of key -> (row, written_at). Survives restarts; when full, the oldest
+    row is overwritten. Each row also stores the digest of its key, checked on
+    read, so a stale index can never return another text's vector.
+
+    Every instance (uvicorn worker, model) owns one worker-<n> subdirectory,
+    claimed with an exclusive lock held for the life of the process, so
+    processes sharing EMBEDDING_CACHE_DIR never write to each other's rows;
+    a restarted worker reclaims a free slot and its vectors.
+    """
+    def __init__(self, directory: str, capacity: int, flush_every: int = 32):
+        self.capacity = capacity
+        self.flush_every = flush_every
+        self._vectors = None
+        self._keys = None
+        self._index: dict[str, list] = {}
+        self._rows: list[str | None] = [None] * capacity
+        self._next_row = 0
+        self._dirty = 0
+        self._lock_file = None
+        self.directory = self._claim_slot(directory)
+        self._index_path = os.path.join(self.directory, "index.json")
+        self._vectors_path = os.path.join(self.directory, "vectors.f32")
+        self._keys_path = os.path.join(self.directory, "keys.bin")
+        self._load_index()
+
+    def _claim_slot(self, directory: str) -> str:
+        if fcntl is None:
+            path = os.path.join(directory, f"pid-{os.getpid()}")
+            os.makedirs(path, exist_ok=True)
+            return path
+        for slot in itertools.count():
+            path = os.path.join(directory, f"worker-{slot}")
+            os.makedirs(path, exist_ok=True)
+            lock_file = open(os.path.join(path, "lock"), "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue
+            self._lock_file = lock_file  # released when the process exits
+            return path
+
+    def _load_index(self):
+        if not os.path.exists(self._index_path):
+            return
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state["capacity"] != self.capacity:
+                logger.warning("Embedding disk cache capacity changed; starting empty")
+                return
+            self._open_vectors(state["dim"])
+            self._index = state["entries"]
+            self._next_row = state["next_row"]
+            for key, (row, _) in self._index.items():
+                self._rows[row] = key
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable embedding disk cache: %s", e)
+            self._index = {}
+
+    def _open_vectors(self, dim: int):
+        exists = os.path.exists(self._vectors_path) and os.path.exists(self._keys_path)
+        mode = "r+" if exists else "w+"
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode=mode, shape=(self.capacity, dim))
+        self._keys = np.memmap(self._keys_path, dtype=np.uint8, mode=mode, shape=(self.capacity, KEY_BYTES))
+
+    def get(self, key: str, ttl_seconds: float):
+        entry = self._index.get(key)
+        if entry is None or self._vectors is None:
+            return None
+        row, written_at = entry
+        if time.time() - written_at > ttl_seconds:
+            return None
+        if self._keys[row].tobytes() != bytes.fromhex(key):
+            # The row was overwritten after this index entry was saved
+            self._index.pop(key, None)
+            metrics.inc("embedding_cache_disk_key_mismatches")
+            return None
+        return self._vectors[row].tolist()
+
+    def put(self, key: str, vector: list[float]):
+        if self._vectors is None:
+            self._open_vectors(len(vector))
+        row = self._index[key][0] if key in self._index else self._next_row
+        if key not in self._index:
+            evicted = self._rows[row]
+            if evicted is not None:
+                self._index.pop(evicted, None)
+            self._rows[row] = key
+            self._next_row = (self._next_row + 1) % self.capacity
+        self._vectors[row] = vector
+        self._keys[row] = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+        self._index[key] = [row, time.time()]
+        self._dirty += 1
+        if self._dirty >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._vectors is None or not self._dirty:
+            return
+        self._vectors.flush()
+        self._keys.flush()
+        state = {
+            "capacity": self.capacity,
+            "dim": self._vectors.shape[1],
+            "next_row": self._next_row,
+            "entries": self._index
+        }
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._index_path)
+        self._dirty = 0
+
+
+# -----------------------------
+# Cached Embeddings wrapper
+# -----------------------------
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings object with an LRU/TTL cache of query vectors keyed by
+    (model name, normalized text), optionally backed by a DiskVectorCache.
+    Document embedding is passed straight through (ingestion, not serving).
+    """
+    def __init__(self, inner: Embeddings, model_name: str, max_entries: int = 4096,
+                 ttl_seconds: float = 86400, disk_dir: str | None = None):
+        self.inner = inner
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: OrderedDict[str, tuple[list[float], float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = DiskVectorCache(disk_dir, capacity=max_entries * 4) if disk_dir else None
+
+    def _lookup(self, key: str):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                vector, expires_at = entry
+                if expires_at > time.time():
+                    self._memory.move_to_end(key)
+                    metrics.inc("embedding_cache_hits")
+                    return vector
+                del self._memory[key]
+            if self._disk is not None:
+                vector = self._disk.get(key, self.ttl_seconds)
+                if vector is not None:
+                    self._remember(key, vector)
+                    metrics.inc("embedding_cache_disk_hits")
+                    return vector
+        metrics.inc("embedding_cache_misses")
+        return None
+
+    def _remember(self, key: str, vector: list[float]):
+        self._memory[key] = (vector, time.time() + self.ttl_seconds)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+        metrics.set_gauge("embedding_cache_entries", len(self._memory))
+
+    def _store(self, key: str, vector: list[float]):
+        with self._lock:
+            self._remember(key, vector)
+            if self._disk is not None:
+                self._disk.put(key, vector)
+
+    def embed_query(self, text: str) -> list[float]:
+        key = cache_key(self.model_name, text)
+        vector = self._lookup(key)
+        if vector is None:
+            vector = self.inner.embed_query(text)
+            self._store(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = cache_key(self.model_name, text)
+        vector = self._lookup(key)
+        if vector is None:
+            vector = await self.inner.aembed_query(text)
+            self._store(key, vector)
+        return vector
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.inner.embed_documents(texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self.inner.aembed_documents(texts)
+
+    def flush(self):
+        with self._lock:
+            if self._disk is not None:
+                self._disk.flush()
@@ -0,0 +1,79 @@
+import os
+import time
+import logging
+import threading
+from langchain_huggingface import HuggingFaceEmbeddings
+from app.core.config import settings
+from app.core import metrics
+from app.services.embedding_cache import CachedEmbeddings
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Embedding Model Registry
+# -----------------------------
+# One HuggingFaceEmbeddings instance per model name for the whole process,
+# wrapped in a query-vector cache. Every PineconeService namespace and vector
+# store shares it, so the model weights are loaded exactly once per worker.
+_models: dict[str, CachedEmbeddings] = {}
+_lock = threading.Lock()
+
+
+def _is_local_model_dir(path: str) -> bool:
+    """True if `path` is a saved SentenceTransformer folder (offline load)."""
+    return os.path.isdir(path) and os.path.isfile(os.path.join(path, "modules.json"))
+
+
+def _load_model(model_name: str) -> HuggingFaceEmbeddings:
+    start = time.perf_counter()
+    if _is_local_model_dir(settings.EMBEDDING_MODEL_PATH):
+        logger.info("Loading embedding model from local path %s", settings.EMBEDDING_MODEL_PATH)
+        model = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL_PATH)
+    else:
+        # Download once into EMBEDDING_MODEL_PATH; later starts reuse the cache.
+        logger.info("Loading embedding model %s (cache: %s)", model_name, settings.EMBEDDING_MODEL_PATH)
+        model = HuggingFaceEmbeddings(model_name=model_name, cache_folder=settings.EMBEDDING_MODEL_PATH)
+    elapsed = time.perf_counter() - start
+    metrics.set_gauge("embedding_model_load_seconds", elapsed)
+    logger.info("Embedding model ready in %.2fs", elapsed)
+    return model
+
+
+def get_embedding_model(model_name: str | None = None) -> CachedEmbeddings:
+    model_name = model_name or settings.EMBEDDING_MODEL_NAME
+    model = _models.get(model_name)
+    if model is None:
+        with _lock:
+            model = _models.get(model_name)
+            if model is None:
+                try:
+                    model = CachedEmbeddings(
+                        _load_model(model_name),
+                        model_name=model_name,
+                        max_entries=settings.EMBEDDING_CACHE_SIZE,
+                        ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS,
+                        disk_dir=settings.EMBEDDING_CACHE_DIR or None
+                    )
+                except Exception as e:
+                    raise RuntimeError(f"Error loading embedding model '{model_name}': {e}")
+                _models[model_name] = model
+    return model
+
+
+def warm_up_embedding_model(model_name: str | None = None) -> None:
+    """
+    Loads the model and runs one encode so the first user request does not pay
+    for lazy initialisation (tokenizer, weights paging, thread pools).
+    """
+    start = time.perf_counter()
+    # Straight to the model: a query-cache hit would skip the forward pass
+    get_embedding_model(model_name).inner.embed_query("warm up")
+    elapsed = time.perf_counter() - start
+    metrics.set_gauge("embedding_cold_start_seconds", elapsed)
+    logger.info("Embedding cold start (load + warm-up encode) took %.2fs", elapsed)
+
+
+def flush_embedding_caches() -> None:
+    """Persists pending on-disk cache entries; called on app shutdown."""
+    for model in _models.values():
+        model.flush()
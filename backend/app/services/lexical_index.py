@@ -0,0 +1,133 @@
+import re
+import time
+import logging
+import numpy as np
+from langchain_core.documents import Document
+
+from app.services.local_index import FILTER_FIELDS, LocalVectorIndex, column_mask, load_question_corpus
+
+logger = logging.getLogger(__name__)
+
+# Keeps skill spellings such as "c++", "c#" together; "kdb/q" becomes "kdb", "q".
+_TOKEN = re.compile(r"[a-z0-9]+[+#]*")
+STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "of", "in", "on", "for", "to", "and", "or", "what", "how",
+    "do", "does", "you", "your", "it", "its", "be", "can", "with", "by", "as", "at", "this", "that",
+    "question", "answer", "questions", "interview", "generate", "using",
+})
+
+# Reciprocal-rank fusion constant from Cormack et al.; damps the weight of top ranks.
+RRF_K = 60
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+# -----------------------------
+# BM25 Inverted Index
+# -----------------------------
+class BM25Index:
+    """
+    Okapi BM25 over the question bank with CSR postings: for term t,
+    doc_ids[indptr[t]:indptr[t + 1]] are the rows containing it (ascending) and
+    tfs the matching term frequencies. Scoring a query touches only the
+    postings of its terms. Rows carry the same dictionary-encoded
+    role/skill/difficulty columns as LocalVectorIndex, so the same filters apply.
+    """
+    def __init__(self, texts, columns: dict[str, tuple[list[str], np.ndarray]], k1: float = 1.2, b: float = 0.75):
+        start = time.perf_counter()
+        self.texts = texts
+        self.values = {field: values for field, (values, _) in columns.items()}
+        self.columns = {field: codes for field, (_, codes) in columns.items()}
+        self.vocab = {field: {v: i for i, v in enumerate(values)} for field, values in self.values.items()}
+
+        self.terms: dict[str, int] = {}
+        term_ids, doc_ids, tfs = [], [], []
+        doc_len = np.zeros(len(texts), dtype=np.float32)
+        for row in range(len(texts)):
+            counts: dict[int, int] = {}
+            tokens = tokenize(texts[row])
+            for token in tokens:
+                term = self.terms.setdefault(token, len(self.terms))
+                counts[term] = counts.get(term, 0) + 1
+            doc_len[row] = len(tokens)
+            term_ids.extend(counts)
+            doc_ids.extend([row] * len(counts))
+            tfs.extend(counts.values())
+
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        order = np.argsort(term_ids, kind="stable")  # stable keeps rows ascending within a term
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int32)[order]
+        self.tfs = np.asarray(tfs, dtype=np.float32)[order]
+        df = np.bincount(term_ids, minlength=len(self.terms))
+        self.indptr = np.concatenate(([0], np.cumsum(df))).astype(np.int64)
+
+        n = max(len(texts), 1)
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avgdl = float(doc_len.mean()) if len(texts) else 1.0
+        self.k1 = k1
+        # Per-row length normalisation k1 * (1 - b + b * |d| / avgdl), precomputed once
+        self.norm = (k1 * (1 - b + b * doc_len / (avgdl or 1.0))).astype(np.float32)
+        logger.info("Built BM25 index of %d rows, %d terms, %d postings in %.2fs",
+                    len(texts), len(self.terms), len(self.doc_ids), time.perf_counter() - start)
+
+    @classmethod
+    def from_vector_index(cls, index: LocalVectorIndex) -> "BM25Index":
+        """Indexes the same rows (and filter columns) as a LocalVectorIndex."""
+        return cls(index.texts, {field: (index.values[field], index.columns[field]) for field in FILTER_FIELDS})
+
+    @classmethod
+    def from_corpus(cls, directory: str) -> "BM25Index":
+        records = load_question_corpus(directory)
+        columns = {field: LocalVectorIndex.encode_column(r[field] for r in records) for field in FILTER_FIELDS}
+        return cls([r["page_content"] for r in records], columns)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def search(self, query: str, k: int = 4, metadata_filter: dict | None = None) -> list[tuple[int, float]]:
+        """Returns up to k (row, BM25 score) pairs with a positive score, best first."""
+        scores = np.zeros(len(self), dtype=np.float32)
+        for token in set(tokenize(query)):
+            term = self.terms.get(token)
+            if term is None:
+                continue
+            lo, hi = self.indptr[term], self.indptr[term + 1]
+            rows, tf = self.doc_ids[lo:hi], self.tfs[lo:hi]
+            scores[rows] += self.idf[term] * tf * (self.k1 + 1) / (tf + self.norm[rows])
+
+        mask = column_mask(self.columns, self.vocab, metadata_filter, len(self))
+        if mask is not None:
+            scores[~mask] = 0
+        candidates = np.flatnonzero(scores > 0)
+        if candidates.size == 0:
+            return []
+        k = min(k, candidates.size)
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def to_document(self, row: int) -> Document:
+        metadata = {field: self.values[field][self.columns[field][row]] for field in self.columns}
+        return Document(page_content=self.texts[row], metadata=metadata)
+
+    def get_documents(self, query: str, k: int = 4, metadata_filter: dict | None = None) -> list[Document]:
+        return [self.to_document(row) for row, _ in self.search(query, k, metadata_filter)]
+
+
+def reciprocal_rank_fusion(rankings: list[list[Document]], limit: int, k: int = RRF_K) -> list[Document]:
+    """
+    Fuses ranked document lists by summing 1 / (k + rank) per document, matching
+    documents across lists by page_content. The first list's copy of a document
+    is kept, so vector-store metadata wins over the lexical index's.
+    """
+    scores: dict[str, float] = {}
+    documents: dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, document in enumerate(ranking, 1):
+            key = document.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            documents.setdefault(key, document)
+    best = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [documents[key] for key in best]
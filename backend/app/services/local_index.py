@@ -0,0 +1,216 @@
+import os
+import json
+import asyncio
+import mmap
+import time
+import logging
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+logger = logging.getLogger(__name__)
+
+# Metadata fields usable in retrieval filters, stored as columnar code arrays.
+FILTER_FIELDS = ("role", "skill", "difficulty")
+
+# On-disk embedding store written by scripts/ingest.py. Layout:
+#   <store>/CURRENT                    name of the active version directory
+#   <store>/<version>/embeddings.npy   (n, dim) float32, L2-normalized rows
+#   <store>/<version>/texts.bin        UTF-8 page_content of every row, concatenated
+#   <store>/<version>/metadata.json    ids, dictionary-encoded role/skill/difficulty
+#                                      columns and n+1 byte offsets into texts.bin
+STORE_FORMAT_VERSION = 1
+
+
+def load_question_corpus(directory: str) -> list[dict]:
+    """
+    Reads every *_refined.json file in `directory` into records shaped like the
+    vectors ingest.py upserts to Pinecone: {"page_content": ..., **metadata}.
+    """
+    records = []
+    for file_name in sorted(os.listdir(directory)):
+        if not file_name.endswith("_refined.json"):
+            continue
+        with open(os.path.join(directory, file_name), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        role_name = file_name.replace("_refined.json", "").replace("_", " ")
+
+        for entry in data:
+            q = (entry.get("refined_question") or "").strip()
+            a = (entry.get("answer") or "").strip()
+            if not q or q.lower() == "not a valid question":
+                continue
+            records.append({
+                "page_content": f"Question: {q}\nAnswer: {a}",
+                "role": entry.get("role", role_name),
+                "skill": entry.get("skill", "N/A"),
+                "difficulty": entry.get("difficulty", "N/A"),
+                "source": entry.get("source", ""),
+                "original_question": entry.get("original_question", ""),
+                "answer": a
+            })
+    return records
+
+
+def column_mask(columns: dict[str, np.ndarray], vocab: dict[str, dict[str, int]],
+                metadata_filter: dict | None, n: int) -> np.ndarray | None:
+    """
+    Boolean mask over n rows of dictionary-encoded columns for a Pinecone-style
+    filter ({"role": x, "skill": {"$in": [...]}}); None means no filtering.
+    """
+    if not metadata_filter:
+        return None
+    mask = np.ones(n, dtype=bool)
+    for field, condition in metadata_filter.items():
+        if field not in columns:
+            raise ValueError(f"Unsupported filter field for local index: {field}")
+        values = condition["$in"] if isinstance(condition, dict) else [condition]
+        codes = [vocab[field][v] for v in map(str, values) if v in vocab[field]]
+        mask &= np.isin(columns[field], codes)
+    return mask
+
+
+class TextBlob:
+    """Read-only sequence of strings backed by a memory-mapped UTF-8 blob and offsets."""
+    def __init__(self, path: str, offsets: np.ndarray):
+        self.offsets = offsets
+        with open(path, "rb") as f:
+            # mmap of an empty file is an error; an empty store has no rows anyway.
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else b""
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> str:
+        return self._buffer[self.offsets[row]:self.offsets[row + 1]].decode("utf-8")
+
+
+# -----------------------------
+# Local Vector Index
+# -----------------------------
+class LocalVectorIndex:
+    """
+    In-process replacement for the Pinecone question index.
+
+    Holds an (n, dim) float32 matrix of L2-normalized embeddings, so a dot
+    product is cosine similarity. Filter fields are dictionary-encoded into
+    int32 columns; a Pinecone-style filter ({"role": x, "skill": {"$in": [...]}})
+    becomes a vectorized boolean mask applied before the top-k selection.
+    """
+    def __init__(self, vectors: np.ndarray, texts, columns: dict[str, tuple[list[str], np.ndarray]],
+                 ids=None, model_name: str | None = None):
+        if len(vectors) != len(texts):
+            raise ValueError("vectors and texts must have the same length")
+        self.vectors = vectors
+        self.texts = texts
+        self.ids = ids
+        self.model_name = model_name
+        self.values = {field: values for field, (values, _) in columns.items()}
+        self.columns = {field: codes for field, (_, codes) in columns.items()}
+        self.vocab = {field: {v: i for i, v in enumerate(values)} for field, values in self.values.items()}
+
+    @staticmethod
+    def encode_column(values) -> tuple[list[str], np.ndarray]:
+        vocab: dict[str, int] = {}
+        codes = np.fromiter((vocab.setdefault(str(v), len(vocab)) for v in values), dtype=np.int32)
+        return list(vocab), codes
+
+    @classmethod
+    def from_corpus(cls, directory: str, embedding_model: Embeddings, batch_size: int = 256) -> "LocalVectorIndex":
+        """Embeds the raw question bank; slow, used when no embedding store exists."""
+        start = time.perf_counter()
+        records = load_question_corpus(directory)
+        texts = [r["page_content"] for r in records]
+        chunks = [embedding_model.embed_documents(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        vectors = np.asarray([v for chunk in chunks for v in chunk], dtype=np.float32).reshape(len(texts), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+        columns = {field: cls.encode_column(r[field] for r in records) for field in FILTER_FIELDS}
+        logger.info("Built local index of %d questions in %.1fs", len(records), time.perf_counter() - start)
+        return cls(vectors, texts, columns)
+
+    @classmethod
+    def from_store(cls, store_dir: str) -> "LocalVectorIndex":
+        """Memory-maps the active version of an ingest.py embedding store."""
+        start = time.perf_counter()
+        with open(os.path.join(store_dir, "CURRENT"), "r", encoding="utf-8") as f:
+            version_dir = os.path.join(store_dir, f.read().strip())
+        with open(os.path.join(version_dir, "metadata.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["format_version"] != STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported embedding store format {meta['format_version']}")
+
+        vectors = np.load(os.path.join(version_dir, "embeddings.npy"), mmap_mode="r")
+        texts = TextBlob(os.path.join(version_dir, "texts.bin"), np.asarray(meta["offsets"], dtype=np.int64))
+        columns = {
+            field: (meta["columns"][field]["values"], np.asarray(meta["columns"][field]["codes"], dtype=np.int32))
+            for field in FILTER_FIELDS
+        }
+        index = cls(vectors, texts, columns, ids=meta["ids"], model_name=meta["model"])
+        logger.info("Mapped embedding store %s (%d vectors) in %.3fs",
+                    version_dir, len(index), time.perf_counter() - start)
+        return index
+
+    def __len__(self):
+        return len(self.texts)
+
+    def metadata(self, row: int) -> dict:
+        metadata = {field: self.values[field][self.columns[field][row]] for field in self.columns}
+        if self.ids is not None:
+            metadata["id"] = self.ids[row]
+        return metadata
+
+    def mask(self, metadata_filter: dict | None) -> np.ndarray | None:
+        """Boolean row mask for a Pinecone-style filter; None means no filtering."""
+        return column_mask(self.columns, self.vocab, metadata_filter, len(self))
+
+    def search(self, query_vector, k: int = 4, metadata_filter: dict | None = None) -> list[tuple[int, float]]:
+        """Returns up to k (row, cosine score) pairs, best first."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        mask = self.mask(metadata_filter)
+        if mask is None:
+            rows = None
+            scores = self.vectors @ query
+        else:
+            rows = np.flatnonzero(mask)
+            if rows.size == 0:
+                return []
+            scores = self.vectors[rows] @ query
+
+        k = min(k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        if rows is not None:
+            return [(int(rows[i]), float(scores[i])) for i in top]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def to_document(self, row: int) -> Document:
+        return Document(page_content=self.texts[row], metadata=self.metadata(row))
+
+    def as_retriever(self, embedding_model: Embeddings, k: int = 4) -> "LocalRetriever":
+        return LocalRetriever(index=self, embedding_model=embedding_model, k=k)
+
+
+class LocalRetriever(BaseRetriever):
+    """Drop-in for the Pinecone VectorStoreRetriever; accepts the same `filter` kwarg."""
+    index: LocalVectorIndex
+    embedding_model: Embeddings
+    k: int = 4
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun,
+                                filter: dict | None = None, **kwargs) -> list[Document]:
+        query_vector = self.embedding_model.embed_query(query)
+        return [self.index.to_document(row) for row, _ in self.index.search(query_vector, self.k, filter)]
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun,
+                                       filter: dict | None = None, **kwargs) -> list[Document]:
+        # RAGService awaits ainvoke(query, filter=...); the default async path drops `filter`
+        query_vector = await self.embedding_model.aembed_query(query)
+        hits = await asyncio.to_thread(self.index.search, query_vector, self.k, filter)
+        return [self.index.to_document(row) for row, _ in hits]
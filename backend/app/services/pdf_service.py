@@ -0,0 +1,99 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+from app.core.config import settings
+
+
+class PDFLimitError(Exception):
+    """The document exceeds a configured byte or page limit."""
+
+
+class PDFParseError(Exception):
+    """The upload is not a readable PDF."""
+
+
+# -----------------------------
+# Worker-side extraction
+# -----------------------------
+# These run in the PDF process pool. They take a file path rather than bytes
+# so uploads are never pickled across processes; each worker opens the file
+# itself and only reads the pages it extracts.
+def _open(path: str):
+    try:
+        return fitz.open(path, filetype="pdf")
+    except Exception:
+        # The message would name the temp file, not the upload
+        raise PDFParseError("Could not read the uploaded PDF") from None
+
+
+def _page_range_text(path: str, start: int, stop: int) -> str:
+    with _open(path) as doc:
+        return "\n".join(doc[i].get_text() for i in range(start, stop))
+
+
+def _extract_or_count(path: str, max_pages: int, parallel_min_pages: int) -> tuple[int, str | None]:
+    """
+    Checks the page limit, then extracts small documents in this call. For
+    documents of parallel_min_pages or more returns (page_count, None) so the
+    caller can fan page ranges out over the pool.
+    """
+    with _open(path) as doc:
+        page_count = doc.page_count
+        if page_count > max_pages:
+            raise PDFLimitError(f"PDF has {page_count} pages; the limit is {max_pages}")
+        if page_count >= parallel_min_pages:
+            return page_count, None
+        return page_count, "\n".join(page.get_text() for page in doc)
+
+
+_pdf_executor: ProcessPoolExecutor | None = None
+
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    """
+    The PDF process pool; created in the app lifespan. Workers are spawned, not
+    forked: the server process already runs threads (DB pool, torch) and a
+    forked child can inherit a lock held by one of them and deadlock.
+    """
+    global _pdf_executor
+    if _pdf_executor is None:
+        _pdf_executor = ProcessPoolExecutor(
+            max_workers=settings.PDF_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pdf_executor
+
+
+def shutdown_pdf_executor() -> None:
+    global _pdf_executor
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown(cancel_futures=True)
+        _pdf_executor = None
+
+
+async def extract_pdf_text(path: str, max_pages: int | None = None) -> str:
+    """
+    Extracts the text of the PDF at `path` in the PDF process pool, keeping the
+    event loop free. Documents of PDF_PARALLEL_MIN_PAGES or more are split into
+    one page range per worker. Raises PDFLimitError over the page limit and
+    PDFParseError for unreadable files.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_pdf_executor()
+    max_pages = settings.RESUME_MAX_PAGES if max_pages is None else max_pages
+
+    page_count, text = await loop.run_in_executor(
+        executor, _extract_or_count, path, max_pages, settings.PDF_PARALLEL_MIN_PAGES
+    )
+    if text is not None:
+        return text
+
+    chunks = max(1, min(settings.PDF_WORKERS, page_count))
+    bounds = [page_count * i // chunks for i in range(chunks + 1)]
+    parts = await asyncio.gather(*[
+        loop.run_in_executor(executor, _page_range_text, path, start, stop)
+        for start, stop in zip(bounds, bounds[1:])
+    ])
+    return "\n".join(parts)
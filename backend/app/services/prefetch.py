@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# Speculative Question Prefetch
+# -----------------------------
+class QuestionPrefetcher:
+    """
+    One speculative "next question" per session, generated in the background
+    while the candidate answers the current one. A slot is only served to a
+    request with the same key (role, tech stack, difficulty, ...); anything
+    else discards it. At most max_sessions slots are held, least recently
+    scheduled evicted first. Prefetches that finish or get cancelled without
+    being served are counted as wasted generations.
+    """
+    def __init__(self, max_sessions: int = 1024):
+        self.max_sessions = max_sessions
+        self._slots: OrderedDict[str, tuple[Hashable, asyncio.Task]] = OrderedDict()
+
+    def __len__(self):
+        return len(self._slots)
+
+    def schedule(self, session_id: str, key: Hashable, generate: Callable[[], Awaitable[str]]) -> None:
+        """Starts generating the session's next question, replacing any previous slot."""
+        self._discard(session_id)
+        task = asyncio.create_task(generate())
+        task.add_done_callback(self._log_failure)
+        self._slots[session_id] = (key, task)
+        metrics.inc("prefetch_scheduled")
+        while len(self._slots) > self.max_sessions:
+            self._discard(next(iter(self._slots)))
+        metrics.set_gauge("prefetch_slots", len(self._slots))
+
+    async def take(self, session_id: str, key: Hashable) -> str | None:
+        """
+        The prefetched question for this session and key, waiting for it if it
+        is still being generated; None on a miss, a key change or a failure.
+        """
+        slot = self._slots.pop(session_id, None)
+        metrics.set_gauge("prefetch_slots", len(self._slots))
+        question = None
+        if slot is not None and slot[0] != key:
+            metrics.inc("prefetch_invalidated")
+            self._waste(slot[1])
+        elif slot is not None:
+            try:
+                question = await slot[1]
+            except Exception:
+                question = None  # already logged by _log_failure
+
+        metrics.inc("prefetch_hits" if question else "prefetch_misses")
+        counters = metrics.snapshot()["counters"]
+        hits = counters.get("prefetch_hits", 0)
+        metrics.set_gauge("prefetch_hit_rate", hits / (hits + counters.get("prefetch_misses", 0)))
+        return question
+
+    def close(self) -> None:
+        """Cancels every pending prefetch (worker shutdown)."""
+        for session_id in list(self._slots):
+            self._discard(session_id)
+        metrics.set_gauge("prefetch_slots", 0)
+
+    def _discard(self, session_id: str) -> None:
+        slot = self._slots.pop(session_id, None)
+        if slot is not None:
+            self._waste(slot[1])
+
+    @staticmethod
+    def _waste(task: asyncio.Task) -> None:
+        task.cancel()
+        metrics.inc("prefetch_wasted")
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            metrics.inc("prefetch_failures")
+            logger.warning("Question prefetch failed: %s", task.exception())
@@ -0,0 +1,92 @@
+import random
+import hashlib
+import time
+import logging
+
+from app.services.local_index import load_question_corpus
+
+logger = logging.getLogger(__name__)
+
+# Redraws before a mostly-asked bucket counts as exhausted
+SAMPLE_ATTEMPTS = 8
+
+
+def bucket_key(role: str, skill: str, difficulty: str) -> tuple[str, str, str]:
+    return tuple((value or "").strip().casefold() for value in (role, skill, difficulty))
+
+
+def question_id(question: str) -> str:
+    """Stable id of a question's text, for remembering what a session was already asked."""
+    return hashlib.blake2b(" ".join(question.casefold().split()).encode("utf-8"), digest_size=8).hexdigest()
+
+
+# -----------------------------
+# Bucketed Question Bank
+# -----------------------------
+class QuestionBank:
+    """
+    Curated questions from the refined question bank, bucketed by
+    (role, skill, difficulty) in memory so a "next question" request is a dict
+    lookup plus a random index instead of a retrieval and an LLM call. Keys are
+    case-insensitive; question strings are stored once and shared by buckets.
+    """
+    def __init__(self, records):
+        start = time.perf_counter()
+        self.buckets: dict[tuple[str, str, str], list[str]] = {}
+        interned: dict[str, str] = {}
+        for record in records:
+            question = record["question"]
+            question = interned.setdefault(question, question)
+            key = bucket_key(record["role"], record["skill"], record["difficulty"])
+            self.buckets.setdefault(key, []).append(question)
+        logger.info("Built question bank of %d questions in %d buckets in %.2fs",
+                    len(interned), len(self.buckets), time.perf_counter() - start)
+
+    @classmethod
+    def from_corpus(cls, directory: str) -> "QuestionBank":
+        records = load_question_corpus(directory)
+        return cls(
+            {
+                "question": r["page_content"].split("\n", 1)[0].removeprefix("Question: "),
+                "role": r["role"],
+                "skill": r["skill"],
+                "difficulty": r["difficulty"],
+            }
+            for r in records
+        )
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.buckets.values())
+
+    def candidates(self, role: str, tech_stack: list[str], difficulty: str) -> list[list[str]]:
+        """Non-empty buckets for the role and difficulty, one per skill of the tech stack."""
+        buckets = []
+        for skill in dict.fromkeys(tech_stack):
+            bucket = self.buckets.get(bucket_key(role, skill, difficulty))
+            if bucket:
+                buckets.append(bucket)
+        return buckets
+
+    def sample(self, role: str, tech_stack: list[str], difficulty: str, exclude: set[str] | None = None,
+               rng: random.Random | None = None) -> str | None:
+        """
+        A uniformly random question across the tech stack's buckets whose
+        question_id() is not in `exclude`, or None when the buckets are empty or
+        SAMPLE_ATTEMPTS draws only hit excluded questions. Constant time per
+        skill: no copying or filtering.
+        """
+        buckets = self.candidates(role, tech_stack, difficulty)
+        if not buckets:
+            return None
+        rng = rng or random
+        total = sum(len(bucket) for bucket in buckets)
+        for _ in range(SAMPLE_ATTEMPTS):
+            index = rng.randrange(total)
+            for bucket in buckets:
+                if index < len(bucket):
+                    question = bucket[index]
+                    break
+                index -= len(bucket)
+            if not exclude or question_id(question) not in exclude:
+                return question
+        return None
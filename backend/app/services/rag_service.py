@@ -1,5 +1,6 @@
 import os
 import json
+import time
 from fastapi import FastAPI
 from pydantic import BaseModel
 from dotenv import load_dotenv
@@ -7,16 +8,21 @@ from dotenv import load_dotenv
 # Core LangChain and LangGraph components
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk
 from langchain_core.runnables import RunnablePassthrough, RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
 from langgraph.graph import StateGraph, END
 from typing import TypedDict, List
 
 from app.services.llm_service import get_llm
-from app.services.db_service import get_pinecone_service
+from app.services.db_service import get_retriever, get_lexical_index, get_question_bank
+from app.services.lexical_index import reciprocal_rank_fusion
+from app.services.prefetch import QuestionPrefetcher
+from app.services.question_bank import question_id
+from app.services.session_store import get_session_store
 from app.services.db_service import get_supabase_service
 from app.core.config import settings
+from app.core import metrics
 from langchain_core.documents import Document
 
 # A simple state for our graph
@@ -29,13 +35,29 @@ class AgentState(TypedDict):
     session_id: str
 
 class RAGService:
-    def __init__(self):
-        self.llm = get_llm()
-        self.retriever = get_pinecone_service().get_retriever()
+    """
+    Builds the LLM client, retriever, chains and compiled graph once.
+    Instances hold no per-request state and are shared by all requests
+    of a worker (see the lifespan handler in app.main).
+    """
+    def __init__(self, llm=None, retriever=None, lexical_index=None, question_bank=None, prefetcher=None,
+                 session_store=None):
+        self.llm = llm if llm is not None else get_llm()
+        self.retriever = retriever if retriever is not None else get_retriever()
+        if lexical_index is None and settings.HYBRID_RETRIEVAL:
+            lexical_index = get_lexical_index()
+        self.lexical_index = lexical_index
+        if question_bank is None and settings.QUESTION_SERVING_MODE == "bank":
+            question_bank = get_question_bank()
+        self.question_bank = question_bank
+        if prefetcher is None and settings.PREFETCH_NEXT_QUESTION:
+            prefetcher = QuestionPrefetcher(settings.PREFETCH_MAX_SESSIONS)
+        self.prefetcher = prefetcher
+        # Per-session state (last question, resume, transcript) lives here, not on the instance
+        self.sessions = session_store if session_store is not None else get_session_store()
         self.rag_chain = self._setup_rag_chain()
         self.fallback_chain = self._setup_fallback_chain()
         self.agent_executor = self._setup_agent_executor()
-        self.last_question = None  # store last question for grading
 
     def _setup_rag_chain(self):
         """Builds the RAG chain for when documents are found."""
@@ -57,8 +79,8 @@ class RAGService:
         ])
         return fallback_prompt | self.llm | StrOutputParser()
 
-    def _retrieve_documents(self, state):
-        """Node to retrieve documents from Pinecone with metadata filtering."""
+    async def _retrieve_documents(self, state):
+        """Node to retrieve documents from the vector backend (fused with BM25 matches) with metadata filtering."""
         role = state.get("role")
         tech_stack = state.get("tech_stack", [])
         difficulty = state.get("difficulty", None)
@@ -74,11 +96,18 @@ class RAGService:
 
         query = state["messages"][-1].content
 
-        documents = self.retriever.invoke(
+        documents = await self.retriever.ainvoke(
             query,
             filter=metadata_filter if metadata_filter else None
         )
 
+        # Keyword matches rescue skill names the embedding model handles poorly
+        if self.lexical_index is not None:
+            lexical = self.lexical_index.get_documents(
+                query, settings.RETRIEVAL_TOP_K, metadata_filter if metadata_filter else None
+            )
+            documents = reciprocal_rank_fusion([documents, lexical], limit=settings.RETRIEVAL_TOP_K)
+
         if not documents:
             return {"messages": [HumanMessage(content=query)], "documents": []}
         return {"messages": [HumanMessage(content=query)], "documents": documents}
@@ -93,7 +122,7 @@ class RAGService:
             print("Router: No documents found. Using fallback chain.")
             return "fallback"
 
-    def _generate_rag_response(self, state):
+    async def _generate_rag_response(self, state):
         user_message = state["messages"][-1].content
         documents = state["documents"]
 
@@ -110,13 +139,11 @@ class RAGService:
             context_text = "No relevant documents found."
 
         # 🔍 Send raw context to LLM
-        response = self.llm.invoke(
+        response = await self.llm.ainvoke(
             f"You are an expert interviewer. Using this context, generate ONE interview question only.\n\n"
             f"Context:\n{context_text}\n\nUser request: {user_message}"
         )
 
-        print("DEBUG - Raw Gemini output:", response)
-
         if hasattr(response, "content"):
             final_text = response.content
         else:
@@ -124,9 +151,9 @@ class RAGService:
 
         return {"messages": [AIMessage(content=final_text or "No question generated.")]}
 
-    def _generate_fallback_response(self, state):
+    async def _generate_fallback_response(self, state):
         user_message = state["messages"][-1].content
-        response = self.fallback_chain.invoke({"question": user_message})
+        response = await self.fallback_chain.ainvoke({"question": user_message})
         return {"messages": [AIMessage(content=response)]}
 
     def _setup_agent_executor(self):
@@ -148,13 +175,11 @@ class RAGService:
 
         return workflow.compile()
 
-    async def get_response(self, role: str, tech_stack: list, difficulty: str, session_id: str, answer: str = None):
-        # --- Case 1: grading candidate's answer ---
-        if answer:
-            grading_prompt = f"""
+    def _build_grading_prompt(self, session_id: str, answer: str) -> str:
+        return f"""
             You are an interviewer. Evaluate the candidate's answer.
 
-            Question: {self.last_question if self.last_question else "N/A"}
+            Question: {self.sessions.get(session_id).last_question or "N/A"}
             Answer: {answer}
 
             Respond in strict JSON:
@@ -164,28 +189,60 @@ class RAGService:
               "topic": "main concept tested"
             }}
             """
-            feedback = self.llm.invoke(grading_prompt)
-            if hasattr(feedback, "content"):
-                return feedback.content
-            return str(feedback)
 
-        # --- Case 2: generate new question ---
-        resume_text = None
+    async def _fetch_resume(self, session_id: str) -> str | None:
+        """
+        The session's resume text, fetched from Supabase once per session. A
+        missing resume is only trusted for SESSION_RESUME_MISS_TTL_SECONDS, since
+        the upload may land on another worker.
+        """
+        state = self.sessions.get(session_id)
+        if state.resume_loaded and (
+            state.resume_text is not None
+            or time.monotonic() - state.resume_checked_at < settings.SESSION_RESUME_MISS_TTL_SECONDS
+        ):
+            metrics.inc("session_resume_cache_hits")
+            return state.resume_text
+        metrics.inc("session_resume_cache_misses")
         try:
-            supabase = get_supabase_service().get_client()
-            res = supabase.table("resumes").select("resume_text").eq("session_id", session_id).execute()
-            if res.data:
-                resume_text = res.data[0]["resume_text"]
+            supabase_service = get_supabase_service()
+            res = await supabase_service.execute(
+                supabase_service.get_client().table("resumes").select("resume_text").eq("session_id", session_id)
+            )
+            # "No resume" is cached too; uploads refresh the cache via set_resume()
+            self.sessions.set_resume(session_id, res.data[0]["resume_text"] if res.data else None)
         except Exception as e:
             print("Resume fetch error:", e)
-
+            return None
+        return self.sessions.get(session_id).resume_text
+
+    def _serve_from_bank(self, role: str, tech_stack: list, difficulty: str, session_id: str,
+                         resume_text: str | None) -> str | None:
+        """
+        A curated question from the question bank, skipping retrieval and the LLM.
+        None when bank serving is off, the candidate uploaded a resume (those
+        questions are tailored by the LLM) or the matching buckets are empty.
+        """
+        if self.question_bank is None or resume_text:
+            return None
+        question = self.question_bank.sample(role, tech_stack, difficulty,
+                                             exclude=self.sessions.get(session_id).asked)
+        if question is None:
+            metrics.inc("question_bank_misses")
+            return None
+        metrics.inc("question_bank_hits")
+        self.sessions.record_question(session_id, question, question_id(question))
+        return question
+
+    def _build_initial_state(self, role: str, tech_stack: list, difficulty: str, session_id: str,
+                             resume_text: str | None) -> dict:
         if resume_text:
             user_prompt = f"Generate an interview question for role {role} using {', '.join(tech_stack)}. " \
                           f"Base it on this candidate's resume:\n{resume_text[:1000]}..."  # truncate for safety
         else:
             user_prompt = f"Generate interview questions for {role} using {', '.join(tech_stack)}"
 
-        initial_state = {
+        return {
             "messages": [HumanMessage(content=user_prompt)],
             "role": role,
             "tech_stack": tech_stack,
@@ -193,13 +250,146 @@ class RAGService:
             "session_id": session_id
         }
 
-        result = self.agent_executor.invoke(initial_state)
-        print("DEBUG - Final Agent Executor Result:", result)
-
+    def _extract_question(self, result: dict) -> str | None:
         messages = result.get("messages", [])
         for message in messages:
             if isinstance(message, AIMessage) and message.content.strip():
-                self.last_question = message.content.strip()  # save last question
-                return self.last_question
+                return message.content.strip()
+        return None
+
+    async def _generate_question(self, role: str, tech_stack: list, difficulty: str, session_id: str,
+                                 resume_text: str | None) -> str | None:
+        initial_state = self._build_initial_state(role, tech_stack, difficulty, session_id, resume_text)
+        result = await self.agent_executor.ainvoke(initial_state)
+        return self._extract_question(result)
+
+    @staticmethod
+    def _prefetch_key(role: str, tech_stack: list, difficulty: str, resume_text: str | None) -> tuple:
+        # A prefetched question is only valid for the request it was generated for
+        return (role, tuple(tech_stack), difficulty, hash(resume_text))
+
+    async def _take_prefetched(self, session_id: str, key: tuple) -> str | None:
+        """The session's prefetched question, unless it was asked since it was generated."""
+        if self.prefetcher is None:
+            return None
+        question = await self.prefetcher.take(session_id, key)
+        if question and question_id(question) in self.sessions.get(session_id).asked:
+            metrics.inc("prefetch_repeats")
+            return None
+        return question
+
+    async def _prefetch_question(self, role: str, tech_stack: list, difficulty: str, session_id: str,
+                                 resume_text: str | None, asked: set[str]) -> str | None:
+        """A background generation for the prefetcher; a question already asked counts as no result."""
+        question = await self._generate_question(role, tech_stack, difficulty, session_id, resume_text)
+        if question and question_id(question) in asked:
+            return None
+        return question
+
+    def _deliver_question(self, question: str | None, session_id: str, key: tuple,
+                          role: str, tech_stack: list, difficulty: str, resume_text: str | None) -> str:
+        """
+        Records the question for grading and, with prefetch on, starts generating
+        the session's next one while the candidate answers this one.
+        """
+        if not question:
+            return "No question generated."
+        self.sessions.record_question(session_id, question, question_id(question))
+        if self.prefetcher is not None:
+            asked = self.sessions.get(session_id).asked
+            self.prefetcher.schedule(session_id, key, lambda: self._prefetch_question(
+                role, list(tech_stack), difficulty, session_id, resume_text, asked
+            ))
+        return question
 
-        return "No question generated."
+    async def get_response(self, role: str, tech_stack: list, difficulty: str, session_id: str, answer: str = None):
+        # --- Case 1: grading candidate's answer ---
+        if answer:
+            feedback = await self.llm.ainvoke(self._build_grading_prompt(session_id, answer))
+            text = feedback.content if hasattr(feedback, "content") else str(feedback)
+            self.sessions.record_answer(session_id, answer, parse_feedback(text))
+            return text
+
+        # --- Case 2: new question, from the question bank when possible ---
+        resume_text = await self._fetch_resume(session_id)
+        question = self._serve_from_bank(role, tech_stack, difficulty, session_id, resume_text)
+        if question is not None:
+            return question
+
+        key = self._prefetch_key(role, tech_stack, difficulty, resume_text)
+        question = await self._take_prefetched(session_id, key)
+        if question is None:
+            question = await self._generate_question(role, tech_stack, difficulty, session_id, resume_text)
+
+        return self._deliver_question(question, session_id, key, role, tech_stack, difficulty, resume_text)
+
+    async def stream_response(self, role: str, tech_stack: list, difficulty: str, session_id: str, answer: str = None):
+        """
+        Streaming counterpart of get_response. Yields {"type": "token", "content": ...}
+        events as the LLM generates, then one {"type": "final", ...} event carrying
+        the full question or the parsed score/feedback/topic.
+        """
+        # --- Case 1: grading candidate's answer ---
+        if answer:
+            parts = []
+            async for chunk in self.llm.astream(self._build_grading_prompt(session_id, answer)):
+                if isinstance(chunk.content, str) and chunk.content:
+                    parts.append(chunk.content)
+                    yield {"type": "token", "content": chunk.content}
+            graded = parse_feedback("".join(parts))
+            self.sessions.record_answer(session_id, answer, graded)
+            yield {"type": "final", "kind": "feedback", **graded}
+            return
+
+        # --- Case 2: new question, from the question bank when possible ---
+        resume_text = await self._fetch_resume(session_id)
+        question = self._serve_from_bank(role, tech_stack, difficulty, session_id, resume_text)
+        if question is not None:
+            yield {"type": "token", "content": question}
+            yield {"type": "final", "kind": "question", "question": question}
+            return
+
+        key = self._prefetch_key(role, tech_stack, difficulty, resume_text)
+        question = await self._take_prefetched(session_id, key)
+        if question is not None:
+            question = self._deliver_question(question, session_id, key, role, tech_stack, difficulty, resume_text)
+            yield {"type": "token", "content": question}
+            yield {"type": "final", "kind": "question", "question": question}
+            return
+
+        initial_state = self._build_initial_state(role, tech_stack, difficulty, session_id, resume_text)
+        final_state = {}
+        async for mode, payload in self.agent_executor.astream(initial_state, stream_mode=["messages", "values"]):
+            if mode == "values":
+                final_state = payload
+                continue
+            chunk, metadata = payload
+            if (metadata.get("langgraph_node") in ("rag_node", "fallback_node")
+                    and isinstance(chunk, AIMessageChunk)
+                    and isinstance(chunk.content, str) and chunk.content):
+                yield {"type": "token", "content": chunk.content}
+
+        question = self._deliver_question(self._extract_question(final_state), session_id, key,
+                                          role, tech_stack, difficulty, resume_text)
+        yield {"type": "final", "kind": "question", "question": question}
+
+
+def parse_feedback(text: str) -> dict:
+    """
+    Parses the grading JSON returned by the LLM, tolerating ```json fences
+    and surrounding prose. Falls back to the raw text as feedback, including
+    when the JSON is not an object.
+    """
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            data = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            data = None
+        if isinstance(data, dict):
+            return {
+                "score": data.get("score"),
+                "feedback": data.get("feedback"),
+                "topic": data.get("topic")
+            }
+    return {"score": None, "feedback": text.strip(), "topic": None}
@@ -0,0 +1,198 @@
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from app.core import metrics
+from app.core.config import settings
+from app.services.db_service import get_supabase_service
+
+logger = logging.getLogger(__name__)
+
+# Consecutive failed writes after which a session's transcript is no longer retried
+MAX_FLUSH_ATTEMPTS = 3
+
+
+class SessionState:
+    """Per-interview state: what was asked, the candidate's resume and the transcript so far."""
+    def __init__(self):
+        self.last_question: str | None = None
+        self.asked: set[str] = set()          # question_id() of every question asked
+        self.resume_text: str | None = None
+        self.resume_loaded = False            # resume_text is None for "no resume" too
+        self.resume_checked_at = 0.0          # monotonic time of the last lookup or upload
+        self.transcript: list[dict] = []      # [{"question", "answer", "score", "feedback", "topic"}]
+        self.dirty = False                    # transcript changed since the last flush
+        self.touched = time.monotonic()
+
+
+def is_interview_id(session_id: str) -> bool:
+    """Only sessions named by an interviews row id (a uuid) have a transcript column to write."""
+    try:
+        uuid.UUID(session_id)
+    except ValueError:
+        return False
+    return True
+
+
+async def update_interview_transcript(session_id: str, transcript: list[dict]) -> None:
+    """Persists a transcript to interviews.transcript through the bounded Supabase pool."""
+    supabase_service = get_supabase_service()
+    await supabase_service.execute(
+        supabase_service.get_client().table("interviews").update({"transcript": transcript}).eq("id", session_id)
+    )
+
+
+# -----------------------------
+# Session State Store
+# -----------------------------
+class SessionStore:
+    """
+    In-process session states keyed by session_id, least recently used first.
+    Sessions idle for ttl_seconds expire and at most max_sessions are kept.
+    With persist_transcripts on, transcripts are written behind: turns only mark
+    the session dirty, and a background task persists dirty (and evicted)
+    transcripts every flush_interval seconds, so no turn waits on a database
+    round-trip. Only sessions whose id is an interviews row id are written.
+    """
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 7200, flush_interval: float = 5.0,
+                 persist_transcripts: bool = False,
+                 persist: Callable[[str, list[dict]], Awaitable[None]] = update_interview_transcript):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.flush_interval = flush_interval
+        self.persist_transcripts = persist_transcripts
+        self.persist = persist
+        self._sessions: OrderedDict[str, SessionState] = OrderedDict()
+        self._evicted: dict[str, list[dict]] = {}  # dirty transcripts of dropped sessions, not yet persisted
+        self._failures: dict[str, int] = {}
+        self._flusher: asyncio.Task | None = None
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str):
+        return session_id in self._sessions
+
+    def get(self, session_id: str) -> SessionState:
+        """The session's state, created on first use."""
+        self._expire()
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions[session_id] = SessionState()
+            while len(self._sessions) > self.max_sessions:
+                self._drop(next(iter(self._sessions)))
+            metrics.set_gauge("session_store_sessions", len(self._sessions))
+        else:
+            self._sessions.move_to_end(session_id)
+        state.touched = time.monotonic()
+        return state
+
+    def record_question(self, session_id: str, question: str, question_id: str) -> None:
+        state = self.get(session_id)
+        state.last_question = question
+        state.asked.add(question_id)
+        state.transcript.append({"question": question})
+        self._mark_dirty(session_id, state)
+
+    def record_answer(self, session_id: str, answer: str, feedback: dict) -> None:
+        """Attaches the answer and its grading to the session's latest question."""
+        state = self.get(session_id)
+        if not state.transcript or "answer" in state.transcript[-1]:
+            state.transcript.append({"question": state.last_question})
+        state.transcript[-1].update({"answer": answer, **feedback})
+        self._mark_dirty(session_id, state)
+
+    def _mark_dirty(self, session_id: str, state: SessionState) -> None:
+        if self.persist_transcripts and is_interview_id(session_id):
+            state.dirty = True
+
+    def set_resume(self, session_id: str, resume_text: str | None) -> None:
+        state = self.get(session_id)
+        state.resume_text = resume_text
+        state.resume_loaded = True
+        state.resume_checked_at = time.monotonic()
+
+    def _expire(self) -> None:
+        deadline = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            session_id, state = next(iter(self._sessions.items()))
+            if state.touched >= deadline:
+                break
+            self._drop(session_id)
+
+    def _drop(self, session_id: str) -> None:
+        state = self._sessions.pop(session_id)
+        if state.dirty:
+            self._evicted[session_id] = state.transcript
+        metrics.inc("session_store_evictions")
+        metrics.set_gauge("session_store_sessions", len(self._sessions))
+
+    async def flush(self) -> None:
+        """Persists every dirty transcript; failed writes are retried on the next flush."""
+        self._expire()
+        pending = self._evicted
+        self._evicted = {}
+        for session_id, state in self._sessions.items():
+            if state.dirty:
+                # Copied: the write is serialized on a DB thread while turns keep mutating the state
+                pending[session_id] = [dict(turn) for turn in state.transcript]
+                state.dirty = False
+
+        for session_id, transcript in pending.items():
+            try:
+                await self.persist(session_id, transcript)
+                self._failures.pop(session_id, None)
+                metrics.inc("session_transcript_flushes")
+            except Exception as e:
+                metrics.inc("session_transcript_flush_failures")
+                logger.warning("Transcript flush failed for session %s: %s", session_id, e)
+                self._failures[session_id] = self._failures.get(session_id, 0) + 1
+                if self._failures[session_id] >= MAX_FLUSH_ATTEMPTS:
+                    # e.g. no interviews row with this id; keep serving the session from memory
+                    del self._failures[session_id]
+                    metrics.inc("session_transcript_dropped")
+                    continue
+                state = self._sessions.get(session_id)
+                if state is not None:
+                    state.dirty = True
+                else:
+                    self._evicted.setdefault(session_id, transcript)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Starts the write-behind task on the running event loop."""
+        if self._flusher is None and self.persist_transcripts:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def close(self) -> None:
+        """Stops the write-behind task and persists whatever is still dirty."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+
+_session_store: SessionStore | None = None
+
+
+def get_session_store() -> SessionStore:
+    global _session_store
+    if _session_store is None:
+        _session_store = SessionStore(
+            max_sessions=settings.SESSION_MAX_SESSIONS,
+            ttl_seconds=settings.SESSION_TTL_SECONDS,
+            flush_interval=settings.SESSION_FLUSH_INTERVAL_SECONDS,
+            persist_transcripts=settings.SESSION_PERSIST_TRANSCRIPTS,
+        )
+    return _session_store
@@ -1,5 +1,11 @@
 import os
 import json
+import time
+import random
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import httpx
 from supabase import create_client, Client
 from dotenv import load_dotenv 
 
@@ -11,6 +17,15 @@ SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
 DATA_FOLDER = "../scripts/final_output" 
 
+# --- Bulk load tuning ---
+TABLE_NAME = "interview_questions"
+CONFLICT_COLUMNS = "role,refined_question"  # natural key; see supabase/schema.sql
+MAX_CHUNK_BYTES = 256 * 1024   # keep each request body well under the API payload limit
+MAX_CHUNK_ROWS = 500
+CONCURRENT_CHUNKS = 3
+MAX_RETRIES = 5
+CHECKPOINT_PATH = "upload_checkpoints.json"
+
 # --- 🎯 DEFINE YOUR DESIRED COLUMNS HERE ---
 # This set defines the ONLY columns the script will use.
 # Any other fields in the JSON will be ignored.
@@ -53,10 +68,144 @@ FILENAMES_TO_UPLOAD = [
     "Robotics_Engineer_refined.json"
 ]
 
+# --- Helpers ---
+def standardize(record):
+    # Build a new record using only the required columns
+    # Use .get() to safely get a value. If the key is missing, it returns None (null).
+    return {column: record.get(column, None) for column in REQUIRED_COLUMNS}
+
+
+def dedupe_on_natural_key(records):
+    """Postgres rejects an upsert that touches the same key twice, so keep the last copy."""
+    by_key = {}
+    for record in records:
+        by_key[(record["role"], record["refined_question"])] = record
+    return list(by_key.values())
+
+
+def chunk_records(records, max_bytes=MAX_CHUNK_BYTES, max_rows=MAX_CHUNK_ROWS):
+    """Splits records into chunks bounded by serialized size and row count."""
+    chunks, current, current_bytes = [], [], 0
+    for record in records:
+        size = len(json.dumps(record, ensure_ascii=False).encode("utf-8")) + 1
+        if current and (current_bytes + size > max_bytes or len(current) >= max_rows):
+            chunks.append(current)
+            current, current_bytes = [], 0
+        current.append(record)
+        current_bytes += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# Postgres SQLSTATEs worth retrying: connection exceptions, insufficient resources,
+# operator intervention (e.g. admin shutdown), serialization failures and deadlocks.
+TRANSIENT_SQLSTATE_PREFIXES = ("08", "53", "57P")
+TRANSIENT_SQLSTATES = {"40001", "40P01"}
+
+
+def is_transient(error):
+    """
+    True for network errors, HTTP 429/5xx and transient Postgres errors. Anything
+    else (4xx, constraint violations, bad payloads) fails the same way on retry.
+    """
+    if isinstance(error, httpx.TransportError):  # connect/read errors and timeouts
+        return True
+    # postgrest's APIError carries the SQLSTATE, or the HTTP status when the body wasn't JSON
+    code = str(getattr(error, "code", "") or "")
+    if len(code) == 3 and code.isdigit():
+        return code == "429" or code.startswith("5")
+    return code in TRANSIENT_SQLSTATES or code.startswith(TRANSIENT_SQLSTATE_PREFIXES)
+
+
+def upsert_with_retry(supabase, chunk):
+    """Upserts one chunk, retrying transient failures with exponential backoff and jitter."""
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            response = supabase.table(TABLE_NAME).upsert(chunk, on_conflict=CONFLICT_COLUMNS).execute()
+            if hasattr(response, 'error') and response.error:
+                raise RuntimeError(response.error)
+            return
+        except Exception as e:
+            if attempt == MAX_RETRIES or not is_transient(e):
+                raise
+            delay = min(30, 2 ** attempt) + random.uniform(0, 1)
+            print(f"⚠️ Chunk failed (attempt {attempt}/{MAX_RETRIES}): {e}. Retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+class CheckpointStore:
+    """
+    Per-file record of completed chunk indices, keyed by the file's content
+    hash so an edited file starts over. Saved after every chunk.
+    """
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.state = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+
+    def completed(self, filename, file_hash, num_chunks):
+        entry = self.state.get(filename)
+        if not entry or entry["sha256"] != file_hash or entry["num_chunks"] != num_chunks:
+            self.state[filename] = {"sha256": file_hash, "num_chunks": num_chunks, "done": []}
+            return set()
+        return set(entry["done"])
+
+    def mark_done(self, filename, chunk_idx):
+        with self.lock:
+            self.state[filename]["done"].append(chunk_idx)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f)
+            os.replace(tmp_path, self.path)
+
+
 # --- Main Script ---
+def upload_file(supabase, executor, checkpoints, filename):
+    file_path = os.path.join(DATA_FOLDER, filename)
+    print(f"\n--- Processing file: {file_path} ---")
+
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    data = json.loads(raw)
+
+    if not isinstance(data, list):
+        print(f"⚠️ Warning: Skipping {file_path} because its content is not a list of objects.")
+        return
+
+    print(f"Found {len(data)} records to process and standardize.")
+    records = dedupe_on_natural_key([standardize(r) for r in data if r.get("refined_question")])
+    chunks = chunk_records(records)
+
+    done = checkpoints.completed(filename, hashlib.sha256(raw).hexdigest(), len(chunks))
+    pending = [idx for idx in range(len(chunks)) if idx not in done]
+    if done:
+        print(f"Resuming: {len(done)}/{len(chunks)} chunks already uploaded.")
+
+    futures = {executor.submit(upsert_with_retry, supabase, chunks[idx]): idx for idx in pending}
+    failed = 0
+    for future in as_completed(futures):
+        idx = futures[future]
+        try:
+            future.result()
+            checkpoints.mark_done(filename, idx)
+        except Exception as e:
+            failed += 1
+            print(f"❌ Error uploading chunk {idx + 1}/{len(chunks)} from {file_path}: {e}")
+
+    if failed:
+        print(f"❌ {failed} chunk(s) failed for {file_path}; re-run to resume.")
+    else:
+        print(f"✅ Successfully uploaded {len(records)} records in {len(chunks)} chunks from {file_path}.")
+
+
 def upload_listed_data():
     """
-    Reads data, standardizes it against REQUIRED_COLUMNS, and uploads it to Supabase.
+    Reads data, standardizes it against REQUIRED_COLUMNS, and upserts it to Supabase
+    in size-bounded chunks, a few at a time, resuming from per-file checkpoints.
     """
     if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
         print("❌ Error: SUPABASE_URL and SUPABASE_SERVICE_KEY not found in your .env file.")
@@ -65,43 +214,16 @@ def upload_listed_data():
     try:
         supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
         print("✅ Successfully connected to Supabase.")
-
-        for filename in FILENAMES_TO_UPLOAD:
-            file_path = os.path.join(DATA_FOLDER, filename)
-            print(f"\n--- Processing file: {file_path} ---")
-            
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                if not isinstance(data, list):
-                    print(f"⚠️ Warning: Skipping {file_path} because its content is not a list of objects.")
-                    continue
-
-                print(f"Found {len(data)} records to process and standardize.")
-
-                # --- NEW STANDARDIZATION LOGIC ---
-                standardized_data = []
-                for original_record in data:
-                    new_record = {}
-                    # Build a new record using only the required columns
-                    for column in REQUIRED_COLUMNS:
-                        # Use .get() to safely get a value. If the key is missing, it returns None (null).
-                        new_record[column] = original_record.get(column, None)
-                    standardized_data.append(new_record)
-
-                # Insert the fully standardized data into the Supabase table
-                response = supabase.table('interview_questions').insert(standardized_data).execute()
-
-                if hasattr(response, 'error') and response.error:
-                    print(f"❌ Error uploading data from {file_path}: {response.error}")
-                else:
-                    print(f"✅ Successfully uploaded data from {file_path}.")
-
-            except FileNotFoundError:
-                print(f"❌ Error: File not found at '{file_path}'. Please check the filename and folder.")
-            except json.JSONDecodeError:
-                print(f"❌ Error: Could not decode JSON from '{file_path}'. Please check if the file is a valid JSON.")
+        checkpoints = CheckpointStore()
+
+        with ThreadPoolExecutor(max_workers=CONCURRENT_CHUNKS) as executor:
+            for filename in FILENAMES_TO_UPLOAD:
+                try:
+                    upload_file(supabase, executor, checkpoints, filename)
+                except FileNotFoundError:
+                    print(f"❌ Error: File not found at '{os.path.join(DATA_FOLDER, filename)}'. Please check the filename and folder.")
+                except json.JSONDecodeError:
+                    print(f"❌ Error: Could not decode JSON from '{os.path.join(DATA_FOLDER, filename)}'. Please check if the file is a valid JSON.")
 
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
@@ -0,0 +1,112 @@
+"""
+Fires N parallel POST /api/v1/chat/ calls against the real FastAPI app with
+local stubs for Gemini, Pinecone and Supabase, and reports throughput for
+each N. Every stub waits a fixed latency, so a non-blocking pipeline should
+scale roughly linearly with N until the DB thread pool saturates.
+
+Usage (from backend/):
+    python -m benchmarks.bench_chat_concurrency --levels 1 4 16 64
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+
+for _key in ("SUPABASE_URL", "SUPABASE_SERVICE_KEY", "PINECONE_API_KEY", "GEMINI_API_KEY",
+             "HUGGINGFACEHUB_ACCESS_TOKEN", "FIRECRAWL_API_KEY", "SERPAPI_API_KEY", "GROQ_API_KEY"):
+    os.environ.setdefault(_key, "bench")
+
+import httpx
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.retrievers import BaseRetriever
+
+from app.core.config import settings
+from app.main import app
+from app.routers.chat_router import get_rag_service
+from app.services import db_service, rag_service
+from app.services.rag_service import RAGService
+
+LLM_LATENCY = 0.10
+RETRIEVER_LATENCY = 0.03
+DB_LATENCY = 0.02
+
+
+class SlowFakeChatModel(FakeListChatModel):
+    """Fake chat model that waits like a remote LLM call would."""
+
+    async def _agenerate(self, *args, **kwargs):
+        await asyncio.sleep(LLM_LATENCY)
+        return await super()._agenerate(*args, **kwargs)
+
+
+class SlowFakeRetriever(BaseRetriever):
+    documents: list
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun, **kwargs):
+        time.sleep(RETRIEVER_LATENCY)
+        return self.documents
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun, **kwargs):
+        await asyncio.sleep(RETRIEVER_LATENCY)
+        return self.documents
+
+
+class _FakeQuery:
+    """Stands in for a postgrest query builder; execute() blocks like a DB round-trip."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(DB_LATENCY)
+        return type("Response", (), {"data": []})()
+
+
+class FakeSupabaseService(db_service.SupabaseService):
+    def __init__(self):
+        self.supabase = _FakeQuery()
+
+
+async def _fire(client: httpx.AsyncClient, n: int) -> float:
+    payload = {"role": "Data Analyst", "tech_stack": ["Python"], "difficulty": "Beginner", "session_id": "bench"}
+    start = time.perf_counter()
+    responses = await asyncio.gather(*[
+        client.post("/api/v1/chat/", json={**payload, "session_id": f"bench-{i}"}) for i in range(n)
+    ])
+    elapsed = time.perf_counter() - start
+    assert all(r.status_code == 200 for r in responses), [r.text for r in responses if r.status_code != 200]
+    return elapsed
+
+
+async def run(levels):
+    fake_supabase = FakeSupabaseService()
+    rag_service.get_supabase_service = lambda: fake_supabase
+    settings.PREFETCH_NEXT_QUESTION = False  # measure request throughput only
+    settings.HYBRID_RETRIEVAL = False  # no BM25 build or fusion in the measured path
+
+    docs = [Document(page_content="Question: What is a JOIN?\nAnswer: ...",
+                     metadata={"role": "Data Analyst", "skill": "SQL", "difficulty": "Beginner"})]
+    service = RAGService(
+        llm=SlowFakeChatModel(responses=["Explain the difference between INNER and LEFT JOIN."]),
+        retriever=SlowFakeRetriever(documents=docs),
+    )
+    app.dependency_overrides[get_rag_service] = lambda: service
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'N':>5}{'wall s':>10}{'req/s':>10}")
+        for n in levels:
+            with contextlib.redirect_stdout(io.StringIO()):
+                elapsed = await _fire(client, n)
+            print(f"{n:>5}{elapsed:>10.3f}{n / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+    asyncio.run(run(args.levels))
@@ -0,0 +1,89 @@
+"""
+Recall and latency of vector-only retrieval versus BM25 + vector hybrid
+retrieval (reciprocal-rank fusion), over the local index.
+
+Each query targets one known question of the bank, under the role/difficulty
+filter RAGService builds. Two query styles are measured: the full question
+text, and a skill-heavy keyword query (skill plus a few content words) like
+the "KDB/Q" or "FIX Protocol" cases where embeddings miss. Recall@k counts
+queries whose target question is among the k results.
+
+Needs the embedding model (uses the embedding store if ingest.py wrote one).
+
+Usage (from backend/):
+    python -m benchmarks.bench_hybrid_retrieval --queries 300
+"""
+import argparse
+import random
+import time
+
+from app.core.config import settings
+from app.services.db_service import get_local_index
+from app.services.embedding_service import get_embedding_model, warm_up_embedding_model
+from app.services.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+from benchmarks.bench_retrieval_backends import percentile
+
+
+def build_workload(index, num_queries: int, seed: int = 7):
+    """(style, query, filter, target page_content) for randomly sampled questions."""
+    rng = random.Random(seed)
+    workload = []
+    for row in rng.sample(range(len(index)), min(num_queries, len(index))):
+        metadata = index.metadata(row)
+        text = index.texts[row]
+        question = text.split("\n", 1)[0].removeprefix("Question: ")
+        metadata_filter = {"role": metadata["role"], "difficulty": metadata["difficulty"]}
+        keywords = f"{metadata['skill']} {' '.join(tokenize(question)[:4])}"
+        workload.append(("question", question, metadata_filter, text))
+        workload.append(("keywords", keywords, metadata_filter, text))
+    return workload
+
+
+def run(workload, retrieve):
+    hits, latencies = {}, []
+    for style, query, metadata_filter, target in workload:
+        start = time.perf_counter()
+        documents = retrieve(query, metadata_filter)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found = any(doc.page_content == target for doc in documents)
+        hits.setdefault(style, []).append(found)
+    return hits, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=settings.RETRIEVAL_TOP_K)
+    args = parser.parse_args()
+
+    warm_up_embedding_model()
+    index = get_local_index()
+    lexical = BM25Index.from_vector_index(index)
+    retriever = index.as_retriever(get_embedding_model(), k=args.k)
+    workload = build_workload(index, args.queries)
+    # Warm the query-embedding cache so only retrieval and fusion are timed
+    for _, query, _, _ in workload:
+        get_embedding_model().embed_query(query)
+
+    def vector_only(query, metadata_filter):
+        return retriever.invoke(query, filter=metadata_filter)
+
+    def bm25_only(query, metadata_filter):
+        return lexical.get_documents(query, args.k, metadata_filter)
+
+    def hybrid(query, metadata_filter):
+        return reciprocal_rank_fusion([vector_only(query, metadata_filter), bm25_only(query, metadata_filter)],
+                                      limit=args.k)
+
+    print(f"{len(index)} rows, {len(workload)} queries, k={args.k}")
+    print(f"{'mode':<8}{'recall q':>10}{'recall kw':>11}{'p50 ms':>9}{'p99 ms':>9}")
+    for name, retrieve in (("vector", vector_only), ("bm25", bm25_only), ("hybrid", hybrid)):
+        hits, latencies = run(workload, retrieve)
+        recall = {style: sum(found) / len(found) for style, found in hits.items()}
+        print(f"{name:<8}{recall['question']:>10.3f}{recall['keywords']:>11.3f}"
+              f"{percentile(latencies, 50):>9.2f}{percentile(latencies, 99):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Throughput and recovery of the incremental JSON parser used for streamed LLM
+refinement responses, against the regex extractor it replaced.
+
+The corpus is every saved *_FAILED_RAW_*.txt response plus synthetic responses
+rebuilt from the refined question bank (fenced, pretty-printed arrays whose
+answers contain code with braces). Each document is also fuzzed: fed in random
+chunk sizes, the parser must return exactly what a single feed returns, and
+every truncated prefix must yield a prefix of the full result.
+
+Usage (from backend/):
+    python -m benchmarks.bench_json_parser --batch-size 20 --fuzz-cuts 50
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from json_stream import IncrementalJSONParser, parse_json_objects  # noqa: E402
+
+LEGACY_PATTERN = re.compile(r'\{.*?\}', re.DOTALL)
+
+
+def legacy_parse(text: str):
+    """The original non-greedy regex extractor, kept here as the baseline."""
+    parsed = []
+    for json_str in LEGACY_PATTERN.findall(text):
+        try:
+            parsed.append(json.loads(json_str.replace('\n', ' ').replace('\r', '')))
+        except json.JSONDecodeError:
+            pass
+    return parsed
+
+
+def build_corpus(raw_dir: Path, bank_dir: Path, batch_size: int):
+    corpus = [(path.name, path.read_text(encoding="utf-8"))
+              for path in sorted(raw_dir.glob("*_FAILED_RAW_*.txt"))]
+    for path in sorted(bank_dir.glob("*_refined.json")):
+        items = json.loads(path.read_text(encoding="utf-8"))
+        for start in range(0, len(items), batch_size):
+            batch = [{k: qa.get(k) for k in ("refined_question", "answer", "difficulty")}
+                     for qa in items[start:start + batch_size]]
+            text = "Here are the refined questions:\n```json\n" + json.dumps(batch, indent=2) + "\n```"
+            corpus.append((f"{path.stem}[{start}]", text))
+    return corpus
+
+
+def time_parser(parse, corpus, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        recovered = sum(len(parse(text)) for _, text in corpus)
+    return time.perf_counter() - started, recovered
+
+
+def feed_in_chunks(text: str, rng: random.Random, max_chunk: int):
+    parser, out, pos = IncrementalJSONParser(), [], 0
+    while pos < len(text):
+        step = rng.randint(1, max_chunk)
+        out.extend(parser.feed(text[pos:pos + step]))
+        pos += step
+    return out
+
+
+def fuzz(corpus, cuts: int, seed: int = 11):
+    rng = random.Random(seed)
+    failures = 0
+    for name, text in corpus:
+        expected = parse_json_objects(text)
+        if feed_in_chunks(text, rng, max_chunk=64) != expected:
+            failures += 1
+            print(f"  chunking mismatch: {name}")
+        for _ in range(cuts):
+            got = parse_json_objects(text[:rng.randrange(len(text) + 1)])
+            if got != expected[:len(got)]:
+                failures += 1
+                print(f"  truncation mismatch: {name}")
+                break
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--raw-dir", type=Path, default=SCRIPTS_DIR / "final_output")
+    parser.add_argument("--bank-dir", type=Path, default=SCRIPTS_DIR / "final_output")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fuzz-cuts", type=int, default=50)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.raw_dir, args.bank_dir, args.batch_size)
+    total_mb = sum(len(text) for _, text in corpus) / 1e6
+    print(f"corpus: {len(corpus)} responses, {total_mb:.1f} MB")
+
+    for label, parse in (("regex", legacy_parse), ("incremental", parse_json_objects)):
+        seconds, recovered = time_parser(parse, corpus, args.repeat)
+        print(f"{label:>12}: {recovered} objects  {total_mb * args.repeat / seconds:.1f} MB/s")
+
+    failures = fuzz(corpus, args.fuzz_cuts)
+    print(f"fuzz: {len(corpus)} documents, {failures} failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Next-question latency over simulated interviews with and without speculative
+prefetch of the next question.
+
+Each session loops: ask for a question, "think" for --think seconds, submit
+an answer (graded by the LLM), ask for the next question. Gemini, the
+retriever and Supabase are the latency stubs from bench_chat_concurrency.
+With --change-every N the session switches difficulty every N turns, which
+invalidates its prefetched question.
+
+Usage (from backend/):
+    python -m benchmarks.bench_prefetch --sessions 8 --turns 6 --llm-latency 1.0 --think 2
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+
+from langchain_core.documents import Document
+
+from app.core import metrics
+from app.core.config import settings
+from app.services import rag_service
+from app.services.rag_service import RAGService
+
+from benchmarks import bench_chat_concurrency
+from benchmarks.bench_chat_concurrency import FakeSupabaseService, SlowFakeChatModel, SlowFakeRetriever
+from benchmarks.bench_rag_service import percentile
+
+DIFFICULTIES = ("Beginner", "Intermediate")
+
+
+async def interview(service, session_id: str, turns: int, think: float, change_every: int):
+    latencies = []
+    for turn in range(turns):
+        difficulty = DIFFICULTIES[(turn // change_every) % 2] if change_every else DIFFICULTIES[0]
+        request = {"role": "Data Analyst", "tech_stack": ["SQL"], "difficulty": difficulty, "session_id": session_id}
+        start = time.perf_counter()
+        await service.get_response(**request)
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(think)
+        await service.get_response(**request, answer="A JOIN combines rows from two tables.")
+    return latencies
+
+
+async def run_mode(prefetch: bool, args):
+    settings.PREFETCH_NEXT_QUESTION = prefetch
+    docs = [Document(page_content="Question: What is a JOIN?\nAnswer: ...",
+                     metadata={"role": "Data Analyst", "skill": "SQL", "difficulty": "Beginner"})]
+    service = RAGService(
+        # Distinct questions, or every prefetch would be dropped as a repeat
+        llm=SlowFakeChatModel(responses=[f"Explain JOIN case {i}: INNER versus LEFT." for i in range(1000)]),
+        retriever=SlowFakeRetriever(documents=docs),
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = await asyncio.gather(*[
+            interview(service, f"bench-{i}", args.turns, args.think, args.change_every)
+            for i in range(args.sessions)
+        ])
+    if service.prefetcher is not None:
+        service.prefetcher.close()
+    # The first question of an interview can never be prefetched
+    return [ms for latencies in results for ms in latencies[1:]]
+
+
+async def main(args):
+    bench_chat_concurrency.LLM_LATENCY = args.llm_latency
+    fake_supabase = FakeSupabaseService()
+    rag_service.get_supabase_service = lambda: fake_supabase
+    settings.HYBRID_RETRIEVAL = False
+
+    print(f"{args.sessions} sessions x {args.turns} turns, LLM {args.llm_latency}s, think {args.think}s")
+    print(f"{'prefetch':<10}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for prefetch in (False, True):
+        samples = await run_mode(prefetch, args)
+        print(f"{'on' if prefetch else 'off':<10}{percentile(samples, 50):>10.1f}"
+              f"{percentile(samples, 99):>10.1f}{statistics.mean(samples):>10.1f}")
+
+    counters = metrics.snapshot()["counters"]
+    print(", ".join(f"{name} {counters.get(name, 0):.0f}" for name in
+                    ("prefetch_scheduled", "prefetch_hits", "prefetch_misses", "prefetch_invalidated",
+                     "prefetch_repeats", "prefetch_wasted")))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--think", type=float, default=2.0, help="seconds the candidate spends answering")
+    parser.add_argument("--change-every", type=int, default=0, help="switch difficulty every N turns (0: never)")
+    asyncio.run(main(parser.parse_args()))
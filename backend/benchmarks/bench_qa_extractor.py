@@ -0,0 +1,91 @@
+"""
+Per-page extraction time of the single-pass lxml engine (qa_extractor.py)
+versus the legacy BeautifulSoup extractors in serpapi.py.
+
+Fixture pages come from, in order: --fixtures DIR (*.html files, named
+"<site>__<anything>.html" so the site plug-in is picked, e.g.
+"geeksforgeeks.org__python.html"), every page in the scraper's HTTP cache,
+and, if neither yields anything, generated GeeksforGeeks/InterviewBit-style
+pages of increasing length.
+
+Usage (from backend/):
+    python -m benchmarks.bench_qa_extractor --repeat 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+os.environ.setdefault("SERPAPI_API_KEY", "bench")
+
+from http_cache import PageCache  # noqa: E402
+from qa_extractor import extract_qa  # noqa: E402
+from qa_extractor_legacy import extract_qa_legacy  # noqa: E402
+from serpapi import HTTP_CACHE_PATH  # noqa: E402
+
+
+def generated_page(sections: int, site: str) -> str:
+    body = []
+    for i in range(sections):
+        question = f"<h3>{i + 1}. How does feature {i} of the runtime handle concurrent updates?</h3>"
+        answer = (f"<p>Feature {i} serialises writers with a lock and lets readers proceed "
+                  f"on a snapshot, which keeps latency predictable under load.</p>")
+        code = f"<pre>def feature_{i}(x):\n    return x * {i}</pre>" if i % 3 == 0 else ""
+        if site == "interviewbit.com":
+            body.append(f'<div class="ibpage-article-question">{question}<div>{code}{answer}</div></div>')
+        else:
+            body.append(f"<div>{question}{code}{answer}<p>See also related notes.</p></div>")
+    return f"<html><body><nav><ul><li>Home</li></ul></nav><article>{''.join(body)}</article></body></html>"
+
+
+def load_fixtures(fixtures_dir):
+    pages = []
+    if fixtures_dir:
+        for path in sorted(Path(fixtures_dir).glob("*.html")):
+            site = path.stem.split("__")[0]
+            pages.append((f"https://{site}/{path.stem}", path.read_text(encoding="utf-8", errors="replace")))
+    if HTTP_CACHE_PATH.exists():
+        cache = PageCache(HTTP_CACHE_PATH, ttl_seconds=0, offline=True)
+        pages.extend((entry.identity, entry.body) for entry in cache.entries("page"))
+    if not pages:
+        for site in ("geeksforgeeks.org", "interviewbit.com", "example.com"):
+            for sections in (25, 100, 400, 1600):
+                pages.append((f"https://{site}/generated-{sections}", generated_page(sections, site)))
+    return pages
+
+
+def time_page(extract, url, html, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pairs = extract(url, html)
+        samples.append((time.perf_counter() - started) * 1000)
+    return min(samples), len(pairs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="directory of saved *.html pages")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures)
+    print(f"{'page':<48} {'KB':>6} {'legacy ms':>10} {'lxml ms':>9} {'pairs':>9}")
+    legacy_ms, lxml_ms = [], []
+    for url, html in pages:
+        old_ms, old_pairs = time_page(extract_qa_legacy, url, html, args.repeat)
+        new_ms, new_pairs = time_page(extract_qa, url, html, args.repeat)
+        legacy_ms.append(old_ms)
+        lxml_ms.append(new_ms)
+        print(f"{url[-48:]:<48} {len(html) / 1024:6.0f} {old_ms:10.1f} {new_ms:9.1f} {old_pairs:>4}/{new_pairs:<4}")
+
+    print(f"\n{len(pages)} pages  median legacy {statistics.median(legacy_ms):.1f} ms, "
+          f"lxml {statistics.median(lxml_ms):.1f} ms  total {sum(legacy_ms) / sum(lxml_ms):.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Latency of "next question" requests served from the in-memory question bank
+(QUESTION_SERVING_MODE=bank) versus generated by the RAG graph.
+
+Requests are drawn from the question bank's own (role, skill, difficulty)
+triples, so every one can be served by the bank. Gemini and the retriever are
+in-process fakes; --llm-latency adds a simulated per-call delay so the
+generated path reflects a real Gemini round-trip.
+
+Usage (from backend/):
+    python -m benchmarks.bench_question_bank --requests 2000 --llm-latency 1.5
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import statistics
+import time
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from app.core import metrics
+from app.core.config import settings
+from app.services import rag_service
+from app.services.question_bank import QuestionBank
+from app.services.rag_service import RAGService
+
+from benchmarks.bench_rag_service import fake_retriever, no_supabase, percentile
+
+
+def build_workload(bank: QuestionBank, num_requests: int, seed: int = 7):
+    rng = random.Random(seed)
+    keys = list(bank.buckets)
+    return [rng.choice(keys) for _ in range(num_requests)]
+
+
+async def run(service, workload):
+    latencies = []
+    for role, skill, difficulty in workload:
+        start = time.perf_counter()
+        await service.get_response(role=role, tech_stack=[skill], difficulty=difficulty, session_id="bench")
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def main(num_requests: int, llm_latency: float):
+    rag_service.get_supabase_service = no_supabase
+    settings.HYBRID_RETRIEVAL = False  # the fake retriever stands in for all retrieval
+
+    start = time.perf_counter()
+    bank = QuestionBank.from_corpus(settings.QUESTION_BANK_DIR)
+    print(f"question bank: {len(bank)} questions, {len(bank.buckets)} buckets, "
+          f"built in {time.perf_counter() - start:.2f}s")
+
+    workload = build_workload(bank, num_requests)
+    llm = FakeListChatModel(responses=["What is the difference between a list and a tuple in Python?"],
+                            sleep=llm_latency)
+    generated = RAGService(llm=llm, retriever=fake_retriever())
+    banked = RAGService(llm=llm, retriever=fake_retriever(), question_bank=bank)
+
+    # The service prints debug output on every generated question
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Simulated LLM latency makes the generated path slow; a tenth of the workload is enough
+        llm_ms = await run(generated, workload[:max(1, num_requests // 10)])
+        bank_ms = await run(banked, workload)
+
+    print(f"{'mode':<12}{'requests':>10}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for name, samples in (("generated", llm_ms), ("bank", bank_ms)):
+        print(f"{name:<12}{len(samples):>10}{percentile(samples, 50):>10.3f}{percentile(samples, 99):>10.3f}"
+              f"{statistics.mean(samples):>10.3f}")
+    counters = metrics.snapshot()["counters"]
+    print(f"bank hits {counters.get('question_bank_hits', 0):.0f}, "
+          f"misses {counters.get('question_bank_misses', 0):.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated seconds per LLM call")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.llm_latency))
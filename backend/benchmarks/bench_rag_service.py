@@ -0,0 +1,112 @@
+"""
+Per-request latency of the chat pipeline with a RAGService built per request
+(old behaviour) versus one shared instance (built once in the app lifespan).
+
+Gemini and Pinecone are replaced by in-process fakes so the numbers isolate
+the cost of building the service from network latency.
+
+Usage (from backend/):
+    python -m benchmarks.bench_rag_service --requests 200
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import time
+
+# Settings() requires these; the fakes below never use them.
+for _key in ("SUPABASE_URL", "SUPABASE_SERVICE_KEY", "PINECONE_API_KEY", "GEMINI_API_KEY",
+             "HUGGINGFACEHUB_ACCESS_TOKEN", "FIRECRAWL_API_KEY", "SERPAPI_API_KEY", "GROQ_API_KEY"):
+    os.environ.setdefault(_key, "bench")
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.retrievers import BaseRetriever
+
+from app.core.config import settings
+from app.services import rag_service
+from app.services.rag_service import RAGService
+
+
+class FakeRetriever(BaseRetriever):
+    """Returns a fixed set of documents for every query."""
+    documents: list
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun, **kwargs):
+        return self.documents
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun, **kwargs):
+        return self.documents
+
+
+def fake_llm():
+    return FakeListChatModel(responses=["What is the difference between a list and a tuple in Python?"])
+
+
+def fake_retriever():
+    docs = [
+        Document(
+            page_content=f"Question: Sample question {i}?\nAnswer: Sample answer {i}.",
+            metadata={"role": "Data Analyst", "skill": "Python", "difficulty": "Beginner"},
+        )
+        for i in range(4)
+    ]
+    return FakeRetriever(documents=docs)
+
+
+def no_supabase():
+    # Resume lookups hit Supabase; the benchmark only measures the agent.
+    raise RuntimeError("Supabase disabled for benchmark")
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+async def _ask(service):
+    return await service.get_response(
+        role="Data Analyst",
+        tech_stack=["Python", "SQL"],
+        difficulty="Beginner",
+        session_id="bench",
+    )
+
+
+async def run(num_requests: int):
+    rag_service.get_supabase_service = no_supabase
+    # Measure building the agent only: no lexical index load, no background generation
+    settings.HYBRID_RETRIEVAL = False
+    settings.PREFETCH_NEXT_QUESTION = False
+
+    per_request, shared = [], []
+    # The service prints debug output on every call; keep the report readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(num_requests):
+            start = time.perf_counter()
+            await _ask(RAGService(llm=fake_llm(), retriever=fake_retriever()))
+            per_request.append((time.perf_counter() - start) * 1000)
+
+        shared_service = RAGService(llm=fake_llm(), retriever=fake_retriever())
+        for _ in range(num_requests):
+            start = time.perf_counter()
+            await _ask(shared_service)
+            shared.append((time.perf_counter() - start) * 1000)
+        if shared_service.prefetcher is not None:
+            shared_service.prefetcher.close()
+
+    print(f"{'mode':<22}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for name, samples in (("built per request", per_request), ("shared (lifespan)", shared)):
+        print(f"{name:<22}{percentile(samples, 50):>10.2f}{percentile(samples, 99):>10.2f}"
+              f"{statistics.mean(samples):>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
@@ -0,0 +1,98 @@
+"""
+Resume text extraction inline on the event loop (old upload_resume) versus in
+the PDF process pool (pdf_service.extract_pdf_text), over generated PDFs of
+increasing size.
+
+For each size it reports extraction wall time and the worst event-loop stall
+seen by a 5 ms ticker running alongside, which is what every other request
+on the worker would wait. Both paths must produce identical text.
+
+Usage (from backend/):
+    python -m benchmarks.bench_resume_parsing --pages 1 10 50 200 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from app.core.config import settings
+from app.services.pdf_service import extract_pdf_text, shutdown_pdf_executor
+
+TICK = 0.005
+
+
+def generate_pdf(path: str, pages: int):
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        lines = [f"Page {number + 1}: Experience, projects and skills section."] + [
+            f"- Built service {number}-{line} in Python and SQL, cutting p99 latency by {line % 40 + 10}%."
+            for line in range(45)
+        ]
+        page.insert_textbox(fitz.Rect(36, 36, 576, 806), "\n".join(lines), fontsize=9)
+    doc.save(path)
+
+
+def extract_inline(path: str) -> str:
+    with open(path, "rb") as f:
+        pdf_bytes = f.read()
+    doc = fitz.open("pdf", pdf_bytes)
+    return "\n".join([page.get_text() for page in doc])
+
+
+async def measure(extract):
+    """(result, wall seconds, worst loop stall in ms) for one extraction."""
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            stalls.append((time.perf_counter() - start - TICK) * 1000)
+
+    ticking = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    result = await extract()
+    elapsed = time.perf_counter() - start
+    done.set()
+    await ticking
+    return result, elapsed, max(stalls, default=0.0)
+
+
+async def main(page_counts, workers):
+    settings.PDF_WORKERS = workers
+    settings.RESUME_MAX_PAGES = max(page_counts)
+
+    async def inline(path):
+        return extract_inline(path)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Warm the pool so process start-up isn't charged to the first document
+        warm_path = os.path.join(tmp_dir, "warm.pdf")
+        generate_pdf(warm_path, settings.PDF_PARALLEL_MIN_PAGES)
+        await extract_pdf_text(warm_path)
+
+        print(f"{workers} workers, parallel from {settings.PDF_PARALLEL_MIN_PAGES} pages")
+        print(f"{'pages':>6}{'KB':>8}{'inline s':>10}{'stall ms':>10}{'pool s':>9}{'stall ms':>10}")
+        for pages in page_counts:
+            path = os.path.join(tmp_dir, f"resume-{pages}.pdf")
+            generate_pdf(path, pages)
+            old_text, old_s, old_stall = await measure(lambda: inline(path))
+            new_text, new_s, new_stall = await measure(lambda: extract_pdf_text(path))
+            assert old_text == new_text, f"text differs for {pages} pages"
+            print(f"{pages:>6}{os.path.getsize(path) / 1024:>8.0f}{old_s:>10.3f}{old_stall:>10.1f}"
+                  f"{new_s:>9.3f}{new_stall:>10.1f}")
+    shutdown_pdf_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--workers", type=int, default=settings.PDF_WORKERS)
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.workers))
@@ -0,0 +1,77 @@
+"""
+Retrieval latency of the in-process LocalVectorIndex versus the Pinecone
+retriever, using the same templated queries and role/skill/difficulty
+filters that RAGService._retrieve_documents builds.
+
+Needs the embedding model (and PINECONE_API_KEY in .env unless --skip-pinecone).
+
+Usage (from backend/):
+    python -m benchmarks.bench_retrieval_backends --queries 200
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.services.db_service import get_local_index, get_pinecone_service
+from app.services.embedding_service import get_embedding_model, warm_up_embedding_model
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def build_workload(index, num_queries: int, seed: int = 7):
+    """Samples (query, filter) pairs from real role/skill/difficulty combinations."""
+    rng = random.Random(seed)
+    workload = []
+    for _ in range(num_queries):
+        metadata = index.metadata(rng.randrange(len(index)))
+        role, skill = metadata["role"], metadata["skill"]
+        workload.append((
+            f"Generate interview questions for {role} using {skill}",
+            {"role": role, "difficulty": metadata["difficulty"], "skill": {"$in": [skill]}}
+        ))
+    return workload
+
+
+def time_retriever(retriever, workload):
+    latencies = []
+    for query, metadata_filter in workload:
+        start = time.perf_counter()
+        retriever.invoke(query, filter=metadata_filter)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--skip-pinecone", action="store_true")
+    args = parser.parse_args()
+
+    warm_up_embedding_model()
+    start = time.perf_counter()
+    index = get_local_index()
+    print(f"Local index: {len(index)} vectors ready in {time.perf_counter() - start:.2f}s")
+
+    workload = build_workload(index, args.queries)
+    # Embed every query once up front so both backends are timed on a warm
+    # query-embedding cache and only retrieval itself differs.
+    for query, _ in workload:
+        get_embedding_model().embed_query(query)
+
+    backends = [("local", index.as_retriever(get_embedding_model()))]
+    if not args.skip_pinecone:
+        backends.append(("pinecone", get_pinecone_service().get_retriever()))
+
+    print(f"{'backend':<10}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for name, retriever in backends:
+        latencies = time_retriever(retriever, workload)
+        print(f"{name:<10}{percentile(latencies, 50):>10.2f}{percentile(latencies, 99):>10.2f}"
+              f"{statistics.mean(latencies):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
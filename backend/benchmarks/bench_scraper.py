@@ -0,0 +1,106 @@
+"""
+End-to-end crawl against local fixture servers: the old sequential loop
+(one requests.get per URL plus a 0.2 s pause) versus ConcurrentScraper.
+
+Each fixture server stands in for one site and answers after --latency seconds
+with a generated Q&A page, so the run exercises keep-alive pooling, the
+per-host limits and politeness delay, and the parse pool. Both crawls must
+extract identical Q&A pairs.
+
+Usage (from backend/):
+    python -m benchmarks.bench_scraper --hosts 4 --pages 24 --latency 0.2
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+os.environ.setdefault("SERPAPI_API_KEY", "bench")
+
+from crawler import ConcurrentScraper  # noqa: E402
+from serpapi import extract_qa_from_html, parse_qa  # noqa: E402
+
+
+def fixture_page(path: str, questions: int = 12) -> bytes:
+    items = "".join(
+        f"<h3>What does concept {i} on page {path} mean in practice?</h3>"
+        f"<p>Concept {i} describes how the system behaves under load on {path}, "
+        f"and interviewers expect a short worked example.</p>"
+        for i in range(questions)
+    )
+    return f"<html><body><nav>menu</nav><article>{items}</article></body></html>".encode()
+
+
+def start_fixture_server(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = fixture_page(self.path)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def sequential_crawl(urls):
+    results = []
+    for url in urls:
+        resp = requests.get(url, timeout=15)
+        resp.raise_for_status()
+        results.append(extract_qa_from_html(url, resp.text))
+        time.sleep(0.2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hosts", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=24)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--per-host", type=int, default=2)
+    parser.add_argument("--politeness-delay", type=float, default=0.1)
+    args = parser.parse_args()
+
+    servers = [start_fixture_server(args.latency) for _ in range(args.hosts)]
+    urls = [f"http://127.0.0.1:{servers[i % args.hosts].server_port}/page-{i}" for i in range(args.pages)]
+
+    started = time.perf_counter()
+    expected = sequential_crawl(urls)
+    sequential_s = time.perf_counter() - started
+
+    with ConcurrentScraper(parse_qa, per_host=args.per_host,
+                           politeness_delay=args.politeness_delay) as scraper:
+        started = time.perf_counter()
+        got = scraper.scrape(urls)
+        concurrent_s = time.perf_counter() - started
+
+    pairs = sum(len(r) for r in expected)
+    print(f"{len(urls)} pages across {args.hosts} hosts, {pairs} Q&A pairs")
+    print(f"  sequential: {sequential_s:6.2f}s")
+    print(f"  concurrent: {concurrent_s:6.2f}s  ({sequential_s / concurrent_s:.1f}x)")
+    if got != expected:
+        print("  MISMATCH between sequential and concurrent results")
+        sys.exit(1)
+
+    for server in servers:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from http_cache import PageCache
+
+# --------------------------------
+# Crawl limits
+# --------------------------------
+MAX_CONCURRENCY = int(os.getenv("SCRAPER_MAX_CONCURRENCY", "16"))    # requests in flight overall
+PER_HOST_CONCURRENCY = int(os.getenv("SCRAPER_PER_HOST", "2"))       # requests in flight per host
+POLITENESS_DELAY = float(os.getenv("SCRAPER_POLITENESS_DELAY", "0.5"))  # seconds between request starts per host
+PARSE_WORKERS = int(os.getenv("SCRAPER_PARSE_WORKERS", str(os.cpu_count() or 2)))
+REQUEST_TIMEOUT = 15
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+
+class HostLimiter:
+    """Caps concurrent requests to one host and spaces their start times by `delay`."""
+    def __init__(self, concurrency: int, delay: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.delay = delay
+        self.next_start = 0.0
+        self.lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        async with self.lock:
+            now = loop.time()
+            wait = self.next_start - now
+            self.next_start = max(now, self.next_start) + self.delay
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+class ConcurrentScraper:
+    """
+    Fetches pages over a pooled keep-alive httpx client on a background event loop
+    and parses them in a process pool, so BeautifulSoup work never blocks the
+    network side. `parse(url, html)` must be a picklable module-level function
+    from a module without import-time side effects (workers import it).
+    With a PageCache, fresh pages skip the network (and the politeness delay)
+    and stale ones are revalidated with a conditional GET.
+
+    Usage:
+        with ConcurrentScraper(qa_extractor.extract_qa) as scraper:
+            results = scraper.scrape(urls)   # one list per url, in order
+    """
+    def __init__(self, parse: Callable[[str, str], List[Dict[str, str]]],
+                 max_concurrency: int = MAX_CONCURRENCY,
+                 per_host: int = PER_HOST_CONCURRENCY,
+                 politeness_delay: float = POLITENESS_DELAY,
+                 parse_workers: int = PARSE_WORKERS,
+                 cache: Optional[PageCache] = None):
+        self.parse = parse
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.politeness_delay = politeness_delay
+        self.parse_workers = parse_workers
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._pool = None
+        self._global = None
+        self._hosts: Dict[str, HostLimiter] = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        self._pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="scraper-loop", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._open(), self._loop).result()
+
+    async def _open(self):
+        self._client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=REQUEST_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.max_concurrency,
+                                max_keepalive_connections=self.max_concurrency),
+        )
+        self._global = asyncio.Semaphore(self.max_concurrency)
+
+    def close(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._pool.shutdown()
+        self._loop = None
+
+    def scrape(self, urls: List[str]) -> List[List[Dict[str, str]]]:
+        """Scrapes all urls concurrently; blocks until every page is parsed or has failed."""
+        return asyncio.run_coroutine_threadsafe(self.scrape_async(urls), self._loop).result()
+
+    async def scrape_async(self, urls: List[str]) -> List[List[Dict[str, str]]]:
+        return await asyncio.gather(*(self._scrape_one(url) for url in urls))
+
+    def _host_limiter(self, url: str) -> HostLimiter:
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = HostLimiter(self.per_host, self.politeness_delay)
+        return self._hosts[host]
+
+    async def _fetch(self, url: str) -> str:
+        cached = self.cache.lookup("page", url) if self.cache is not None else None
+        if cached is not None and self.cache.usable(cached):
+            return cached.body
+        headers = PageCache.conditional_headers(cached)
+        # wait out the host's politeness delay before taking a global slot
+        async with self._host_limiter(url), self._global:
+            resp = await self._client.get(url, headers=headers)
+        if resp.status_code == 304 and cached is not None:
+            self.cache.refresh("page", url)
+            return cached.body
+        resp.raise_for_status()
+        if self.cache is not None:
+            self.cache.put("page", url, resp.text, resp.headers)
+        return resp.text
+
+    async def _scrape_one(self, url: str) -> List[Dict[str, str]]:
+        try:
+            html = await self._fetch(url)
+        except Exception as e:
+            logging.warning(f"Failed to scrape {url}: {e}")
+            return []
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, self.parse, url, html)
+        except Exception as e:
+            logging.warning(f"Failed to parse {url}: {e}")
+            return []
@@ -0,0 +1,224 @@
+import os
+import re
+import json
+import zlib
+import argparse
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from llm_cache import normalize_question
+
+# --------------------------------
+# Config
+# --------------------------------
+SCRIPTS_DIR = Path(__file__).resolve().parent
+INPUT_DIR = SCRIPTS_DIR / "final_output"
+OUTPUT_DIR = SCRIPTS_DIR / "canonical_output"
+# Kept outside OUTPUT_DIR, whose *.json files are all read as role files by ingest.py
+REPORT_PATH = SCRIPTS_DIR / "dedupe_report.json"
+
+SHINGLE_SIZE = 4          # character n-grams of the normalized question
+NUM_BANDS = 20            # LSH bands x rows = MinHash permutations;
+ROWS_PER_BAND = 6         # candidates start appearing around Jaccard (1/20)^(1/6) ~ 0.61
+JACCARD_THRESHOLD = 0.6   # candidate pairs are confirmed on exact shingle Jaccard
+WORD_THRESHOLD = 0.7      # ...and on content-word Jaccard, so "purpose of Keras" != "purpose of Express"
+SEED = 1234
+
+# Sentence punctuation and quotes only; operators like "/", "//" and "==" distinguish questions
+_PUNCTUATION = re.compile(r"[\s?!,;:'\"`()\[\]{}]+|\.(?=\s|$)")
+_UINT64_MAX = np.iinfo(np.uint64).max
+# Filler words only; question words (why/where/how) change the meaning and are kept
+STOPWORDS = {"a", "an", "the", "is", "are", "of", "in", "on", "for", "to", "and", "or", "do", "does",
+             "you", "your", "we", "it", "its", "be", "can", "with", "by", "as", "at", "from", "this", "that"}
+
+
+def question_key(question: str) -> str:
+    """Normalized question text: numbering, case, sentence punctuation and spacing removed."""
+    return " ".join(_PUNCTUATION.sub(" ", normalize_question(question)).split())
+
+
+def content_words(text: str) -> frozenset:
+    return frozenset(w for w in text.split() if w not in STOPWORDS)
+
+
+def jaccard(x, y) -> float:
+    union = len(x | y)
+    return len(x & y) / union if union else 1.0
+
+
+def shingles(text: str) -> np.ndarray:
+    if len(text) <= SHINGLE_SIZE:
+        grams = {text}
+    else:
+        grams = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash_signatures(shingle_sets, num_perm: int) -> np.ndarray:
+    """(n, num_perm) MinHash signatures using multiply-shift hashes over 32-bit shingle hashes."""
+    rng = np.random.default_rng(SEED)
+    a = rng.integers(1, _UINT64_MAX, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, _UINT64_MAX, size=num_perm, dtype=np.uint64)
+    signatures = np.empty((len(shingle_sets), num_perm), dtype=np.uint64)
+    with np.errstate(over="ignore"):  # wrap-around is the hash
+        for row, values in enumerate(shingle_sets):
+            hashed = (values[:, None] * a[None, :] + b[None, :]) >> np.uint64(32)
+            signatures[row] = hashed.min(axis=0)
+    return signatures
+
+
+class UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, x: int, y: int):
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            self.parent[max(rx, ry)] = min(rx, ry)
+
+
+def load_corpus(input_dir: Path):
+    """Every valid refined record across role files, with its role filled in."""
+    records = []
+    for path in sorted(input_dir.glob("*_refined.json")):
+        role_name = path.name.replace("_refined.json", "").replace("_", " ")
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for entry in data:
+            q = (entry.get("refined_question") or "").strip()
+            if not q or q.lower() == "not a valid question":
+                continue
+            records.append({**entry, "role": entry.get("role", role_name), "_file": path.name})
+    return records
+
+
+def cluster(records, threshold: float = JACCARD_THRESHOLD):
+    """Groups near-duplicate questions with MinHash LSH; returns lists of record indices."""
+    keys = [question_key(r["refined_question"]) for r in records]
+    shingle_sets = [shingles(key) for key in keys]
+    signatures = minhash_signatures(shingle_sets, NUM_BANDS * ROWS_PER_BAND)
+    exact = [set(values.tolist()) for values in shingle_sets]
+    words = [content_words(key) for key in keys]
+
+    def similar(i, j):
+        return jaccard(exact[i], exact[j]) >= threshold and jaccard(words[i], words[j]) >= WORD_THRESHOLD
+
+    groups = UnionFind(len(records))
+    compared = set()
+    for band in range(NUM_BANDS):
+        buckets = defaultdict(list)
+        band_rows = signatures[:, band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        for i, row in enumerate(band_rows):
+            buckets[row.tobytes()].append(i)
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    i, j = members[x], members[y]
+                    root_i, root_j = groups.find(i), groups.find(j)
+                    if (i, j) in compared or root_i == root_j:
+                        continue
+                    compared.add((i, j))
+                    # The clusters' representatives must match too, so A~B~C chains don't drift
+                    if similar(i, j) and similar(root_i, root_j):
+                        groups.union(i, j)
+
+    clusters = defaultdict(list)
+    for i in range(len(records)):
+        clusters[groups.find(i)].append(i)
+    return list(clusters.values())
+
+
+def canonical_records(records, members):
+    """
+    One record per role in the cluster, all sharing the text of the most complete
+    answer but keeping that role's own skill and difficulty, with every
+    role/skill/source of the cluster attached as metadata.
+    """
+    best = max(members, key=lambda i: len(records[i].get("answer") or ""))
+    canonical = {k: v for k, v in records[best].items() if k != "_file"}
+    roles = sorted({records[i]["role"] for i in members})
+    skills = sorted({records[i].get("skill", "N/A") for i in members})
+    sources = sorted({records[i].get("source", "") for i in members} - {""})
+
+    per_role = {}
+    for i in members:
+        role = records[i]["role"]
+        if role in per_role:
+            continue
+        per_role[role] = (records[i]["_file"], {
+            **canonical,
+            "role": role,
+            "skill": records[i].get("skill", canonical.get("skill", "N/A")),
+            # The same question can be Beginner for one role and Advanced for another
+            "difficulty": records[i].get("difficulty", canonical.get("difficulty")),
+            "roles": roles,
+            "skills": skills,
+            "sources": sources,
+            "duplicates": len(members),
+        })
+    return list(per_role.values())
+
+
+def dedupe(input_dir: Path, output_dir: Path, threshold: float, report_path: Path = REPORT_PATH):
+    records = load_corpus(input_dir)
+    clusters = cluster(records, threshold)
+
+    by_file = defaultdict(list)
+    for members in sorted(clusters, key=min):
+        for file_name, record in canonical_records(records, members):
+            by_file[file_name].append(record)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for file_name, file_records in by_file.items():
+        tmp_path = output_dir / f"{file_name}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(file_records, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, output_dir / file_name)
+
+    kept = sum(len(v) for v in by_file.values())
+    texts_before = len({(r["refined_question"], r.get("answer")) for r in records})
+    multi = [m for m in clusters if len(m) > 1]
+    cross_role = [m for m in multi if len({records[i]["role"] for i in m}) > 1]
+    report = {
+        "records_in": len(records),
+        "records_out": kept,
+        "clusters": len(clusters),
+        "duplicate_clusters": len(multi),
+        "cross_role_clusters": len(cross_role),
+        "largest_cluster": max((len(m) for m in clusters), default=0),
+        # Each cluster is embedded once because every role copy shares its text
+        "texts_to_embed_before": texts_before,
+        "texts_to_embed_after": len(clusters),
+        "embedding_savings_pct": round(100 * (1 - len(clusters) / max(1, texts_before)), 1),
+        "threshold": threshold,
+    }
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Read {report['records_in']} records from {input_dir}")
+    print(f"Found {report['duplicate_clusters']} duplicate clusters "
+          f"({report['cross_role_clusters']} spanning several roles, largest {report['largest_cluster']})")
+    print(f"Wrote {report['records_out']} records to {output_dir}; texts to embed "
+          f"{report['texts_to_embed_before']} -> {report['texts_to_embed_after']} "
+          f"(-{report['embedding_savings_pct']}%)")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Cluster near-duplicate questions across role files and write canonical per-role files.")
+    parser.add_argument("--input-dir", type=Path, default=INPUT_DIR)
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--threshold", type=float, default=JACCARD_THRESHOLD,
+                        help="minimum shingle Jaccard similarity for two questions to be merged")
+    parser.add_argument("--report", type=Path, default=REPORT_PATH)
+    args = parser.parse_args()
+    dedupe(args.input_dir, args.output_dir, args.threshold, args.report)
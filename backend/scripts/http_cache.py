@@ -0,0 +1,126 @@
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Iterator, NamedTuple, Optional
+
+
+class CacheEntry(NamedTuple):
+    identity: str
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+class OfflineCacheMiss(Exception):
+    """Raised in offline mode when a page or search was never cached."""
+
+
+def search_identity(params: Dict) -> str:
+    """Stable cache identity for a SerpAPI query; the api_key is not part of it."""
+    return json.dumps({k: v for k, v in params.items() if k != "api_key"}, sort_keys=True)
+
+
+# --------------------------------
+# Persistent page / search cache
+# --------------------------------
+class PageCache:
+    """
+    SQLite cache of zlib-compressed page bodies and SerpAPI result JSON, keyed by
+    hash(kind, url or query). Entries younger than the TTL are served directly;
+    older pages are revalidated with their ETag/Last-Modified. In offline mode
+    every cached entry is served regardless of age and nothing is fetched.
+    Safe to share between threads.
+    """
+    def __init__(self, path, ttl_seconds: float, offline: bool = False):
+        self.ttl_seconds = ttl_seconds
+        self.offline = offline
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " key TEXT PRIMARY KEY, kind TEXT NOT NULL, identity TEXT NOT NULL, body BLOB NOT NULL,"
+            " etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key(kind: str, identity: str) -> str:
+        return hashlib.sha256(f"{kind}\0{identity}".encode("utf-8")).hexdigest()
+
+    def get(self, kind: str, identity: str) -> Optional[CacheEntry]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT identity, body, etag, last_modified, fetched_at FROM pages WHERE key = ?",
+                (self.key(kind, identity),)
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(row[0], zlib.decompress(row[1]).decode("utf-8"), row[2], row[3], row[4])
+
+    def usable(self, entry: Optional[CacheEntry]) -> bool:
+        """True if the entry can be served without touching the network."""
+        if entry is None:
+            return False
+        return self.offline or time.time() - entry.fetched_at < self.ttl_seconds
+
+    def lookup(self, kind: str, identity: str) -> Optional[CacheEntry]:
+        """
+        Returns the entry (usable or not, for revalidation) and counts hits/misses.
+        Raises OfflineCacheMiss when offline and nothing usable is cached.
+        """
+        entry = self.get(kind, identity)
+        if not self.usable(entry) and self.offline:
+            raise OfflineCacheMiss(f"{kind} not cached: {identity}")
+        with self.lock:
+            if self.usable(entry):
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        headers = {}
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def put(self, kind: str, identity: str, body: str, headers=None):
+        headers = headers or {}
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (key, kind, identity, body, etag, last_modified, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.key(kind, identity), kind, identity, zlib.compress(body.encode("utf-8"), 6),
+                 headers.get("ETag"), headers.get("Last-Modified"), time.time())
+            )
+            self.conn.commit()
+
+    def refresh(self, kind: str, identity: str):
+        """Marks an entry fresh again after a 304 Not Modified."""
+        with self.lock:
+            self.revalidated += 1
+            self.conn.execute("UPDATE pages SET fetched_at = ? WHERE key = ?", (time.time(), self.key(kind, identity)))
+            self.conn.commit()
+
+    def entries(self, kind: str) -> Iterator[CacheEntry]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT identity, body, etag, last_modified, fetched_at FROM pages WHERE kind = ? ORDER BY identity",
+                (kind,)
+            ).fetchall()
+        for row in rows:
+            yield CacheEntry(row[0], zlib.decompress(row[1]).decode("utf-8"), row[2], row[3], row[4])
+
+    def stats(self) -> str:
+        return f"hits={self.hits} revalidated={self.revalidated} misses={self.misses}"
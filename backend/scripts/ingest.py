@@ -1,6 +1,11 @@
 import os
 import json
-import uuid
+import time
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timezone
+import numpy as np
 from pinecone import Pinecone, ServerlessSpec
 from sentence_transformers import SentenceTransformer
 from tqdm import tqdm
@@ -16,85 +21,330 @@ MODEL_NAME = "all-MiniLM-L6-v2"
 BASE_DIR = "F:/interview-SaaS/backend"
 MODEL_PATH = os.path.join(BASE_DIR, "embedding", "models--sentence-transformers--all-MiniLM-L6-v2/snapshots\c9745ed1d9f207416be6d2e6f8de32d1f16199bf")  # local model folder
 DATA_DIRECTORY = "F:/interview-SaaS/backend/scripts/final_output"
+# Local memory-mapped copy of everything upserted (read by app.services.local_index)
+EMBEDDING_STORE_DIR = os.path.join(BASE_DIR, "embedding_store")
+# Record of which vector ids are live in the Pinecone index, for incremental re-runs
+MANIFEST_PATH = os.path.join(EMBEDDING_STORE_DIR, "ingest_manifest.json")
+STORE_FORMAT_VERSION = 1
+FILTER_FIELDS = ("role", "skill", "difficulty")
 
 CLOUD = "aws"
 REGION = "us-east-1"
 
-# Init Pinecone
-pc = Pinecone(api_key=PINECONE_API_KEY)
-
-# ✅ Directly create new index
-print(f"Creating index '{INDEX_NAME}'...")
-pc.create_index(
-    name=INDEX_NAME,
-    dimension=384,  # MiniLM dimension
-    metric="cosine",
-    spec=ServerlessSpec(cloud=CLOUD, region=REGION)
-)
-
-index = pc.Index(INDEX_NAME)
-
-# Load local model if available, else download once
-if os.path.exists(MODEL_PATH):
-    print(f"Loading model from local path: {MODEL_PATH}")
-    model = SentenceTransformer(MODEL_PATH)
-else:
+UPSERT_CHUNK_SIZE = 100      # vectors per Pinecone upsert request
+ENCODE_BATCH_SIZE = 512      # texts per encode call
+UPSERT_WORKERS = 4           # concurrent upsert requests
+DELETE_CHUNK_SIZE = 1000     # ids per Pinecone delete request
+
+
+def load_model():
+    # Load local model if available, else download once
+    if os.path.exists(MODEL_PATH):
+        print(f"Loading model from local path: {MODEL_PATH}")
+        return SentenceTransformer(MODEL_PATH)
     print("Downloading model for the first time...")
-    model = SentenceTransformer(MODEL_NAME, cache_folder=MODEL_PATH)
-
-# Collect JSON files
-json_files = [f for f in os.listdir(DATA_DIRECTORY) if f.endswith(".json")]
-
-batch_size = 100
-upsert_data = []
-
-for file_name in json_files:
-    full_path = os.path.join(DATA_DIRECTORY, file_name)
-    with open(full_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    
-    role_name = file_name.replace("_refined.json", "").replace("_", " ")
-
-    for entry in tqdm(data, desc=f"Processing {file_name}"):
-        q = entry.get("refined_question", "").strip()
-        a = entry.get("answer", "").strip()
-
-        # Skip invalid or garbage entries
-        if not q or q.lower() == "not a valid question":
-            continue  
-
-        # Main searchable content
-        page_content = f"Question: {q}\nAnswer: {a}"
-
-        embedding = model.encode(page_content).tolist()
-
-        # Metadata (extra context)
-        metadata = {
-            "role": entry.get("role", role_name),
-            "skill": entry.get("skill", "N/A"),
-            "difficulty": entry.get("difficulty", "N/A"),
-            "source": entry.get("source", ""),
-            "original_question": entry.get("original_question", ""),
-            "answer": a
-        }
-
-        # ✅ Store page_content under "text" so retriever can build Document()
-        upsert_data.append(
-            (
-                str(uuid.uuid4()),
-                embedding,
-                {"page_content": page_content, **metadata}
-            )
-        )
-
-        # Batch upload
-        if len(upsert_data) >= batch_size:
-            index.upsert(vectors=upsert_data)
-            upsert_data = []
-
-# Final upload if leftover
-if upsert_data:
-    index.upsert(vectors=upsert_data)
-
-print("✅ Data ingestion complete.")
-print("Total vectors:", index.describe_index_stats())
+    return SentenceTransformer(MODEL_NAME, cache_folder=MODEL_PATH)
+
+
+def record_id(role, question, answer):
+    """Stable vector id: the same role + question + answer always maps to the same id."""
+    return hashlib.sha256(f"{role}\x1f{question}\x1f{answer}".encode("utf-8")).hexdigest()[:32]
+
+
+def metadata_digest(metadata):
+    """
+    Digest of a record's metadata, kept in the manifest: a corrected skill or
+    difficulty keeps the vector id but must still be re-upserted.
+    """
+    return hashlib.sha256(json.dumps(metadata, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def collect_records(data_directory):
+    """Reads every JSON file up front so encoding can run in large batches across files."""
+    json_files = [f for f in os.listdir(data_directory) if f.endswith(".json")]
+    ids, texts, metadatas = [], [], []
+    seen = set()
+
+    for file_name in tqdm(json_files, desc="Reading files"):
+        full_path = os.path.join(data_directory, file_name)
+        with open(full_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        role_name = file_name.replace("_refined.json", "").replace("_", " ")
+
+        for entry in data:
+            q = entry.get("refined_question", "").strip()
+            a = entry.get("answer", "").strip()
+
+            # Skip invalid or garbage entries
+            if not q or q.lower() == "not a valid question":
+                continue
+
+            role = entry.get("role", role_name)
+            vector_id = record_id(role, q, a)
+            if vector_id in seen:  # exact duplicate within the corpus
+                continue
+            seen.add(vector_id)
+            ids.append(vector_id)
+
+            # Main searchable content
+            texts.append(f"Question: {q}\nAnswer: {a}")
+
+            # Metadata (extra context)
+            metadatas.append({
+                "role": role,
+                "skill": entry.get("skill", "N/A"),
+                "difficulty": entry.get("difficulty", "N/A"),
+                "source": entry.get("source", ""),
+                "original_question": entry.get("original_question", ""),
+                "answer": a
+            })
+
+    return ids, texts, metadatas
+
+
+def encode_in_batches(model, texts, batch_size, pool=None):
+    """Yields (start, embeddings) per batch; uses the multi-process pool when given."""
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        if pool is not None:
+            embeddings = model.encode_multi_process(batch, pool, batch_size=min(batch_size, 128))
+        else:
+            embeddings = model.encode(batch, batch_size=min(batch_size, 128), show_progress_bar=False)
+        yield start, np.asarray(embeddings, dtype=np.float32)
+
+
+def write_embedding_store(ids, embeddings, texts, metadatas):
+    """
+    Writes a new version of the local embedding store and makes it current:
+    embeddings.npy (normalized float32 matrix, opened with mmap by the server),
+    texts.bin (concatenated UTF-8 page_content) and metadata.json (ids,
+    dictionary-encoded role/skill/difficulty columns, byte offsets into texts.bin).
+    """
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    version_dir = os.path.join(EMBEDDING_STORE_DIR, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    matrix = np.asarray(embeddings, dtype=np.float32)  # (len(ids), dim), even when empty
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1, norms)
+    np.save(os.path.join(version_dir, "embeddings.npy"), matrix)
+
+    offsets = [0]
+    with open(os.path.join(version_dir, "texts.bin"), "wb") as f:
+        for text in texts:
+            encoded = text.encode("utf-8")
+            f.write(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+
+    columns = {}
+    for field in FILTER_FIELDS:
+        vocab = {}
+        codes = [vocab.setdefault(str(m[field]), len(vocab)) for m in metadatas]
+        columns[field] = {"values": list(vocab), "codes": codes}
+
+    with open(os.path.join(version_dir, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "format_version": STORE_FORMAT_VERSION,
+            "model": MODEL_NAME,
+            "dim": int(matrix.shape[1]) if len(ids) else 0,
+            "count": len(ids),
+            "created_at": version,
+            "ids": ids,
+            "columns": columns,
+            "offsets": offsets
+        }, f, ensure_ascii=False)
+
+    # Switch readers to the new version atomically
+    current_tmp = os.path.join(EMBEDDING_STORE_DIR, "CURRENT.tmp")
+    with open(current_tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(current_tmp, os.path.join(EMBEDDING_STORE_DIR, "CURRENT"))
+    print(f"Wrote embedding store version {version} ({len(ids)} vectors) to {version_dir}")
+
+
+def load_manifest():
+    """
+    Id -> metadata_digest() of everything upserted by previous runs, or an
+    empty manifest if there is none or the model changed.
+    """
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("index") != INDEX_NAME or manifest.get("model") != MODEL_NAME:
+        print("⚠️ Manifest was written for a different index/model; re-ingesting everything.")
+        return {}
+    return manifest["ids"]
+
+
+def save_manifest(ids):
+    os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"index": INDEX_NAME, "model": MODEL_NAME, "ids": ids}, f)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def load_previous_embeddings():
+    """Maps id -> row of the current embedding store so unchanged records are not re-encoded."""
+    current_path = os.path.join(EMBEDDING_STORE_DIR, "CURRENT")
+    if not os.path.exists(current_path):
+        return {}, None
+    with open(current_path, "r", encoding="utf-8") as f:
+        version_dir = os.path.join(EMBEDDING_STORE_DIR, f.read().strip())
+    with open(os.path.join(version_dir, "metadata.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format_version") != STORE_FORMAT_VERSION or meta.get("model") != MODEL_NAME:
+        return {}, None
+    matrix = np.load(os.path.join(version_dir, "embeddings.npy"), mmap_mode="r")
+    return {vector_id: row for row, vector_id in enumerate(meta["ids"])}, matrix
+
+
+def ensure_index(pc):
+    if INDEX_NAME in pc.list_indexes().names():
+        print(f"Using existing index '{INDEX_NAME}'")
+        return
+    print(f"Creating index '{INDEX_NAME}'...")
+    pc.create_index(
+        name=INDEX_NAME,
+        dimension=384,  # MiniLM dimension
+        metric="cosine",
+        spec=ServerlessSpec(cloud=CLOUD, region=REGION)
+    )
+
+
+def ingest(args):
+    # Init Pinecone
+    pc = Pinecone(api_key=PINECONE_API_KEY)
+    ensure_index(pc)
+    index = pc.Index(INDEX_NAME)
+
+    ids, texts, metadatas = collect_records(args.data_dir)
+    print(f"Collected {len(texts)} records from {args.data_dir}")
+
+    # --- Diff against what previous runs upserted ---
+    manifest = {} if args.full else load_manifest()
+    current = set(ids)
+    digests = [metadata_digest(metadata) for metadata in metadatas]
+    to_upsert = [i for i, vector_id in enumerate(ids) if manifest.get(vector_id) != digests[i]]
+    removed = [vector_id for vector_id in manifest if vector_id not in current]
+    print(f"Diff: {len(to_upsert)} new/changed, {len(removed)} removed, "
+          f"{len(ids) - len(to_upsert)} unchanged")
+
+    # Unchanged records reuse their vectors from the local store; anything
+    # missing there is encoded too but not re-upserted. Records whose id was
+    # upserted before only changed metadata (the id covers the embedded text),
+    # so they reuse their vector and are just re-upserted.
+    previous_rows, previous_matrix = load_previous_embeddings()
+    upsert_set = set(to_upsert)
+    metadata_only = [i for i in to_upsert if ids[i] in manifest and ids[i] in previous_rows]
+    reused = set(metadata_only)
+    to_encode = [i for i in range(len(ids)) if (i in upsert_set and i not in reused) or ids[i] not in previous_rows]
+
+    started = time.perf_counter()
+    for start in range(0, len(removed), DELETE_CHUNK_SIZE):
+        index.delete(ids=removed[start:start + DELETE_CHUNK_SIZE])
+
+    # Nothing to encode on a no-op re-run, so skip loading the model entirely
+    model = load_model() if to_encode else None
+    if model is not None:
+        dim = model.get_sentence_embedding_dimension()
+    elif previous_matrix is not None:
+        dim = previous_matrix.shape[1]
+    else:
+        dim = None  # no records and no previous store (e.g. an empty data dir on a first run)
+    all_embeddings = np.zeros((len(texts), dim or 0), dtype=np.float32)
+    for i, vector_id in enumerate(ids):
+        if (i not in upsert_set or i in reused) and vector_id in previous_rows:
+            all_embeddings[i] = previous_matrix[previous_rows[vector_id]]
+
+    # Rows sharing a text (e.g. canonical_output copies of one question under
+    # several roles) are encoded once and the vector copied to the others
+    first_row, twins = {}, {}
+    for i in to_encode:
+        representative = first_row.setdefault(texts[i], i)
+        if representative != i:
+            twins.setdefault(representative, []).append(i)
+    encode_rows = [i for i in to_encode if first_row[texts[i]] == i]
+
+    pool = None
+    if to_encode and args.processes > 1:
+        pool = model.start_multi_process_pool(target_devices=["cpu"] * args.processes)
+        print(f"Encoding with a {args.processes}-process pool")
+
+    encode_seconds = 0.0
+    upserted = 0
+    in_flight = set()
+
+    # Encoding runs on this thread while earlier batches upload on the pool,
+    # so network time overlaps with CPU time.
+    with ThreadPoolExecutor(max_workers=args.upsert_workers) as uploader, \
+            tqdm(total=len(to_upsert), desc="Encoding + upserting") as progress:
+        def submit_upserts(pending):
+            nonlocal in_flight, upserted
+            for chunk_start in range(0, len(pending), UPSERT_CHUNK_SIZE):
+                # ✅ Store page_content so retriever can build Document()
+                vectors = [
+                    (ids[i], all_embeddings[i].tolist(), {"page_content": texts[i], **metadatas[i]})
+                    for i in pending[chunk_start:chunk_start + UPSERT_CHUNK_SIZE]
+                ]
+                # Bound memory: never hold more than a few chunks waiting on the network
+                while len(in_flight) >= args.upsert_workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                future = uploader.submit(index.upsert, vectors=vectors)
+                future.add_done_callback(lambda _f, n=len(vectors): progress.update(n))
+                in_flight.add(future)
+                upserted += len(vectors)
+
+        submit_upserts(metadata_only)
+        batches = encode_in_batches(model, [texts[i] for i in encode_rows], args.batch_size, pool) if to_encode else iter(())
+        while True:
+            t0 = time.perf_counter()
+            batch = next(batches, None)
+            encode_seconds += time.perf_counter() - t0
+            if batch is None:
+                break
+            start, embeddings = batch
+            rows = encode_rows[start:start + len(embeddings)]
+            all_embeddings[rows] = embeddings
+            for row in list(rows):
+                for twin in twins.get(row, ()):
+                    all_embeddings[twin] = all_embeddings[row]
+                    rows.append(twin)
+            submit_upserts([i for i in rows if i in upsert_set])
+
+        for future in in_flight:
+            future.result()
+
+    if pool is not None:
+        model.stop_multi_process_pool(pool)
+
+    total_seconds = time.perf_counter() - started
+    print(f"Encoded {len(encode_rows)} unique texts for {len(to_encode)} vectors in {encode_seconds:.1f}s "
+          f"({len(encode_rows) / max(encode_seconds, 1e-9):.0f} texts/sec)")
+    print(f"Upserted {upserted} and deleted {len(removed)} vectors in {total_seconds:.1f}s "
+          f"({(len(to_encode) + upserted) / max(total_seconds, 1e-9):.0f} vectors/sec end to end)")
+
+    # Everything above succeeded, so the index now holds exactly `ids`
+    save_manifest({vector_id: digests[i] for i, vector_id in enumerate(ids)})
+    if dim is None:
+        print("No records and no previous embedding store; not writing a store.")
+    else:
+        write_embedding_store(ids, all_embeddings, texts, metadatas)
+
+    print("✅ Data ingestion complete.")
+    print("Total vectors:", index.describe_index_stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Encode the refined question bank and upsert it to Pinecone.")
+    parser.add_argument("--data-dir", default=DATA_DIRECTORY)
+    parser.add_argument("--batch-size", type=int, default=ENCODE_BATCH_SIZE, help="texts per encode batch")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="encode with a SentenceTransformer multi-process pool of this many workers (1 = in-process)")
+    parser.add_argument("--upsert-workers", type=int, default=UPSERT_WORKERS, help="concurrent upsert requests")
+    parser.add_argument("--full", action="store_true", help="ignore the manifest and re-upsert every record")
+    ingest(parser.parse_args())
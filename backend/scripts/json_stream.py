@@ -0,0 +1,122 @@
+import re
+import json
+import logging
+from typing import Any, Dict, List
+
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+# -------------------------------
+# Incremental JSON object parser
+# -------------------------------
+class IncrementalJSONParser:
+    """
+    Extracts top-level JSON objects from text that arrives in chunks, e.g. an LLM
+    streaming a JSON array wrapped in prose or ``` fences.
+
+    Braces are only counted outside string literals, so answers containing code
+    ({...}, "}", escaped quotes) don't split objects. feed() returns every object
+    that closed within the chunk; a truncated final object is simply never
+    returned, so a cut-off response still yields its complete prefix.
+
+    With strict=True the input must be exactly a JSON array of objects (a file,
+    not a chat response): anything else between objects, such as a string or
+    number element or a non-array root, raises ValueError, and `closed` tells
+    whether the array's "]" has been seen.
+    """
+    def __init__(self, strict: bool = False):
+        self.strict = strict
+        self._expect = "["     # strict mode: next structural token allowed between objects
+        self._buf = ""
+        self._pos = 0          # next index of _buf to scan
+        self._start = None     # index of the current object's "{" in _buf
+        self._depth = 0
+        self._in_string = False
+        self.errors = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self._buf += chunk
+        buf, pos = self._buf, self._pos
+        completed = []
+
+        while True:
+            if self._in_string:
+                m = _STRING_SPECIAL.search(buf, pos)
+                if m is None:
+                    pos = len(buf)
+                    break
+                if m.group() == "\\":
+                    if m.end() >= len(buf):  # escape split across chunks; wait for the next one
+                        pos = m.start()
+                        break
+                    pos = m.end() + 1
+                else:
+                    self._in_string = False
+                    pos = m.end()
+            elif self._depth == 0:
+                start = self._scan_array(buf, pos) if self.strict else buf.find("{", pos)
+                if start == -1:
+                    # Nothing but prose or array punctuation so far; drop it
+                    buf, pos = "", 0
+                    break
+                self._start, self._depth, pos = start, 1, start + 1
+            else:
+                m = _STRUCTURAL.search(buf, pos)
+                if m is None:
+                    pos = len(buf)
+                    break
+                pos = m.end()
+                char = m.group()
+                if char == '"':
+                    self._in_string = True
+                elif char in "{[":
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._emit(buf[self._start:pos], completed)
+                        buf, pos, self._start = buf[pos:], 0, None
+                        self._expect = ",]"
+
+        self._buf, self._pos = buf, pos
+        return completed
+
+    def _scan_array(self, buf: str, pos: int) -> int:
+        """Strict mode: validates the array punctuation from pos; index of the next "{", or -1."""
+        for i in range(pos, len(buf)):
+            char = buf[i]
+            if char.isspace():
+                continue
+            if char not in self._expect:
+                raise ValueError(f"expected one of {self._expect!r} in a JSON array of objects, got {char!r}")
+            if char == "{":
+                return i
+            self._expect = {"[": "{]", ",": "{", "]": ""}[char]
+        return -1
+
+    @property
+    def closed(self) -> bool:
+        """Strict mode: the top-level array has been closed."""
+        return self._expect == ""
+
+    def _emit(self, text: str, completed: List[Dict[str, Any]]):
+        try:
+            # strict=False accepts raw newlines/tabs inside strings, which LLMs emit freely
+            obj = json.loads(text, strict=False)
+        except json.JSONDecodeError as e:
+            self.errors += 1
+            logging.warning(f"Could not parse a JSON object: {e}\nProblematic string: {text[:100]}...")
+            return
+        if isinstance(obj, dict):
+            completed.append(obj)
+
+    @property
+    def pending(self) -> str:
+        """Text of an object that has started but not closed (e.g. after truncation)."""
+        return self._buf[self._start:] if self._start is not None else ""
+
+
+def parse_json_objects(text: str) -> List[Dict[str, Any]]:
+    """Parses every complete top-level JSON object in a full response."""
+    return IncrementalJSONParser().feed(text)
@@ -0,0 +1,74 @@
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Optional
+
+# Leading list numbering scraped with questions ("12. ", "Q3) ", "Q. ") is not part of the question
+_NUMBERING = re.compile(r"^\s*(?:q(?:uestion)?\s*)?\d*\s*[.):-]\s*", re.IGNORECASE)
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(_NUMBERING.sub("", question, count=1).lower().split())
+
+
+def prompt_version(model: str, system_prompt: str) -> str:
+    """Changes whenever the model or system prompt changes, invalidating old entries."""
+    return hashlib.sha256(f"{model}\0{system_prompt}".encode("utf-8")).hexdigest()[:16]
+
+
+# -------------------------------
+# Content-addressed LLM response cache
+# -------------------------------
+class ResponseCache:
+    """
+    Persistent SQLite cache of per-question LLM results keyed by
+    hash(version, normalized question), where the version covers the model
+    and system prompt. Safe to share between worker threads.
+    """
+    def __init__(self, path, version: str):
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, version TEXT NOT NULL, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def key(self, question: str) -> str:
+        return hashlib.sha256(f"{self.version}\0{normalize_question(question)}".encode("utf-8")).hexdigest()
+
+    def get(self, question: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM responses WHERE key = ?", (self.key(question),)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, question: str, value: Dict):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, version, value, created_at) VALUES (?, ?, ?, ?)",
+                (self.key(question), self.version, json.dumps(value, ensure_ascii=False), time.time())
+            )
+            self.conn.commit()
+
+    def prune_stale_versions(self) -> int:
+        """Deletes entries written under any other prompt version; returns the count."""
+        with self.lock:
+            deleted = self.conn.execute("DELETE FROM responses WHERE version != ?", (self.version,)).rowcount
+            self.conn.commit()
+            return deleted
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"hits={self.hits} misses={self.misses} hit_rate={rate:.1f}%"
@@ -1,13 +1,18 @@
 import os
 import json
 import time
+import hashlib
 import logging
+import threading
 from pathlib import Path
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from groq import Groq
+from groq import Groq, RateLimitError, APIConnectionError, InternalServerError
 import re
+from rate_limiter import RateLimiter
+from llm_cache import ResponseCache, prompt_version
+from json_stream import IncrementalJSONParser, parse_json_objects
 
 # -------------------------------
 # Setup logging
@@ -34,7 +39,9 @@ try:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     if not GROQ_API_KEY:
         raise ValueError("GROQ_API_KEY not found in .env file.")
-    client = Groq(api_key=GROQ_API_KEY)
+    # Retries (429s, connection errors, timeouts, 5xx) are handled in create_completion
+    # so every attempt goes back through the shared limiter
+    client = Groq(api_key=GROQ_API_KEY, max_retries=0)
 except Exception as e:
     logging.error(f"Failed to initialize API client: {e}")
     exit(1) # Exit if the API key isn't found
@@ -47,11 +54,29 @@ BASE_DIR = Path(__file__).parent
 INPUT_DIR = BASE_DIR / "output_new"
 OUTPUT_DIR = BASE_DIR / "final_output"
 OUTPUT_DIR.mkdir(exist_ok=True) # Ensure the output directory exists
+CHECKPOINT_DIR = BASE_DIR / "checkpoints"  # append-only per-role batch results
+CHECKPOINT_DIR.mkdir(exist_ok=True)
+CACHE_PATH = BASE_DIR / "llm_cache.sqlite"  # per-question results shared across roles and runs
 
-BATCH_SIZE = 15
+# Batches are packed by estimated output tokens instead of a fixed count
+MAX_OUTPUT_TOKENS = 8000          # max_tokens sent with each call
+OUTPUT_BUDGET_FILL = 0.75         # pack expected output up to this share of MAX_OUTPUT_TOKENS
+MAX_BATCH_SIZE = 40               # hard cap so answers stay aligned with questions
+MAX_SPLIT_DEPTH = 3               # how many times a truncated batch may be halved and retried
 MODEL =  "llama-3.1-8b-instant"  #"gemma2-9b-it"#"deepseek-r1-distill-llama-70b" #"llama-3.3-70b-versatile" # Using a known stable model from Groq
 API_TIMEOUT = 120 # Seconds to wait for API response
 
+# Groq quotas for MODEL; override in .env to match your account tier
+GROQ_RPM = int(os.getenv("GROQ_RPM", "30"))
+GROQ_TPM = int(os.getenv("GROQ_TPM", "6000"))
+MAX_IN_FLIGHT = int(os.getenv("REFINE_MAX_IN_FLIGHT", "4"))  # concurrent process_batch calls
+MAX_API_RETRIES = 5               # attempts per call across 429s and transient errors
+MAX_BACKOFF_SECONDS = 30
+CONCEPTUAL_OUTPUT_TOKENS = 250    # rough size of one refined text-only answer
+CODING_OUTPUT_TOKENS = 650        # explanation + code block
+
+rate_limiter = RateLimiter(GROQ_RPM, GROQ_TPM)
+
 # -------------------------------
 # System Prompt
 # -------------------------------
@@ -74,8 +99,9 @@ First, determine if the question is primarily **Conceptual** or **Coding**.
 
 Finally, assign a difficulty level: "Beginner", "Intermediate", or "Advanced".
 
-Your final output MUST be a valid JSON array of objects. Each object in the array must strictly conform to the following structure:
+Your final output MUST be a valid JSON array of objects, one per input question, in the input order. Each object in the array must strictly conform to the following structure:
 {
+  "id": The number of the input question this object answers (1, 2, 3, ...),
   "refined_question": "The improved question text.",
   "answer": "The detailed answer in Markdown format, following the rules above.",
   "difficulty": "One of 'Beginner', 'Intermediate', or 'Advanced'."
@@ -84,145 +110,307 @@ Your final output MUST be a valid JSON array of objects. Each object in the arra
 Do NOT include any text, explanations, or markdown outside of the final JSON array.
 """
 
+# Entries are keyed by model + SYSTEM_PROMPT, so editing the prompt invalidates them
+response_cache = ResponseCache(CACHE_PATH, prompt_version(MODEL, SYSTEM_PROMPT))
+CACHED_FIELDS = ("refined_question", "answer", "difficulty")
+
 # -------------------------------
-# NEW: Robust JSON Parsing Function
-# This is the core fix for your problem.
+# JSON parsing
 # -------------------------------
 def parse_llm_json_output(text: str) -> List[Dict[str, Any]]:
     """
-    Finds and parses all JSON objects embedded within a string.
-    This is much more robust than trying to parse the whole string as one.
+    Finds and parses all JSON objects embedded within a complete response.
+    Streaming calls feed an IncrementalJSONParser chunk by chunk instead.
     """
-    # Regex to find all occurrences of text between {...}, non-greedily
-    json_object_pattern = re.compile(r'\{.*?\}', re.DOTALL)
-    
-    potential_json_strings = json_object_pattern.findall(text)
-    
-    parsed_objects = []
-    for json_str in potential_json_strings:
+    return parse_json_objects(text)
+
+# -------------------------------
+# Rate-limited API call
+# -------------------------------
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for TPM budgeting."""
+    return len(text) // 4 + 1
+
+
+def create_completion(messages: List[Dict], estimated_tokens: int, max_tokens: int = MAX_OUTPUT_TOKENS):
+    """
+    Starts a streamed Groq completion once the shared limiter admits the request.
+    On a 429 every worker pauses for the server's retry-after before this call is
+    retried; connection errors, timeouts and 5xx back off this call only. The
+    caller consumes the stream and reports usage to the limiter.
+    """
+    for attempt in range(1, MAX_API_RETRIES + 1):
+        rate_limiter.acquire(estimated_tokens)
         try:
-            # Clean up newlines and backslashes that might break parsing
-            clean_str = json_str.replace('\n', ' ').replace('\r', '')
-            parsed_objects.append(json.loads(clean_str))
-        except json.JSONDecodeError as e:
-            logging.warning(f"Could not parse a JSON object: {e}\nProblematic string: {json_str[:100]}...")
-            
-    return parsed_objects
+            response = client.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                temperature=0.3,
+                max_tokens=max_tokens,
+                timeout=API_TIMEOUT,
+                stream=True,
+            )
+        except RateLimitError as e:
+            retry_after = e.response.headers.get("retry-after")
+            delay = float(retry_after) if retry_after else 2 ** attempt
+            logging.warning(f"Rate limited (attempt {attempt}/{MAX_API_RETRIES}); pausing {delay:.1f}s")
+            rate_limiter.pause(delay)
+            continue
+        except (APIConnectionError, InternalServerError) as e:  # APITimeoutError is a connection error
+            delay = min(2 ** attempt, MAX_BACKOFF_SECONDS)
+            logging.warning(f"Transient API error (attempt {attempt}/{MAX_API_RETRIES}): {e}; retrying in {delay}s")
+            time.sleep(delay)
+            continue
+        return response
+    raise RuntimeError(f"API call still failing after {MAX_API_RETRIES} attempts")
 
 # -------------------------------
-# Process batch of questions (updated)
+# Token-aware batching
 # -------------------------------
-def process_batch(questions_batch: List[Dict], role: str) -> List[Dict]:
+CODING_HINTS = re.compile(
+    r"\b(write|implement|code|program|function|algorithm|query|script|snippet|reverse|sort|"
+    r"find the|print|return|class|method|sql)\b",
+    re.IGNORECASE
+)
+
+_batch_stats = {"calls": 0, "questions": 0, "splits": 0, "failed_questions": 0}
+_batch_stats_lock = threading.Lock()
+
+
+def expected_output_tokens(qa: Dict) -> int:
+    """Estimated answer size: coding questions get an explanation plus a code block."""
+    question = qa["question"]
+    base = CODING_OUTPUT_TOKENS if CODING_HINTS.search(question) else CONCEPTUAL_OUTPUT_TOKENS
+    # the refined question is echoed back, plus JSON keys and metadata
+    return base + estimate_tokens(question) + 30
+
+
+def pack_batches(questions: List[Dict]) -> List[List[Dict]]:
     """
-    Sends a batch of questions to the LLM and processes the response.
+    Greedily packs questions, in order, into batches whose expected output fills
+    but does not exceed OUTPUT_BUDGET_FILL of MAX_OUTPUT_TOKENS.
     """
-    logging.info(f"Processing batch of {len(questions_batch)} questions for role: {role}")
+    budget = MAX_OUTPUT_TOKENS * OUTPUT_BUDGET_FILL
+    batches, current, current_tokens = [], [], 0
+    for qa in questions:
+        tokens = expected_output_tokens(qa)
+        if current and (current_tokens + tokens > budget or len(current) >= MAX_BATCH_SIZE):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(qa)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _record_batch_stats(**deltas):
+    with _batch_stats_lock:
+        for key, value in deltas.items():
+            _batch_stats[key] += value
 
+
+def batch_stats() -> str:
+    with _batch_stats_lock:
+        calls = _batch_stats["calls"]
+        per_call = _batch_stats["questions"] / calls if calls else 0.0
+        return (f"calls={calls} questions/call={per_call:.1f} splits={_batch_stats['splits']} "
+                f"failed_questions={_batch_stats['failed_questions']}")
+
+# -------------------------------
+# Process batch of questions (updated)
+# -------------------------------
+def build_user_prompt(questions_batch: List[Dict], role: str) -> str:
     user_prompt = f"Process the following interview questions for the role: **{role}**.\n\n"
     for idx, qa in enumerate(questions_batch, 1):
         # Constructing a clean list for the prompt
         user_prompt += f"{idx}. Question: \"{qa['question']}\"\n"
         # Optional: include skill if available and useful
         # user_prompt += f"   Skill: {qa.get('skill', 'N/A')}\n"
+    return user_prompt
+
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+_FILLER_WORDS = {"a", "an", "the", "is", "are", "of", "in", "on", "for", "to", "and", "or", "what", "how",
+                 "do", "does", "you", "your", "it", "its", "be", "can", "with", "by", "as", "at", "this", "that"}
+MIN_QUESTION_OVERLAP = 0.3  # share of the shorter question's content words the refined one must keep
+
+
+def same_question(original: str, refined: str) -> bool:
+    """Loose check that a refined question is a rewrite of the original, not another item's."""
+    a = set(_WORD.findall(original.lower())) - _FILLER_WORDS
+    b = set(_WORD.findall((refined or "").lower())) - _FILLER_WORDS
+    if not a or not b:
+        return bool(refined)
+    return len(a & b) / min(len(a), len(b)) >= MIN_QUESTION_OVERLAP
+
+
+def match_item(refined_item: Dict, questions_batch: List[Dict], answered: Dict[int, Dict]) -> Optional[int]:
+    """
+    Index of the batch question this answer belongs to: the echoed "id" when
+    present, otherwise the next unanswered position, and only if the refined
+    question still reads like that original. None when it can't be placed.
+    """
+    item_id = refined_item.pop("id", None)
+    try:
+        index = int(item_id) - 1
+    except (TypeError, ValueError):
+        index = len(answered)
+    if not 0 <= index < len(questions_batch) or index in answered:
+        return None
+    if not same_question(questions_batch[index]["question"], refined_item.get("refined_question")):
+        return None
+    return index
+
+
+def process_batch(questions_batch: List[Dict], role: str, depth: int = 0) -> List[Dict]:
+    """
+    Streams a batch of questions through the LLM, matching each answer to its
+    question (echoed id plus a similarity check) as soon as its JSON object
+    closes. Answers are cached only when every received answer matched; a
+    skipped, merged or reordered item caches nothing. Unanswered questions are
+    split in half and retried, up to MAX_SPLIT_DEPTH.
+    """
+    logging.info(f"Processing batch of {len(questions_batch)} questions for role: {role}")
+    user_prompt = build_user_prompt(questions_batch, role)
+    estimated_tokens = estimate_tokens(SYSTEM_PROMPT + user_prompt) \
+        + sum(expected_output_tokens(qa) for qa in questions_batch)
+
+    parser = IncrementalJSONParser()
+    answered: Dict[int, Dict] = {}
+    content = []
+    truncated = False
+    misaligned = False
+
+    def accept(refined_item: Dict):
+        # Merge original metadata as soon as the object closes, once it is placed
+        nonlocal misaligned
+        index = match_item(refined_item, questions_batch, answered)
+        if index is None:
+            misaligned = True
+            return
+        original_item = questions_batch[index]
+        refined_item["original_question"] = original_item["question"]
+        refined_item["role"] = role
+        refined_item["skill"] = original_item.get("skill", "N/A")
+        refined_item["source"] = original_item.get("source", "N/A")
+        answered[index] = refined_item
 
     try:
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
+        stream = create_completion(
+            [
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
-            temperature=0.3,
-            max_tokens=8000,
-            timeout=API_TIMEOUT,
+            estimated_tokens=estimated_tokens
         )
-        content = response.choices[0].message.content
-        
-        # Use the new robust parsing function
-        refined_data = parse_llm_json_output(content)
+        _record_batch_stats(calls=1, questions=len(questions_batch))
+        usage = None
+        for chunk in stream:
+            if chunk.choices:
+                choice = chunk.choices[0]
+                text = choice.delta.content or ""
+                content.append(text)
+                for refined_item in parser.feed(text):
+                    accept(refined_item)
+                if choice.finish_reason is not None:
+                    truncated = choice.finish_reason == "length"
+            x_groq = getattr(chunk, "x_groq", None)
+            if x_groq is not None and getattr(x_groq, "usage", None) is not None:
+                usage = x_groq.usage
+        if usage is not None:
+            rate_limiter.record_usage(estimated_tokens, usage.total_tokens)
 
-        if not refined_data:
+        if not answered:
             # Save the raw content for manual review if parsing still fails
-            fallback_path = OUTPUT_DIR / f"{role.replace(' ', '_')}_FAILED_RAW_{int(time.time())}.txt"
+            fallback_path = OUTPUT_DIR / f"{role.replace(' ', '_')}_FAILED_RAW_{time.time_ns()}.txt"
             with open(fallback_path, "w", encoding="utf-8") as f:
-                f.write(content)
+                f.write("".join(content))
             logging.error(f"Could not parse response for role {role}. Saved raw output to {fallback_path}")
-            return [] # Return empty list to signify failure for this batch
-
-        # Merge original metadata with the refined data
-        if len(refined_data) != len(questions_batch):
-            logging.warning(f"Mismatch in count for role {role}. "
-                            f"Sent {len(questions_batch)} questions but received {len(refined_data)} answers.")
-        
-        # Safely merge metadata, even if counts mismatch
-        for i, refined_item in enumerate(refined_data):
-            if i < len(questions_batch):
-                original_item = questions_batch[i]
-                refined_item["original_question"] = original_item["question"]
-                refined_item["role"] = role
-                refined_item["skill"] = original_item.get("skill", "N/A")
-                refined_item["source"] = original_item.get("source", "N/A")
 
+    except Exception as e:
+        logging.error(f"An API error occurred while processing batch for role {role}: {e}")
+        if not answered:
+            return [] # Return empty list on API error; the checkpoint retries it next run
+        # The stream broke mid-response: keep the answers that already closed
+        truncated = True
+
+    refined_data = [answered[i] for i in sorted(answered)]
+    if misaligned:
+        # The answers can't be trusted to sit under the right questions; don't persist them
+        logging.warning(f"Misaligned response for role {role}: answers not matching their questions; "
+                        f"nothing from this batch is cached.")
+    else:
+        for index, refined_item in answered.items():
+            response_cache.put(questions_batch[index]["question"], {k: refined_item.get(k) for k in CACHED_FIELDS})
+
+    missing = [qa for i, qa in enumerate(questions_batch) if i not in answered]
+    if not missing:
         logging.info(f"Successfully processed batch for role: {role}")
         return refined_data
 
-    except Exception as e:
-        logging.error(f"An API error occurred while processing batch for role {role}: {e}")
-        return [] # Return empty list on API error
+    logging.warning(f"{'Truncated' if truncated else 'Short'} response for role {role}: "
+                    f"sent {len(questions_batch)} questions, received {len(refined_data)} answers.")
+    if depth >= MAX_SPLIT_DEPTH:
+        _record_batch_stats(failed_questions=len(missing))
+        return refined_data
+
+    # Retry what is missing in smaller pieces so each fits the output budget
+    _record_batch_stats(splits=1)
+    half = max(1, (len(missing) + 1) // 2)
+    for start in range(0, len(missing), half):
+        refined_data.extend(process_batch(missing[start:start + half], role, depth + 1))
+    return refined_data
 
 # -------------------------------
-# Process one JSON file (updated)
+# Concurrent scheduler across roles
 # -------------------------------
-def refine_role_json(input_path: Path):
+def from_cache(qa: Dict, role: str) -> Optional[Dict]:
+    cached = response_cache.get(qa["question"])
+    if cached is None:
+        return None
+    return {
+        **cached,
+        "original_question": qa["question"],
+        "role": role,
+        "skill": qa.get("skill", "N/A"),
+        "source": qa.get("source", "N/A"),
+    }
+
+
+def load_role_batches(input_path: Path):
     """
-    Loads a JSON file, processes it in batches, and saves the refined output.
+    Returns (role, batches, cached_results) for one input file, or None if it
+    can't be used. Questions already in the response cache are answered from it;
+    only misses are batched for the LLM.
     """
     role = input_path.stem.replace("_", " ")
-    logging.info(f"--- Starting new role: {role} ---")
-
     try:
         with open(input_path, "r", encoding="utf-8") as f:
             data = json.load(f)
     except (json.JSONDecodeError, FileNotFoundError) as e:
         logging.error(f"Could not read or parse input file {input_path.name}: {e}")
-        return
+        return None
 
-    total_questions = len(data)
-    if total_questions == 0:
+    if not data:
         logging.warning(f"Input file {input_path.name} is empty. Skipping.")
-        return
-        
-    total_batches = (total_questions + BATCH_SIZE - 1) // BATCH_SIZE
-    logging.info(f"Total questions: {total_questions} ({total_batches} batches)")
-
-    refined_results = []
-    start_time = datetime.now()
-
-    for batch_idx, start_idx in enumerate(range(0, total_questions, BATCH_SIZE), start=1):
-        end_idx = start_idx + BATCH_SIZE
-        batch = data[start_idx:end_idx]
-        logging.info(f"Processing Batch {batch_idx}/{total_batches} (questions {start_idx + 1}-{min(end_idx, total_questions)})")
-
-        refined_batch = process_batch(batch, role)
-        if refined_batch:
-            refined_results.extend(refined_batch)
-
-        # Progress and ETA calculation
-        elapsed_seconds = (datetime.now() - start_time).total_seconds()
-        avg_time_per_batch = elapsed_seconds / batch_idx
-        remaining_batches = total_batches - batch_idx
-        eta_seconds = avg_time_per_batch * remaining_batches
-        eta = datetime.now() + timedelta(seconds=eta_seconds)
-
-        logging.info(f"Progress: {len(refined_results)}/{total_questions} questions refined. "
-                     f"Batch {batch_idx}/{total_batches} complete. "
-                     f"ETA: {eta.strftime('%H:%M:%S')}")
-
-        # Rate limit sleep to be polite to the API
-        if batch_idx < total_batches:
-            time.sleep(20)
-
-    # Save the final refined file
+        return None
+
+    cached_results, misses = [], []
+    for qa in data:
+        hit = from_cache(qa, role)
+        if hit is not None:
+            cached_results.append(hit)
+        else:
+            misses.append(qa)
+
+    batches = pack_batches(misses)
+    logging.info(f"Queued role {role}: {len(data)} questions, {len(cached_results)} from cache, "
+                 f"{len(misses)} to refine ({len(batches)} batches)")
+    return role, batches, cached_results
+
+
+def save_role_results(input_path: Path, role: str, refined_results: List[Dict]):
     if refined_results:
         output_path = OUTPUT_DIR / f"{input_path.stem}_refined.json"
         with open(output_path, "w", encoding="utf-8") as f:
@@ -231,18 +419,189 @@ def refine_role_json(input_path: Path):
     else:
         logging.error(f"No results were generated for {role}. Check logs for errors.")
 
+
+# -------------------------------
+# Per-role checkpoints
+# -------------------------------
+_checkpoint_lock = threading.Lock()
+
+
+def batch_hash(batch: List[Dict]) -> str:
+    """
+    Checkpoint key of a batch: its input plus the prompt version, so a model or
+    prompt change invalidates checkpointed results just like cache entries.
+    """
+    payload = json.dumps([response_cache.version, batch], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def checkpoint_path(input_path: Path) -> Path:
+    return CHECKPOINT_DIR / f"{input_path.stem}.jsonl"
+
+
+def load_checkpoint(input_path: Path) -> Dict[int, Dict]:
+    """Latest checkpoint entry per batch index. A torn last line from a crash is ignored."""
+    entries = {}
+    path = checkpoint_path(input_path)
+    if not path.exists():
+        return entries
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[entry["batch"]] = entry
+    return entries
+
+
+def append_checkpoint(input_path: Path, batch_idx: int, input_hash: str, results: List[Dict]):
+    entry = {
+        "batch": batch_idx,
+        "input_hash": input_hash,
+        "status": "ok" if results else "failed",
+        "results": results,
+    }
+    with _checkpoint_lock:
+        with open(checkpoint_path(input_path), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def rotate_checkpoint(input_path: Path, hashes: List[str]):
+    """
+    Called once the role's output is written. Batches are packed from cache
+    misses, so next run's indices won't line up with this run's: a fully
+    refined role's checkpoint is deleted, otherwise only the entries of this
+    run's batches are kept so the file doesn't grow with dead ones.
+    """
+    path = checkpoint_path(input_path)
+    live = [
+        entry for idx, entry in sorted(load_checkpoint(input_path).items())
+        if idx < len(hashes) and entry["input_hash"] == hashes[idx]
+    ]
+    with _checkpoint_lock:
+        if all(entry["status"] == "ok" for entry in live) and len(live) == len(hashes):
+            path.unlink(missing_ok=True)
+            return
+        tmp_path = path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in live:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+def completed_batches(input_path: Path, hashes: List[str]) -> Dict[int, List[Dict]]:
+    """Batch index -> refined results for batches whose input is unchanged and succeeded."""
+    return {
+        idx: entry["results"]
+        for idx, entry in load_checkpoint(input_path).items()
+        if idx < len(hashes) and entry["input_hash"] == hashes[idx] and entry["status"] == "ok"
+    }
+
+
+# -------------------------------
+# Scheduler
+# -------------------------------
+def refine_roles(input_paths: List[Path]):
+    """
+    Keeps up to MAX_IN_FLIGHT process_batch calls running across all roles.
+    Pacing comes from the shared RPM/TPM limiter rather than fixed sleeps.
+    Every finished batch is appended to the role's checkpoint, so a restarted
+    run skips completed batches and only retries failed or missing ones. Each
+    role's output is assembled from its checkpoint once its last batch is done.
+    """
+    roles = {}
+    for input_path in input_paths:
+        loaded = load_role_batches(input_path)
+        if loaded:
+            role, batches, cached_results = loaded
+            hashes = [batch_hash(batch) for batch in batches]
+            done = completed_batches(input_path, hashes)
+            if done:
+                logging.info(f"Resuming {role}: {len(done)}/{len(batches)} batches already in checkpoint")
+            roles[input_path] = {
+                "role": role,
+                "batches": batches,
+                "hashes": hashes,
+                "cached": cached_results,
+                "pending": [idx for idx in range(len(batches)) if idx not in done],
+                "remaining": len(batches) - len(done),
+                "started": None,
+            }
+
+    def run_batch(input_path, batch_idx):
+        job = roles[input_path]
+        # A role's clock starts when its first batch actually starts running
+        if job["started"] is None:
+            job["started"] = time.monotonic()
+        results = process_batch(job["batches"][batch_idx], job["role"])
+        append_checkpoint(input_path, batch_idx, job["hashes"][batch_idx], results)
+
+    with ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT) as executor:
+        futures = {}
+        for input_path, job in roles.items():
+            if not job["pending"]:
+                report_role(input_path, job)
+            for batch_idx in job["pending"]:
+                futures[executor.submit(run_batch, input_path, batch_idx)] = input_path
+
+        for future in as_completed(futures):
+            input_path = futures[future]
+            future.result()
+            job = roles[input_path]
+            job["remaining"] -= 1
+            if job["remaining"] == 0:
+                report_role(input_path, job)
+
+
+def report_role(input_path: Path, job: Dict):
+    done = completed_batches(input_path, job["hashes"])
+    refined_results = job["cached"] + [item for idx in sorted(done) for item in done[idx]]
+    save_role_results(input_path, job["role"], refined_results)
+    if refined_results:
+        rotate_checkpoint(input_path, job["hashes"])
+
+    failed_batches = len(job["batches"]) - len(done)
+    if failed_batches:
+        logging.warning(f"{failed_batches} batch(es) failed for {job['role']}; re-run to retry only those.")
+    if job["started"] is None:
+        return  # everything came from the checkpoint
+
+    processed = [job["batches"][idx] for idx in job["pending"] if idx in done]
+    refined_now = sum(len(done[idx]) for idx in job["pending"] if idx in done)
+    elapsed = time.monotonic() - job["started"]
+    logging.info(f"Throughput for {job['role']}: {refined_now} questions refined this run "
+                 f"({len(refined_results)}/{len(job['cached']) + sum(len(b) for b in job['batches'])} total) "
+                 f"in {elapsed:.0f}s ({refined_now / max(elapsed, 1e-9) * 60:.1f} questions/min), "
+                 f"{len(processed)}/{len(job['pending'])} batches ok")
+
+
+def refine_role_json(input_path: Path):
+    """
+    Loads a JSON file, processes it in batches, and saves the refined output.
+    """
+    refine_roles([input_path])
+
 # -------------------------------
 # Entry point
 # -------------------------------
 if __name__ == "__main__":
     json_files = list(INPUT_DIR.glob("*.json"))
     logging.info(f"Found {len(json_files)} JSON files to process in {INPUT_DIR}")
-    
+
+    to_process = []
     for json_file in json_files:
         # Simple check to avoid re-processing already refined files
         if "_refined" not in json_file.stem and "_FIXED" not in json_file.stem:
-            refine_role_json(json_file)
+            to_process.append(json_file)
         else:
             logging.info(f"Skipping already processed file: {json_file.name}")
-            
-    logging.info("--- All roles processed successfully. ---")
\ No newline at end of file
+
+    refine_roles(to_process)
+    logging.info(f"Response cache: {response_cache.stats()}")
+    logging.info(f"Batching: {batch_stats()}")
+    logging.info("--- All roles processed successfully. ---")
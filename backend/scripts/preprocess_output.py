@@ -1,5 +1,14 @@
 import os
 import json
+import stat
+import hashlib
+import argparse
+import tempfile
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from json_stream import IncrementalJSONParser
 
 # --- Configuration ---
 
@@ -34,7 +43,22 @@ FILENAMES_TO_PROCESS = [
     "Robotics_Engineer_refined.json"
 ]
 
-# --- Helper Function for Cleaning Text ---
+# Remembers the hash of each file as last written, so unchanged files are skipped
+MANIFEST_NAME = ".preprocess_manifest.json"
+READ_CHUNK_SIZE = 64 * 1024
+
+# --- Cleaners ---
+# Each cleaner takes a record and returns the cleaned record, or None to drop it.
+# They run in order; add new ones with register_cleaner().
+Cleaner = Callable[[Dict], Optional[Dict]]
+CLEANERS: List[Cleaner] = []
+
+
+def register_cleaner(cleaner: Cleaner) -> Cleaner:
+    CLEANERS.append(cleaner)
+    return cleaner
+
+
 def clean_answer_text(text: str) -> str:
     """
     Cleans the text by removing only the asterisks, preserving all whitespace.
@@ -44,43 +68,141 @@ def clean_answer_text(text: str) -> str:
     return text.replace('*', '')
 
 
+@register_cleaner
+def strip_answer_asterisks(record: Dict) -> Dict:
+    if 'answer' in record:
+        record['answer'] = clean_answer_text(record['answer'])
+    return record
+
+
+def pipeline_signature() -> str:
+    """Changes whenever the cleaner pipeline changes, so every file is reprocessed."""
+    return ",".join(f"{c.__module__}.{c.__qualname__}" for c in CLEANERS)
+
+
+# --- Streaming helpers ---
+def iter_records(file_path: str):
+    """
+    Yields the records of a JSON array file one at a time without loading the
+    whole file. Raises ValueError unless the file is an array of objects.
+    """
+    parser = IncrementalJSONParser(strict=True)
+    with open(file_path, 'r', encoding='utf-8') as f_in:
+        while True:
+            chunk = f_in.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield from parser.feed(chunk)
+    if parser.pending or parser.errors or not parser.closed:
+        raise ValueError(f"malformed JSON in {file_path}; leaving it untouched")
+
+
+def file_digest(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(data_folder: str) -> Dict:
+    path = os.path.join(data_folder, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return manifest.get("files", {}) if manifest.get("pipeline") == pipeline_signature() else {}
+
+
+def save_manifest(data_folder: str, files: Dict):
+    path = os.path.join(data_folder, MANIFEST_NAME)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({"pipeline": pipeline_signature(), "files": files}, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+# --- Per-file processing (runs in a worker process) ---
+def preprocess_file(file_path: str, known_digest: Optional[str] = None) -> Dict:
+    """
+    Streams one file through the cleaners into a temp file in the same folder and
+    renames it over the original, so a crash never leaves a half-written file.
+    Output matches json.dump(records, indent=4, ensure_ascii=False).
+    """
+    if known_digest is not None and file_digest(file_path) == known_digest:
+        return {"status": "unchanged", "digest": known_digest}
+
+    digest = hashlib.sha256()
+    kept = dropped = 0
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f_out:
+            def write(text):
+                f_out.write(text)
+                digest.update(text.encode('utf-8'))
+
+            write('[')
+            for record in iter_records(file_path):
+                for cleaner in CLEANERS:
+                    record = cleaner(record)
+                    if record is None:
+                        break
+                if record is None:
+                    dropped += 1
+                    continue
+                write(',\n' if kept else '\n')
+                write(textwrap.indent(json.dumps(record, indent=4, ensure_ascii=False), '    '))
+                kept += 1
+            write('\n]' if kept else ']')
+            f_out.flush()
+            os.fsync(f_out.fileno())
+        # mkstemp creates the file 0600; keep the original's permissions
+        os.chmod(tmp_path, stat.S_IMODE(os.stat(file_path).st_mode))
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return {"status": "updated", "digest": digest.hexdigest(), "kept": kept, "dropped": dropped}
+
+
 # --- Main Script for In-Place Processing ---
-def preprocess_files_inplace():
+def preprocess_files_inplace(data_folder: str = DATA_FOLDER, workers: Optional[int] = None, force: bool = False):
     """
-    Reads all specified JSON files, cleans the 'answer' field,
-    and saves the results back to the original file (overwrite).
+    Cleans every file in FILENAMES_TO_PROCESS in parallel across processes.
+    Files whose content still hashes to what this script last wrote are skipped.
     """
-    for filename in FILENAMES_TO_PROCESS:
-        # This path is now used for both reading and writing
-        file_path = os.path.join(DATA_FOLDER, filename)
-        
-        print(f"\n--- Processing (in-place): {filename} ---")
-
-        try:
-            # Step 1: Read the entire file's content into memory
-            with open(file_path, 'r', encoding='utf-8') as f_in:
-                original_data = json.load(f_in)
-
-            # Step 2: Process the data in memory
-            cleaned_data = []
-            for record in original_data:
-                new_record = record.copy()
-                if 'answer' in new_record:
-                    new_record['answer'] = clean_answer_text(new_record['answer'])
-                cleaned_data.append(new_record)
-
-            # Step 3: Write the cleaned data back to the SAME file
-            with open(file_path, 'w', encoding='utf-8') as f_out:
-                json.dump(cleaned_data, f_out, indent=4, ensure_ascii=False)
-
-            print(f"✅ Successfully updated file in-place: {file_path}")
-
-        except FileNotFoundError:
-            print(f"❌ Error: File not found at '{file_path}'. Skipping.")
-        except Exception as e:
-            print(f"❌ An unexpected error occurred while processing {filename}: {e}")
+    manifest = {} if force else load_manifest(data_folder)
+    jobs = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for filename in FILENAMES_TO_PROCESS:
+            file_path = os.path.join(data_folder, filename)
+            if not os.path.exists(file_path):
+                print(f"❌ Error: File not found at '{file_path}'. Skipping.")
+                continue
+            jobs[filename] = pool.submit(preprocess_file, file_path, manifest.get(filename))
+
+        for filename, future in jobs.items():
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"❌ An unexpected error occurred while processing {filename}: {e}")
+                continue
+            manifest[filename] = result["digest"]
+            if result["status"] == "unchanged":
+                print(f"⏭️  Unchanged since last run: {filename}")
+            else:
+                print(f"✅ Successfully updated file in-place: {filename} "
+                      f"({result['kept']} records, {result['dropped']} dropped)")
+
+    save_manifest(data_folder, manifest)
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean the refined role files in place.")
+    parser.add_argument("--data-folder", default=DATA_FOLDER)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--force", action="store_true", help="reprocess files even if unchanged")
+    args = parser.parse_args()
+
     print("Starting in-place preprocessing. Your original files will be overwritten.")
-    preprocess_files_inplace()
-    print("\nIn-place preprocessing complete!")
\ No newline at end of file
+    preprocess_files_inplace(args.data_folder, args.workers, args.force)
+    print("\nIn-place preprocessing complete!")
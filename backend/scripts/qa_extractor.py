@@ -0,0 +1,216 @@
+import re
+import logging
+from typing import Dict, List, Optional
+
+from lxml import etree, html as lxml_html
+
+# --------------------------------
+# Single-pass Q&A extraction engine
+# --------------------------------
+# The page is parsed once with lxml and walked once in document order. Each
+# block element's text is read once and its subtree skipped, so the cost is
+# linear in the page size. A small state machine pairs questions with the
+# answer blocks that follow them; site-specific behaviour lives in SiteRules
+# plug-ins.
+
+MAX_PAIRS_PER_PAGE = 8
+MAX_ANSWER_CHARS = 1000
+DROP_TAGS = ("script", "style", "nav", "header", "footer")
+HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+_WHITESPACE = re.compile(r"\s+")
+_QUESTION_PREFIX = re.compile(r"^\s*(?:Q(?:uestion)?\s*\d*\s*[:.)]|\d+\s*[.)])\s*", re.IGNORECASE)
+_ANSWER_PREFIX = re.compile(r"^\s*A(?:nswer|ns)?\s*[:.)]\s*", re.IGNORECASE)
+
+
+class SiteRules:
+    """
+    Question/answer rules for a family of sites. Subclass and register with
+    register_site_rules() to tune extraction for a new site.
+    """
+    domains = ()
+    question_tags = HEADINGS | {"strong", "b", "dt"}
+    answer_tags = {"p", "li", "dd"}
+    code_tags = {"pre"}
+    min_question_words = 3
+    max_question_words = 25
+    min_answer_words = 5
+    answers_may_ask = False   # allow "?" inside answers
+    skip_phrases = ()
+    # When set, questions inside a div/section whose class contains one of these
+    # keywords win; the rest of the page is only used if no such section exists.
+    container_keywords = ()
+
+    def matches(self, url: str) -> bool:
+        return any(domain in url for domain in self.domains)
+
+    def is_question(self, text: str) -> bool:
+        words = len(text.split())
+        return ("?" in text and self.min_question_words <= words <= self.max_question_words
+                and not any(phrase in text.lower() for phrase in self.skip_phrases))
+
+    def is_answer(self, text: str) -> bool:
+        return len(text.split()) >= self.min_answer_words and (self.answers_may_ask or "?" not in text)
+
+    def clean_question(self, text: str) -> str:
+        return _QUESTION_PREFIX.sub("", text, count=1)
+
+    def clean_answer(self, text: str) -> str:
+        return _ANSWER_PREFIX.sub("", text, count=1)[:MAX_ANSWER_CHARS]
+
+
+class GeeksforGeeksRules(SiteRules):
+    domains = ("geeksforgeeks.org",)
+    max_question_words = 30
+    answers_may_ask = True
+
+
+class InterviewBitRules(SiteRules):
+    domains = ("interviewbit.com",)
+    question_tags = {"h3", "h4", "h5", "strong", "b"}
+    answer_tags = {"p", "li", "dd"}
+    max_question_words = 40
+    container_keywords = ("question", "qa", "interview", "problem")
+
+
+class LearningSiteRules(SiteRules):
+    domains = ("simplilearn.com", "roadmap.sh", "turing.com")
+    question_tags = {"h2", "h3", "h4", "h5", "strong", "b"}
+    max_question_words = 30
+    skip_phrases = ("what is this", "how to", "where to")
+
+
+SITE_RULES: List[SiteRules] = [GeeksforGeeksRules(), InterviewBitRules(), LearningSiteRules()]
+GENERIC_RULES = SiteRules()
+
+
+def register_site_rules(rules: SiteRules):
+    """Adds a site plug-in; later registrations take precedence."""
+    SITE_RULES.insert(0, rules)
+
+
+def rules_for(url: str) -> SiteRules:
+    for rules in SITE_RULES:
+        if rules.matches(url):
+            return rules
+    return GENERIC_RULES
+
+
+class _Pairer:
+    """Pairs each question with the next answer block (or code block) after it."""
+    def __init__(self, rules: SiteRules, url: str):
+        self.rules = rules
+        self.url = url
+        self.pairs: List[Dict[str, str]] = []
+        self.seen = set()
+        self.question: Optional[str] = None
+        self.code: Optional[str] = None
+
+    @property
+    def full(self) -> bool:
+        return len(self.pairs) >= MAX_PAIRS_PER_PAGE
+
+    def on_question(self, text: str):
+        self.flush_code()
+        self.question = self.rules.clean_question(text)
+
+    def on_code(self, text: str):
+        if self.question and len(text.split()) >= 3 and self.code is None:
+            self.code = text
+
+    def on_answer(self, text: str):
+        if self.question is None or not self.rules.is_answer(text):
+            return
+        # An explanation after a code block beats the code itself
+        self.emit(self.question, text)
+        self.question, self.code = None, None
+
+    def flush_code(self):
+        if self.question and self.code:
+            self.emit(self.question, f"Code solution: {self.code}")
+        self.question, self.code = None, None
+
+    def emit(self, question: str, answer: str):
+        key = question.lower().strip()
+        if key in self.seen or len(question.split()) < 3 or len(answer.split()) < 5:
+            return
+        self.seen.add(key)
+        self.pairs.append({"question": question, "answer": self.rules.clean_answer(answer), "source": self.url})
+
+
+def _block_text(element) -> str:
+    return _WHITESPACE.sub(" ", element.text_content()).strip()
+
+
+def _lead_question(element, rules: SiteRules) -> Optional[str]:
+    """For <p><strong>Question?</strong> answer...</p>, returns the bold question."""
+    if len(element) == 0 or (element.text or "").strip() or element[0].tag not in ("strong", "b"):
+        return None
+    question = _block_text(element[0])
+    return question if rules.is_question(question) else None
+
+
+def extract_qa(url: str, html: str) -> List[Dict[str, str]]:
+    """Extracts up to MAX_PAIRS_PER_PAGE unique Q&A pairs from one page in a single pass."""
+    rules = rules_for(url)
+    try:
+        root = lxml_html.fromstring(html)
+    except (etree.ParserError, ValueError) as e:
+        logging.warning(f"Failed to parse {url}: {e}")
+        return []
+    etree.strip_elements(root, *DROP_TAGS, with_tail=False)
+
+    page = _Pairer(rules, url)
+    scoped = _Pairer(rules, url) if rules.container_keywords else None
+    container_depth = 0
+
+    walker = etree.iterwalk(root, events=("start", "end"))
+    for event, element in walker:
+        tag = element.tag
+        if not isinstance(tag, str):  # comments and processing instructions
+            continue
+        if scoped is not None and tag in ("div", "section"):
+            classes = (element.get("class") or "").lower()
+            if classes and any(keyword in classes for keyword in rules.container_keywords):
+                container_depth += 1 if event == "start" else -1
+        if event == "end":
+            continue
+
+        targets = (page, scoped) if scoped is not None and container_depth > 0 else (page,)
+        if tag in rules.question_tags:
+            text = _block_text(element)
+            if rules.is_question(text):
+                for pairer in targets:
+                    pairer.on_question(text)
+            walker.skip_subtree()
+        elif tag in rules.code_tags:
+            text = _block_text(element)
+            for pairer in targets:
+                pairer.on_code(text)
+            walker.skip_subtree()
+        elif tag in rules.answer_tags:
+            text = _block_text(element)
+            lead = _lead_question(element, rules)
+            if lead is not None and rules.is_answer(text[len(lead):]):
+                for pairer in targets:
+                    pairer.on_question(lead)
+                    pairer.on_answer(text[len(lead):].strip())
+            elif rules.is_question(text) and (text.endswith("?") or not rules.is_answer(text)):
+                for pairer in targets:
+                    pairer.on_question(text)
+            else:
+                for pairer in targets:
+                    pairer.on_answer(text)
+            walker.skip_subtree()
+        else:
+            continue
+
+        if (scoped or page).full:
+            break
+
+    for pairer in (page, scoped):
+        if pairer is not None and not pairer.full:
+            pairer.flush_code()
+    if scoped is not None and scoped.pairs:
+        return scoped.pairs[:MAX_PAIRS_PER_PAGE]
+    return page.pairs[:MAX_PAIRS_PER_PAGE]
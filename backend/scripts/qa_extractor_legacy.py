@@ -0,0 +1,308 @@
+import logging
+from typing import Dict, List
+
+from bs4 import BeautifulSoup
+
+# BeautifulSoup extractors used before qa_extractor.py (QA_EXTRACTOR=legacy).
+# Kept free of import-time side effects: ConcurrentScraper's parse workers
+# import this module by reference.
+
+
+def extract_qa_legacy(url: str, html: str) -> List[Dict[str, str]]:
+    """Enhanced Q&A extraction with better parsing for various sites"""
+    qa_pairs = []
+    try:
+        soup = BeautifulSoup(html, "html.parser")
+        
+        # Remove script and style elements
+        for script in soup(["script", "style", "nav", "header", "footer"]):
+            script.decompose()
+
+        # Site-specific extraction strategies
+        if "geeksforgeeks.org" in url:
+            qa_pairs = extract_qa_geeksforgeeks(soup, url)
+        elif "interviewbit.com" in url:
+            qa_pairs = extract_qa_interviewbit(soup, url)
+        elif any(site in url for site in ["simplilearn.com", "roadmap.sh", "turing.com"]):
+            qa_pairs = extract_qa_generic_learning_site(soup, url)
+        else:
+            qa_pairs = extract_qa_generic(soup, url)
+            
+        # If site-specific extraction failed, try generic approach
+        if not qa_pairs:
+            qa_pairs = extract_qa_generic(soup, url)
+        
+        # Remove duplicates and filter quality
+        unique_qas = []
+        seen_questions = set()
+        for qa in qa_pairs:
+            q_lower = qa["question"].lower().strip()
+            if (q_lower not in seen_questions and 
+                len(qa["question"].split()) >= 3 and
+                len(qa["answer"].split()) >= 5):
+                seen_questions.add(q_lower)
+                unique_qas.append(qa)
+        
+        return unique_qas[:8]  # Limit per URL to manage data size
+        
+    except Exception as e:
+        logging.warning(f"Failed to parse {url}: {e}")
+        return []
+
+def extract_qa_geeksforgeeks(soup, url: str) -> List[Dict[str, str]]:
+    """GeeksforGeeks-specific extraction"""
+    qa_pairs = []
+    
+    try:
+        # GFG often uses numbered questions in specific divs
+        question_patterns = [
+            "h2", "h3", "h4",  # Headers
+            ".question", 
+            "[class*='question']",
+            "strong",
+            "b"
+        ]
+        
+        for pattern in question_patterns:
+            elements = soup.select(pattern)
+            for element in elements:
+                text = element.get_text(strip=True)
+                
+                # Check if it looks like a question
+                if ("?" in text and 
+                    len(text.split()) >= 3 and 
+                    len(text.split()) <= 30):
+                    
+                    # Try to find answer using multiple strategies
+                    answer = None
+                    
+                    # Strategy 1: Look in next paragraphs
+                    next_p = element.find_next("p")
+                    if next_p:
+                        answer_text = next_p.get_text(strip=True)
+                        if answer_text and len(answer_text.split()) >= 5:
+                            answer = answer_text
+                    
+                    # Strategy 2: Look in code blocks (for programming questions)
+                    if not answer:
+                        next_code = element.find_next(["pre", "code"])
+                        if next_code:
+                            code_text = next_code.get_text(strip=True)
+                            # Look for explanation after code
+                            explanation = next_code.find_next("p")
+                            if explanation:
+                                answer = explanation.get_text(strip=True)
+                            elif code_text and len(code_text.split()) >= 3:
+                                answer = f"Code solution: {code_text}"
+                    
+                    # Strategy 3: Look in same container
+                    if not answer:
+                        container = element.find_parent(["div", "section", "article"])
+                        if container:
+                            paras = container.find_all("p")
+                            for para in paras:
+                                para_text = para.get_text(strip=True)
+                                if (para_text and len(para_text.split()) >= 5 and 
+                                    para != element and not "?" in para_text):
+                                    answer = para_text
+                                    break
+                    
+                    if answer:
+                        qa_pairs.append({
+                            "question": text,
+                            "answer": answer[:1000],
+                            "source": url
+                        })
+        
+        # Try structured content extraction
+        content_div = soup.find("div", {"class": "content"}) or soup.find("article")
+        if content_div and not qa_pairs:
+            # Look for Q: A: patterns
+            all_text = content_div.get_text()
+            lines = [line.strip() for line in all_text.split('\n') if line.strip()]
+            
+            current_question = None
+            for line in lines:
+                if (line.startswith(("Q:", "Question:", "Q.", "Q ")) or 
+                    ("?" in line and len(line.split()) <= 25)):
+                    current_question = line.replace("Q:", "").replace("Question:", "").strip()
+                elif (current_question and 
+                      (line.startswith(("A:", "Answer:", "A.", "A ")) or 
+                       (len(line.split()) >= 5 and not "?" in line))):
+                    answer = line.replace("A:", "").replace("Answer:", "").strip()
+                    if answer and len(answer.split()) >= 5:
+                        qa_pairs.append({
+                            "question": current_question,
+                            "answer": answer[:1000],
+                            "source": url
+                        })
+                        current_question = None
+                        
+    except Exception as e:
+        logging.warning(f"Error in GeeksforGeeks extraction: {e}")
+    
+    return qa_pairs
+
+def extract_qa_interviewbit(soup, url: str) -> List[Dict[str, str]]:
+    """InterviewBit-specific extraction"""
+    qa_pairs = []
+    
+    try:
+        # InterviewBit often has structured Q&A sections
+        qa_sections = soup.find_all(["div", "section"], class_=lambda x: x and any(
+            keyword in x.lower() for keyword in ["question", "qa", "interview", "problem"]
+        ))
+        
+        for section in qa_sections:
+            questions = section.find_all(["h3", "h4", "h5", "strong", "b"])
+            for q_elem in questions:
+                q_text = q_elem.get_text(strip=True)
+                if "?" in q_text and len(q_text.split()) >= 3:
+                    # Look for answer in next elements
+                    answer_elem = q_elem.find_next(["p", "div", "pre"])
+                    if answer_elem:
+                        answer = answer_elem.get_text(strip=True)
+                        if answer and len(answer.split()) >= 5:
+                            qa_pairs.append({
+                                "question": q_text,
+                                "answer": answer[:1000],
+                                "source": url
+                            })
+                            
+    except Exception as e:
+        logging.warning(f"Error in InterviewBit extraction: {e}")
+    
+    return qa_pairs
+
+def extract_qa_generic_learning_site(soup, url: str) -> List[Dict[str, str]]:
+    """Generic extraction for learning sites"""
+    qa_pairs = []
+    
+    try:
+        # Common patterns for learning sites
+        main_content = (soup.find("main") or 
+                       soup.find("div", {"class": "content"}) or 
+                       soup.find("article") or 
+                       soup.body)
+        
+        if main_content:
+            # Look for questions in headers and bold text
+            question_elements = main_content.find_all(["h2", "h3", "h4", "h5", "strong", "b"])
+            
+            for q_elem in question_elements:
+                q_text = q_elem.get_text(strip=True)
+                if ("?" in q_text and 
+                    3 <= len(q_text.split()) <= 30 and
+                    not any(skip in q_text.lower() for skip in ["what is this", "how to", "where to"])):
+                    
+                    # Find answer by looking at following content
+                    answer = ""
+                    current = q_elem
+                    
+                    # Check next 5 elements for answer
+                    for _ in range(5):
+                        if current:
+                            next_elem = current.find_next(["p", "div", "li", "pre"])
+                            if next_elem:
+                                text = next_elem.get_text(strip=True)
+                                # Skip if it's another question
+                                if "?" not in text and len(text.split()) >= 5:
+                                    answer = text
+                                    break
+                                current = next_elem
+                            else:
+                                break
+                        else:
+                            break
+                    
+                    if answer:
+                        qa_pairs.append({
+                            "question": q_text,
+                            "answer": answer[:1000],
+                            "source": url
+                        })
+                        
+    except Exception as e:
+        logging.warning(f"Error in generic learning site extraction: {e}")
+    
+    return qa_pairs
+
+def extract_qa_generic(soup, url: str) -> List[Dict[str, str]]:
+    """Fallback generic extraction method"""
+    qa_pairs = []
+    
+    try:
+        # Simple approach: find all potential questions and answers
+        all_elements = soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6", "p", "li", "strong", "b"])
+        
+        current_question = None
+        for element in all_elements:
+            text = element.get_text(strip=True)
+            
+            if not text or len(text) > 500:  # Skip very long text
+                continue
+                
+            # Identify questions
+            if ("?" in text and 
+                3 <= len(text.split()) <= 25 and
+                element.name in ["h1", "h2", "h3", "h4", "h5", "h6", "strong", "b"]):
+                current_question = text
+                
+            # Identify answers
+            elif (current_question and 
+                  len(text.split()) >= 5 and 
+                  "?" not in text and
+                  element.name in ["p", "li", "div"]):
+                qa_pairs.append({
+                    "question": current_question,
+                    "answer": text[:1000],
+                    "source": url
+                })
+                current_question = None
+                
+                if len(qa_pairs) >= 10:  # Limit to avoid too much data
+                    break
+                    
+    except Exception as e:
+        logging.warning(f"Error in generic extraction: {e}")
+    
+    return qa_pairs
+
+def extract_qa_from_section(section, url: str) -> List[Dict[str, str]]:
+    """Extract Q&A pairs from FAQ-like sections"""
+    qa_pairs = []
+    
+    # Look for dt/dd pairs (definition lists)
+    dt_elements = section.find_all("dt")
+    for dt in dt_elements:
+        question = dt.get_text(strip=True)
+        dd = dt.find_next_sibling("dd")
+        if dd and "?" in question:
+            answer = dd.get_text(strip=True)
+            if answer and len(answer.split()) >= 5:
+                qa_pairs.append({
+                    "question": question,
+                    "answer": answer,
+                    "source": url
+                })
+    
+    # Look for alternating question/answer patterns
+    all_elements = section.find_all(["h3", "h4", "h5", "p", "div", "li"])
+    current_question = None
+    
+    for elem in all_elements:
+        text = elem.get_text(strip=True)
+        if not text:
+            continue
+            
+        if "?" in text and len(text.split()) <= 25:
+            current_question = text
+        elif current_question and len(text.split()) >= 5:
+            qa_pairs.append({
+                "question": current_question,
+                "answer": text[:1000],
+                "source": url
+            })
+            current_question = None
+    
+    return qa_pairs
@@ -0,0 +1,77 @@
+import time
+import threading
+
+
+# -------------------------------
+# Token buckets for API quotas
+# -------------------------------
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` units and refills at
+    capacity/period units per second. acquire() blocks until enough units
+    are available.
+    """
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, amount: float) -> float:
+        """Takes `amount` and returns 0, or returns the seconds to wait before retrying."""
+        amount = min(amount, self.capacity)  # a single oversized request must still fit eventually
+        with self.lock:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+    def refund(self, amount: float):
+        """Returns units taken by an over-estimate (or takes more for an under-estimate)."""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """
+    Enforces a requests-per-minute and a tokens-per-minute quota together, plus a
+    shared pause set from a 429's retry-after so every worker backs off at once.
+    """
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self, estimated_tokens: int):
+        while True:
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+                continue
+            wait = self.requests.try_acquire(1)
+            if wait:
+                time.sleep(wait)
+                continue
+            wait = self.tokens.try_acquire(estimated_tokens)
+            if wait:
+                self.requests.refund(1)
+                time.sleep(wait)
+                continue
+            return
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Corrects the token bucket once the API reports what the call really used."""
+        self.tokens.refund(estimated_tokens - actual_tokens)
+
+    def pause(self, seconds: float):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
@@ -1,12 +1,16 @@
 import os
 import json
+import argparse
 import logging
 import time
 from pathlib import Path
 from typing import List, Dict, Any
 import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
+from crawler import ConcurrentScraper, HEADERS
+from http_cache import PageCache, OfflineCacheMiss, search_identity
+from qa_extractor import extract_qa
+from qa_extractor_legacy import extract_qa_legacy
 
 # --------------------------------
 # Setup logging
@@ -21,10 +25,27 @@ ENV_PATH = BASE_DIR / ".env"
 load_dotenv(ENV_PATH)
 logging.info(f"Loaded env from {ENV_PATH}")
 
+# Offline replay: serve searches and pages only from the cache, never the network
+OFFLINE = os.getenv("SCRAPER_OFFLINE") == "1"
+
 SERPAPI_KEY = os.getenv("SERPAPI_API_KEY")
-if not SERPAPI_KEY:
+if not SERPAPI_KEY and not OFFLINE:
     raise ValueError("❌ SERPAPI_API_KEY missing in .env")
 
+# "lxml" (single-pass engine in qa_extractor.py) or "legacy" (BeautifulSoup extractors in qa_extractor_legacy.py)
+QA_EXTRACTOR = os.getenv("QA_EXTRACTOR", "lxml")
+
+# Shared keep-alive session for the synchronous helpers
+http_session = requests.Session()
+http_session.headers.update(HEADERS)
+
+# --------------------------------
+# Persistent page / search cache
+# --------------------------------
+HTTP_CACHE_PATH = Path(__file__).resolve().parent / "http_cache.sqlite"
+HTTP_CACHE_TTL_SECONDS = float(os.getenv("HTTP_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+page_cache = PageCache(HTTP_CACHE_PATH, HTTP_CACHE_TTL_SECONDS, offline=OFFLINE)
+
 # --------------------------------
 # Priority Learning Websites
 # --------------------------------
@@ -126,7 +147,26 @@ search_budget = SearchBudget(250)
 # Optimized SerpAPI Search for Limited Budget
 # --------------------------------
 def optimized_serpapi_search(query: str, is_priority: bool = False) -> List[str]:
-    """Optimized search with budget management"""
+    """Optimized search with budget management; cached results cost no budget"""
+    url = "https://serpapi.com/search"
+    params = {
+        "engine": "google",
+        "q": query,
+        "api_key": SERPAPI_KEY,
+        "num": 12 if is_priority else 8  # More results for priority searches
+    }
+    identity = search_identity(params)
+    try:
+        cached = page_cache.lookup("search", identity)
+    except OfflineCacheMiss:
+        logging.warning(f"  ⚠️ Offline and not cached: {query}")
+        return []
+    if page_cache.usable(cached):
+        data = json.loads(cached.body)
+        urls = [item["link"] for item in data.get("organic_results", []) if "link" in item]
+        logging.info(f"  💾 Cached search: {query} ({len(urls)} URLs)")
+        return urls
+
     if not search_budget.can_search():
         logging.warning(f"❌ Search budget exhausted! {search_budget.get_status()}")
         return []
@@ -134,16 +174,10 @@ def optimized_serpapi_search(query: str, is_priority: bool = False) -> List[str]
     try:
         logging.info(f"  🔍 Search ({search_budget.used_searches + 1}/250): {query}")
         
-        url = "https://serpapi.com/search"
-        params = {
-            "engine": "google",
-            "q": query,
-            "api_key": SERPAPI_KEY,
-            "num": 12 if is_priority else 8  # More results for priority searches
-        }
-        resp = requests.get(url, params=params, timeout=20)
+        resp = http_session.get(url, params=params, timeout=20)
         resp.raise_for_status()
         data = resp.json()
+        page_cache.put("search", identity, resp.text)
         
         urls = [item["link"] for item in data.get("organic_results", []) if "link" in item]
         search_budget.use_search()
@@ -182,313 +216,45 @@ def smart_search_for_skill(role: str, skill: str) -> List[str]:
 # Enhanced Q&A Extraction
 # --------------------------------
 def extract_qa_from_url(url: str) -> List[Dict[str, str]]:
-    """Enhanced Q&A extraction with better parsing for various sites"""
-    qa_pairs = []
+    """Fetches one page (through the page cache) and extracts its Q&A pairs"""
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        resp = requests.get(url, timeout=15, headers=headers)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "header", "footer"]):
-            script.decompose()
-
-        # Site-specific extraction strategies
-        if "geeksforgeeks.org" in url:
-            qa_pairs = extract_qa_geeksforgeeks(soup, url)
-        elif "interviewbit.com" in url:
-            qa_pairs = extract_qa_interviewbit(soup, url)
-        elif any(site in url for site in ["simplilearn.com", "roadmap.sh", "turing.com"]):
-            qa_pairs = extract_qa_generic_learning_site(soup, url)
-        else:
-            qa_pairs = extract_qa_generic(soup, url)
-            
-        # If site-specific extraction failed, try generic approach
-        if not qa_pairs:
-            qa_pairs = extract_qa_generic(soup, url)
-        
-        # Remove duplicates and filter quality
-        unique_qas = []
-        seen_questions = set()
-        for qa in qa_pairs:
-            q_lower = qa["question"].lower().strip()
-            if (q_lower not in seen_questions and 
-                len(qa["question"].split()) >= 3 and
-                len(qa["answer"].split()) >= 5):
-                seen_questions.add(q_lower)
-                unique_qas.append(qa)
-        
-        return unique_qas[:8]  # Limit per URL to manage data size
-        
+        html = fetch_page(url)
     except Exception as e:
         logging.warning(f"Failed to scrape {url}: {e}")
         return []
+    return extract_qa_from_html(url, html)
 
-def extract_qa_geeksforgeeks(soup, url: str) -> List[Dict[str, str]]:
-    """GeeksforGeeks-specific extraction"""
-    qa_pairs = []
-    
-    try:
-        # GFG often uses numbered questions in specific divs
-        question_patterns = [
-            "h2", "h3", "h4",  # Headers
-            ".question", 
-            "[class*='question']",
-            "strong",
-            "b"
-        ]
-        
-        for pattern in question_patterns:
-            elements = soup.select(pattern)
-            for element in elements:
-                text = element.get_text(strip=True)
-                
-                # Check if it looks like a question
-                if ("?" in text and 
-                    len(text.split()) >= 3 and 
-                    len(text.split()) <= 30):
-                    
-                    # Try to find answer using multiple strategies
-                    answer = None
-                    
-                    # Strategy 1: Look in next paragraphs
-                    next_p = element.find_next("p")
-                    if next_p:
-                        answer_text = next_p.get_text(strip=True)
-                        if answer_text and len(answer_text.split()) >= 5:
-                            answer = answer_text
-                    
-                    # Strategy 2: Look in code blocks (for programming questions)
-                    if not answer:
-                        next_code = element.find_next(["pre", "code"])
-                        if next_code:
-                            code_text = next_code.get_text(strip=True)
-                            # Look for explanation after code
-                            explanation = next_code.find_next("p")
-                            if explanation:
-                                answer = explanation.get_text(strip=True)
-                            elif code_text and len(code_text.split()) >= 3:
-                                answer = f"Code solution: {code_text}"
-                    
-                    # Strategy 3: Look in same container
-                    if not answer:
-                        container = element.find_parent(["div", "section", "article"])
-                        if container:
-                            paras = container.find_all("p")
-                            for para in paras:
-                                para_text = para.get_text(strip=True)
-                                if (para_text and len(para_text.split()) >= 5 and 
-                                    para != element and not "?" in para_text):
-                                    answer = para_text
-                                    break
-                    
-                    if answer:
-                        qa_pairs.append({
-                            "question": text,
-                            "answer": answer[:1000],
-                            "source": url
-                        })
-        
-        # Try structured content extraction
-        content_div = soup.find("div", {"class": "content"}) or soup.find("article")
-        if content_div and not qa_pairs:
-            # Look for Q: A: patterns
-            all_text = content_div.get_text()
-            lines = [line.strip() for line in all_text.split('\n') if line.strip()]
-            
-            current_question = None
-            for line in lines:
-                if (line.startswith(("Q:", "Question:", "Q.", "Q ")) or 
-                    ("?" in line and len(line.split()) <= 25)):
-                    current_question = line.replace("Q:", "").replace("Question:", "").strip()
-                elif (current_question and 
-                      (line.startswith(("A:", "Answer:", "A.", "A ")) or 
-                       (len(line.split()) >= 5 and not "?" in line))):
-                    answer = line.replace("A:", "").replace("Answer:", "").strip()
-                    if answer and len(answer.split()) >= 5:
-                        qa_pairs.append({
-                            "question": current_question,
-                            "answer": answer[:1000],
-                            "source": url
-                        })
-                        current_question = None
-                        
-    except Exception as e:
-        logging.warning(f"Error in GeeksforGeeks extraction: {e}")
-    
-    return qa_pairs
-
-def extract_qa_interviewbit(soup, url: str) -> List[Dict[str, str]]:
-    """InterviewBit-specific extraction"""
-    qa_pairs = []
-    
-    try:
-        # InterviewBit often has structured Q&A sections
-        qa_sections = soup.find_all(["div", "section"], class_=lambda x: x and any(
-            keyword in x.lower() for keyword in ["question", "qa", "interview", "problem"]
-        ))
-        
-        for section in qa_sections:
-            questions = section.find_all(["h3", "h4", "h5", "strong", "b"])
-            for q_elem in questions:
-                q_text = q_elem.get_text(strip=True)
-                if "?" in q_text and len(q_text.split()) >= 3:
-                    # Look for answer in next elements
-                    answer_elem = q_elem.find_next(["p", "div", "pre"])
-                    if answer_elem:
-                        answer = answer_elem.get_text(strip=True)
-                        if answer and len(answer.split()) >= 5:
-                            qa_pairs.append({
-                                "question": q_text,
-                                "answer": answer[:1000],
-                                "source": url
-                            })
-                            
-    except Exception as e:
-        logging.warning(f"Error in InterviewBit extraction: {e}")
-    
-    return qa_pairs
-
-def extract_qa_generic_learning_site(soup, url: str) -> List[Dict[str, str]]:
-    """Generic extraction for learning sites"""
-    qa_pairs = []
-    
-    try:
-        # Common patterns for learning sites
-        main_content = (soup.find("main") or 
-                       soup.find("div", {"class": "content"}) or 
-                       soup.find("article") or 
-                       soup.body)
-        
-        if main_content:
-            # Look for questions in headers and bold text
-            question_elements = main_content.find_all(["h2", "h3", "h4", "h5", "strong", "b"])
-            
-            for q_elem in question_elements:
-                q_text = q_elem.get_text(strip=True)
-                if ("?" in q_text and 
-                    3 <= len(q_text.split()) <= 30 and
-                    not any(skip in q_text.lower() for skip in ["what is this", "how to", "where to"])):
-                    
-                    # Find answer by looking at following content
-                    answer = ""
-                    current = q_elem
-                    
-                    # Check next 5 elements for answer
-                    for _ in range(5):
-                        if current:
-                            next_elem = current.find_next(["p", "div", "li", "pre"])
-                            if next_elem:
-                                text = next_elem.get_text(strip=True)
-                                # Skip if it's another question
-                                if "?" not in text and len(text.split()) >= 5:
-                                    answer = text
-                                    break
-                                current = next_elem
-                            else:
-                                break
-                        else:
-                            break
-                    
-                    if answer:
-                        qa_pairs.append({
-                            "question": q_text,
-                            "answer": answer[:1000],
-                            "source": url
-                        })
-                        
-    except Exception as e:
-        logging.warning(f"Error in generic learning site extraction: {e}")
-    
-    return qa_pairs
+def fetch_page(url: str) -> str:
+    """Serves fresh pages from the cache and revalidates stale ones with ETag/Last-Modified"""
+    cached = page_cache.lookup("page", url)
+    if page_cache.usable(cached):
+        return cached.body
+    resp = http_session.get(url, timeout=15, headers=page_cache.conditional_headers(cached))
+    if resp.status_code == 304 and cached is not None:
+        page_cache.refresh("page", url)
+        return cached.body
+    resp.raise_for_status()
+    page_cache.put("page", url, resp.text, resp.headers)
+    return resp.text
 
-def extract_qa_generic(soup, url: str) -> List[Dict[str, str]]:
-    """Fallback generic extraction method"""
-    qa_pairs = []
-    
-    try:
-        # Simple approach: find all potential questions and answers
-        all_elements = soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6", "p", "li", "strong", "b"])
-        
-        current_question = None
-        for element in all_elements:
-            text = element.get_text(strip=True)
-            
-            if not text or len(text) > 500:  # Skip very long text
-                continue
-                
-            # Identify questions
-            if ("?" in text and 
-                3 <= len(text.split()) <= 25 and
-                element.name in ["h1", "h2", "h3", "h4", "h5", "h6", "strong", "b"]):
-                current_question = text
-                
-            # Identify answers
-            elif (current_question and 
-                  len(text.split()) >= 5 and 
-                  "?" not in text and
-                  element.name in ["p", "li", "div"]):
-                qa_pairs.append({
-                    "question": current_question,
-                    "answer": text[:1000],
-                    "source": url
-                })
-                current_question = None
-                
-                if len(qa_pairs) >= 10:  # Limit to avoid too much data
-                    break
-                    
-    except Exception as e:
-        logging.warning(f"Error in generic extraction: {e}")
-    
-    return qa_pairs
+# The single-pass engine, or the legacy extractors if QA_EXTRACTOR=legacy. Both
+# live in side-effect-free modules, so the parse pool's (spawned) workers don't
+# re-import this script with its env checks, page cache and HTTP session.
+parse_qa = extract_qa_legacy if QA_EXTRACTOR == "legacy" else extract_qa
 
-def extract_qa_from_section(section, url: str) -> List[Dict[str, str]]:
-    """Extract Q&A pairs from FAQ-like sections"""
-    qa_pairs = []
-    
-    # Look for dt/dd pairs (definition lists)
-    dt_elements = section.find_all("dt")
-    for dt in dt_elements:
-        question = dt.get_text(strip=True)
-        dd = dt.find_next_sibling("dd")
-        if dd and "?" in question:
-            answer = dd.get_text(strip=True)
-            if answer and len(answer.split()) >= 5:
-                qa_pairs.append({
-                    "question": question,
-                    "answer": answer,
-                    "source": url
-                })
-    
-    # Look for alternating question/answer patterns
-    all_elements = section.find_all(["h3", "h4", "h5", "p", "div", "li"])
-    current_question = None
-    
-    for elem in all_elements:
-        text = elem.get_text(strip=True)
-        if not text:
-            continue
-            
-        if "?" in text and len(text.split()) <= 25:
-            current_question = text
-        elif current_question and len(text.split()) >= 5:
-            qa_pairs.append({
-                "question": current_question,
-                "answer": text[:1000],
-                "source": url
-            })
-            current_question = None
-    
-    return qa_pairs
+def extract_qa_from_html(url: str, html: str) -> List[Dict[str, str]]:
+    """Extracts Q&A pairs with the configured engine (QA_EXTRACTOR)"""
+    return parse_qa(url, html)
 
 # --------------------------------
 # Budget-Optimized Pipeline
 # --------------------------------
 def run_budget_optimized_pipeline():
+    # One pooled client and parse pool for the whole run
+    with ConcurrentScraper(parse_qa, cache=page_cache) as scraper:
+        _run_pipeline(scraper)
+
+def _run_pipeline(scraper: ConcurrentScraper):
     OUTPUT_DIR = Path(__file__).resolve().parent / "output_new"
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     
@@ -584,30 +350,20 @@ def run_budget_optimized_pipeline():
             logging.info(f"    📄 Found {len(urls)} URLs, scraping...")
             skill_qa_count = 0
             
-            # Process URLs for this skill
-            for url_idx, url in enumerate(urls, 1):
-                try:
-                    logging.info(f"      🌐 [{url_idx}/{len(urls)}] Scraping: {url[:60]}...")
-                    qa_pairs = extract_qa_from_url(url)
+            # Scrape this skill's URLs concurrently; results come back in URL order
+            for url_idx, (url, qa_pairs) in enumerate(zip(urls, scraper.scrape(urls)), 1):
+                logging.info(f"      🌐 [{url_idx}/{len(urls)}] Scraped: {url[:60]}...")
+                if qa_pairs:
+                    for qa in qa_pairs:
+                        qa["role"] = role
+                        qa["skill"] = skill
+                        qa["search_strategy"] = "direct" if skill_idx % 2 == 1 else "role_specific"
                     
-                    if qa_pairs:
-                        for qa in qa_pairs:
-                            qa["role"] = role
-                            qa["skill"] = skill
-                            qa["search_strategy"] = "direct" if skill_idx % 2 == 1 else "role_specific"
-                        
-                        role_results.extend(qa_pairs)
-                        skill_qa_count += len(qa_pairs)
-                        logging.info(f"        ✅ Found {len(qa_pairs)} Q&A pairs")
-                    else:
-                        logging.info(f"        ⚠️ No Q&A found")
-                        
-                except Exception as e:
-                    logging.error(f"        ❌ Failed to scrape {url}: {e}")
-                    continue
-                
-                # Very brief pause between URL scraping
-                time.sleep(0.2)
+                    role_results.extend(qa_pairs)
+                    skill_qa_count += len(qa_pairs)
+                    logging.info(f"        ✅ Found {len(qa_pairs)} Q&A pairs")
+                else:
+                    logging.info(f"        ⚠️ No Q&A found")
             
             logging.info(f"  ✅ Skill '{skill}' completed: {skill_qa_count} Q&A pairs found")
             role_summary["skills_processed"] += 1
@@ -672,5 +428,26 @@ def run_budget_optimized_pipeline():
     
     logging.info(f"📋 Final summary saved to: {final_summary_path}")
 
+# --------------------------------
+# Offline extractor replay
+# --------------------------------
+def replay_cached_pages():
+    """Re-runs extraction over every cached page, e.g. after tuning an extractor"""
+    pages, total = 0, 0
+    for entry in page_cache.entries("page"):
+        qa_pairs = extract_qa_from_html(entry.identity, entry.body)
+        pages += 1
+        total += len(qa_pairs)
+        logging.info(f"  {len(qa_pairs):>2} Q&A  {entry.identity[:80]}")
+    logging.info(f"📋 Replayed {pages} cached pages: {total} Q&A pairs ({total / max(1, pages):.2f} per page)")
+
 if __name__ == "__main__":
-    run_budget_optimized_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape interview Q&A for every role in ROLE_TECH_MAP")
+    parser.add_argument("--replay", action="store_true",
+                        help="re-run extraction over cached pages instead of scraping (no network, no budget)")
+    args = parser.parse_args()
+    if args.replay:
+        replay_cached_pages()
+    else:
+        run_budget_optimized_pipeline()
+        logging.info(f"💾 Page cache: {page_cache.stats()}")
\ No newline at end of file
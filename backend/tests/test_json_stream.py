@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from json_stream import IncrementalJSONParser, parse_json_objects
+
+RECORDS = [
+    {"refined_question": "What does {} mean in Python?", "answer": "An empty dict: `d = {}` or `dict()`.", "difficulty": "Beginner"},
+    {"refined_question": "Escape a \"quote\"?", "answer": "Use \\\" inside strings, e.g. \"a\\\"b\" } ] {", "difficulty": "Intermediate"},
+    {"refined_question": "Nested?", "answer": {"code": ["[1, 2]", {"x": "}"}]}, "difficulty": "Advanced"},
+]
+RESPONSE = "Here you go:\n```json\n" + json.dumps(RECORDS, indent=2) + "\n```\nDone."
+
+
+def feed_in_chunks(text, size, parser=None):
+    parser = parser or IncrementalJSONParser()
+    objects = []
+    for start in range(0, len(text), size):
+        objects.extend(parser.feed(text[start:start + size]))
+    return parser, objects
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(RESPONSE)])
+def test_chunking_does_not_change_result(size):
+    parser, objects = feed_in_chunks(RESPONSE, size)
+
+    assert objects == RECORDS
+    assert parser.pending == ""
+    assert parser.errors == 0
+
+
+def test_escape_split_across_chunks():
+    text = json.dumps([{"answer": 'say \\"hi\\" then }'}])
+    split = text.index("\\") + 1  # the chunk ends right after a backslash
+
+    parser = IncrementalJSONParser()
+    objects = parser.feed(text[:split]) + parser.feed(text[split:])
+
+    assert objects == [{"answer": 'say \\"hi\\" then }'}]
+
+
+def test_objects_are_returned_as_soon_as_they_close():
+    text = json.dumps(RECORDS)
+    first_end = text.index("}, {") + 1
+
+    parser = IncrementalJSONParser()
+
+    assert parser.feed(text[:first_end]) == RECORDS[:1]
+    assert parser.feed(text[first_end:]) == RECORDS[1:]
+
+
+def test_truncated_stream_keeps_complete_prefix():
+    text = json.dumps(RECORDS)
+    cut = text.index('"Nested?"')
+
+    parser, objects = feed_in_chunks(text[:cut], 5)
+
+    assert objects == RECORDS[:2]
+    assert parser.pending.startswith("{")
+
+
+def test_malformed_object_is_counted_and_skipped():
+    parser = IncrementalJSONParser()
+
+    assert parser.feed('[{"a": 1}, {"b": oops}, {"c": 3}]') == [{"a": 1}, {"c": 3}]
+    assert parser.errors == 1
+
+
+def test_raw_newlines_in_strings_are_accepted():
+    assert parse_json_objects('[{"answer": "line one\nline two"}]') == [{"answer": "line one\nline two"}]
+
+
+@pytest.mark.parametrize("text", ['[{"a": 1}, "str", 3]', '{"a": 1}', '[[{"a": 1}]]', 'prose [{"a": 1}]'])
+def test_strict_mode_rejects_anything_but_an_array_of_objects(text):
+    with pytest.raises(ValueError):
+        feed_in_chunks(text, 4, IncrementalJSONParser(strict=True))
+
+
+def test_strict_mode_tracks_the_closing_bracket():
+    text = json.dumps(RECORDS)
+
+    parser, objects = feed_in_chunks(text[:-1], 3, IncrementalJSONParser(strict=True))
+    assert objects == RECORDS
+    assert not parser.closed
+
+    parser.feed("]")
+    assert parser.closed
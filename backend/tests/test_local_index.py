@@ -0,0 +1,52 @@
+import asyncio
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.services.local_index import FILTER_FIELDS, LocalVectorIndex
+
+
+class KeywordEmbeddings(Embeddings):
+    """One dimension per keyword, so similarity is predictable."""
+    keywords = ("join", "list", "docker")
+
+    def embed_query(self, text):
+        return [float(word in text.lower()) for word in self.keywords]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+def build_index():
+    records = [
+        {"page_content": "Question: What is a SQL join?", "role": "Data Analyst", "skill": "SQL", "difficulty": "Beginner"},
+        {"page_content": "Question: What is a join in Spark?", "role": "Data Engineer", "skill": "Spark", "difficulty": "Beginner"},
+        {"page_content": "Question: What is a Python list?", "role": "Data Analyst", "skill": "Python", "difficulty": "Beginner"},
+        {"page_content": "Question: What is a Docker image?", "role": "DevOps Engineer", "skill": "Docker", "difficulty": "Advanced"},
+    ]
+    embeddings = KeywordEmbeddings()
+    vectors = np.asarray(embeddings.embed_documents([r["page_content"] for r in records]), dtype=np.float32)
+    columns = {field: LocalVectorIndex.encode_column(r[field] for r in records) for field in FILTER_FIELDS}
+    return LocalVectorIndex(vectors, [r["page_content"] for r in records], columns), embeddings
+
+
+def test_ainvoke_applies_filter():
+    index, embeddings = build_index()
+    retriever = index.as_retriever(embeddings, k=2)
+
+    documents = asyncio.run(retriever.ainvoke("explain a join", filter={"role": "Data Analyst"}))
+
+    assert documents[0].page_content == "Question: What is a SQL join?"
+    assert all(doc.metadata["role"] == "Data Analyst" for doc in documents)
+
+
+def test_ainvoke_matches_invoke():
+    index, embeddings = build_index()
+    retriever = index.as_retriever(embeddings, k=3)
+    metadata_filter = {"skill": {"$in": ["SQL", "Spark"]}}
+
+    sync_docs = retriever.invoke("join", filter=metadata_filter)
+    async_docs = asyncio.run(retriever.ainvoke("join", filter=metadata_filter))
+
+    assert [d.page_content for d in async_docs] == [d.page_content for d in sync_docs]
+    assert {d.metadata["skill"] for d in async_docs} == {"SQL", "Spark"}
@@ -0,0 +1,58 @@
+import json
+import os
+import stat
+
+import pytest
+
+from preprocess_output import preprocess_file
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_rewrite_matches_json_dump(tmp_path):
+    records = [{"question": "What is {x}?", "answer": "**Bold** \"quoted\" ]"}, {"question": "Second"}]
+    path = write(tmp_path / "role.json", json.dumps(records))
+
+    result = preprocess_file(path)
+
+    records[0]["answer"] = "Bold \"quoted\" ]"
+    assert result["kept"] == 2
+    assert (tmp_path / "role.json").read_text(encoding="utf-8") == json.dumps(records, indent=4, ensure_ascii=False)
+
+
+@pytest.mark.parametrize("text", [
+    '[{"a": 1}, "str", 3]',
+    '[{"a": 1}, [{"b": 2}]]',
+    '{"a": 1}',
+    '[{"a": 1},]',
+    '[{"a": 1}',
+    '[{"a": 1}] {"b": 2}',
+    '',
+])
+def test_non_array_of_objects_is_rejected_and_left_untouched(tmp_path, text):
+    path = write(tmp_path / "role.json", text)
+
+    with pytest.raises(ValueError):
+        preprocess_file(path)
+
+    assert (tmp_path / "role.json").read_text(encoding="utf-8") == text
+    assert os.listdir(tmp_path) == ["role.json"]
+
+
+def test_empty_array(tmp_path):
+    path = write(tmp_path / "role.json", " [ ] ")
+
+    assert preprocess_file(path)["kept"] == 0
+    assert (tmp_path / "role.json").read_text(encoding="utf-8") == "[]"
+
+
+def test_keeps_file_mode(tmp_path):
+    path = write(tmp_path / "role.json", '[{"answer": "*a*"}]')
+    os.chmod(path, 0o644)
+
+    preprocess_file(path)
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
@@ -0,0 +1,160 @@
+import asyncio
+import os
+import types
+import uuid
+
+# Settings() requires these; the store under test never uses them.
+for _key in ("SUPABASE_URL", "SUPABASE_SERVICE_KEY", "PINECONE_API_KEY", "GEMINI_API_KEY",
+             "HUGGINGFACEHUB_ACCESS_TOKEN", "FIRECRAWL_API_KEY", "SERPAPI_API_KEY", "GROQ_API_KEY"):
+    os.environ.setdefault(_key, "test")
+
+import pytest
+
+from app.services import session_store
+from app.services.session_store import MAX_FLUSH_ATTEMPTS, SessionStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class Recorder:
+    """persist() stand-in that records writes and can fail on demand."""
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.writes = []
+
+    async def __call__(self, session_id, transcript):
+        if self.fail:
+            raise RuntimeError("no interviews row")
+        self.writes.append((session_id, transcript))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def interview_id():
+    return str(uuid.uuid4())
+
+
+def test_idle_sessions_expire(clock):
+    store = SessionStore(ttl_seconds=60)
+    store.get("old")
+    clock.now += 30
+    store.get("recent")
+    clock.now += 31
+
+    store.get("new")
+
+    assert "old" not in store
+    assert "recent" in store and "new" in store
+
+
+def test_use_refreshes_expiry(clock):
+    store = SessionStore(ttl_seconds=60)
+    store.get("a")
+    clock.now += 50
+    store.get("a")
+    clock.now += 50
+
+    store.get("b")
+
+    assert "a" in store
+
+
+def test_least_recently_used_is_evicted_first(clock):
+    store = SessionStore(max_sessions=2)
+    store.get("a")
+    store.get("b")
+    store.get("a")
+
+    store.get("c")
+
+    assert "b" not in store
+    assert "a" in store and "c" in store
+    assert len(store) == 2
+
+
+def test_close_persists_dirty_transcripts():
+    persist = Recorder()
+    store = SessionStore(flush_interval=3600, persist_transcripts=True, persist=persist)
+    session_id = interview_id()
+
+    async def run():
+        store.start()
+        store.record_question(session_id, "What is a JOIN?", "q1")
+        store.record_answer(session_id, "It combines tables.", {"score": 8, "feedback": "Good", "topic": "SQL"})
+        await store.close()
+
+    asyncio.run(run())
+
+    assert persist.writes == [(session_id, [
+        {"question": "What is a JOIN?", "answer": "It combines tables.", "score": 8, "feedback": "Good", "topic": "SQL"}
+    ])]
+    assert not store.get(session_id).dirty
+    assert store._flusher is None
+
+
+def test_clean_and_non_interview_sessions_are_not_written():
+    persist = Recorder()
+    store = SessionStore(persist_transcripts=True, persist=persist)
+    store.record_question("resume-upload-name", "What is a JOIN?", "q1")
+    store.get(interview_id())
+
+    asyncio.run(store.close())
+
+    assert persist.writes == []
+
+
+def test_evicted_transcript_is_persisted_on_next_flush(clock):
+    persist = Recorder()
+    store = SessionStore(max_sessions=1, persist_transcripts=True, persist=persist)
+    evicted = interview_id()
+    store.record_question(evicted, "What is a JOIN?", "q1")
+    store.get(interview_id())
+
+    assert evicted not in store
+    asyncio.run(store.flush())
+
+    assert persist.writes == [(evicted, [{"question": "What is a JOIN?"}])]
+
+
+def test_failed_writes_are_retried_then_dropped():
+    persist = Recorder(fail=True)
+    store = SessionStore(persist_transcripts=True, persist=persist)
+    session_id = interview_id()
+    store.record_question(session_id, "What is a JOIN?", "q1")
+
+    for _ in range(MAX_FLUSH_ATTEMPTS - 1):
+        asyncio.run(store.flush())
+        assert store.get(session_id).dirty
+    asyncio.run(store.flush())
+
+    assert not store.get(session_id).dirty
+    persist.fail = False
+    asyncio.run(store.flush())
+    assert persist.writes == []
+
+
+def test_persistence_off_never_writes():
+    persist = Recorder()
+    store = SessionStore(max_sessions=1, persist_transcripts=False, persist=persist)
+
+    async def run():
+        store.start()
+        assert store._flusher is None
+        store.record_question(interview_id(), "What is a JOIN?", "q1")
+        store.record_question(interview_id(), "What is an index?", "q2")  # evicts the first
+        await store.close()
+
+    asyncio.run(run())
+
+    assert persist.writes == []
@@ -0,0 +1,29 @@
+-- Adds the (role, refined_question) natural key that backend/app/supabase_client.py
+-- upserts on (on_conflict="role,refined_question") to deployments whose
+-- interview_questions table predates it. `create table if not exists` in
+-- schema.sql leaves such tables untouched, and they can already hold duplicates.
+
+begin;
+
+-- Keep one row per (role, refined_question): the most recently written copy,
+-- matching the loader, which keeps the last duplicate of a file.
+delete from interview_questions older
+using interview_questions newer
+where older.role = newer.role
+  and older.refined_question = newer.refined_question
+  and older.ctid < newer.ctid;
+
+do $$
+begin
+    if not exists (
+        select 1 from pg_constraint
+        where conname = 'unique_role_question'
+          and conrelid = 'interview_questions'::regclass
+    ) then
+        alter table interview_questions
+            add constraint unique_role_question unique (role, refined_question);
+    end if;
+end
+$$;
+
+commit;
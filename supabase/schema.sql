@@ -39,4 +39,21 @@ create table analysis_reports (
     recommended_resources text,
     created_at timestamp with time zone default timezone('utc'::text, now()) not null,
     constraint unique_interview_id unique (interview_id)
-);
\ No newline at end of file
+);
+
+-- Question bank loaded by backend/app/supabase_client.py.
+-- (role, refined_question) is the natural key the bulk loader upserts on.
+-- Existing tables get the constraint from
+-- migrations/20261017000000_interview_questions_unique_role_question.sql.
+create table if not exists interview_questions (
+    id bigint generated always as identity primary key,
+    refined_question text not null,
+    answer text,
+    answer_code text,
+    difficulty text,
+    original_question text,
+    role text,
+    skill text,
+    source text,
+    constraint unique_role_question unique (role, refined_question)
+);